@@ -1,7 +1,11 @@
 from qiskit import QuantumCircuit
+import json
+import os
 import matplotlib.pyplot as plt
 import numpy as np
 
+BENCH_FILE = os.environ.get("BENCH_FILE", "bench.json")
+
 def grover_example_circuit(n:int =5) -> QuantumCircuit:
     qc = QuantumCircuit(n)
     qc.h(range(n))
@@ -24,6 +28,16 @@ def create_circuit_fig():
     plt.savefig("fig_grover_circuit.pdf", dpi=300)
     return
 
+def load_bench(path: str = BENCH_FILE) -> dict:
+    # Report written by `python main.py bench`
+    with open(path) as f:
+        return json.load(f)
+
+def mean_by_depth(report: dict, field: str) -> tuple[list[int], list[float]]:
+    depths = sorted({r["depth"] for r in report["results"]})
+    means = [float(np.mean([r[field] for r in report["results"] if r["depth"] == d])) for d in depths]
+    return depths, means
+
 def create_depth_adv_fig():
     circuit_depths = [0, 0, 0, 0]
     grover_scores = [0, 0, 0, 0]     #  output from Grover engine
@@ -54,6 +68,39 @@ def create_time_depth_fig():
     plt.savefig('fig_time_vs_depth.pdf', dpi=300)
     return
 
+def create_effort_depth_fig(path: str = BENCH_FILE):
+    report = load_bench(path)
+    depths, nodes = mean_by_depth(report, "nodes")
+    _, evaluations = mean_by_depth(report, "evaluations")
+
+    plt.figure()
+    plt.plot(depths, nodes, label='Nodes searched', marker='o')
+    plt.plot(depths, evaluations, label='Positions evaluated', marker='s')
+    plt.yscale('log')
+    plt.xlabel('Search Depth')
+    plt.ylabel('Mean Count per Position')
+    plt.title(f"Search Effort vs Depth ({report['config']['search']}, {report['config']['mode']})")
+    plt.legend()
+    plt.grid(True)
+    plt.savefig('fig_effort_vs_depth.pdf', dpi=300)
+    return
+
+def create_bench_time_depth_fig(path: str = BENCH_FILE):
+    report = load_bench(path)
+    depths, wall_times = mean_by_depth(report, "wall_time")
+    _, simulation_times = mean_by_depth(report, "simulation_time")
+
+    plt.figure()
+    plt.plot(wall_times, depths, label='Total', marker='o')
+    plt.plot(simulation_times, depths, label='Circuit simulation', marker='s')
+    plt.xlabel('Time (seconds)')
+    plt.ylabel('Search Depth')
+    plt.title(f"Time vs Search Depth ({report['config']['search']}, {report['config']['mode']})")
+    plt.legend()
+    plt.grid(True)
+    plt.savefig('fig_bench_time_vs_depth.pdf', dpi=300)
+    return
+
 def create_cqSearch_fig():
     depths = np.arange(1, 11)
     B_values = [20, 30, 35, 40]
@@ -79,5 +126,8 @@ if __name__== "__main__":
     create_circuit_fig()
     # create_depth_adv_fig()
     # create_time_depth_fig()
+    if os.path.exists(BENCH_FILE):
+        create_effort_depth_fig()
+        create_bench_time_depth_fig()
     create_cqSearch_fig()
     
@@ -0,0 +1,140 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import argparse
+import json
+import os
+import sys
+import time
+import chess
+from position_cache import read_positions
+
+
+DEFAULT_SETTINGS = {"mode": "analytic", "search": "alphabeta", "policy": "all", "depth": 3, "time": None}
+QUEUE_PER_WORKER = 2  # positions submitted ahead of each worker, so none idles while results are written
+
+# Per-worker engines by settings, kept for the lifetime of the worker process
+_engines = {}
+
+
+def _worker_engine(settings: dict):
+    from engine import QuantumChessEngine
+    key = (settings["mode"], settings["search"], settings["policy"])
+    if key not in _engines:
+        _engines[key] = QuantumChessEngine(mode=settings["mode"], search=settings["search"],
+                                           policy=settings["policy"])
+    return _engines[key]
+
+
+def analyse_position(index: int, fen: str, settings: dict) -> dict:
+    '''
+    Worker task: searches one position and returns its JSONL record. With a time limit the result is that of
+    the deepest iteration that finished; move is None if none did.
+    '''
+    from search import SearchLimits
+    from stats import SearchStats
+
+    engine = _worker_engine(settings)
+    board = chess.Board(fen)
+    stats = SearchStats()
+    limits = SearchLimits(time_limit=settings["time"])
+    start = time.perf_counter()
+    depth, score, move = 0, None, None
+    if not board.is_game_over():
+        for depth, score, move in engine.iterate(board, limits, settings["depth"], stats):
+            pass
+    return {"index": index, "fen": fen, "move": move.uci() if move else None, "score": score, "depth": depth,
+            "time": time.perf_counter() - start, "nodes": stats.nodes, "circuits": stats.circuits,
+            "simulation_time": stats.simulation_time}
+
+
+def analyse_positions(positions, settings: dict | None = None, workers: int | None = None, skip=()):
+    '''
+    Generator: searches every board of the iterable positions on a process pool and yields each record as it
+    completes (not in input order). Positions are pulled from positions only as workers free up, so memory
+    stays flat however long the input is. Indices in skip (already analysed) are not searched again.
+    '''
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    workers = workers or os.cpu_count() or 1
+    positions = ((index, board) for index, board in enumerate(positions) if index not in skip)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for index, board in positions:
+            pending.add(pool.submit(analyse_position, index, board.fen(), settings))
+            if len(pending) < workers * QUEUE_PER_WORKER:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        for future in wait(pending).done:
+            yield future.result()
+    return
+
+
+def completed_indices(path: str) -> set[int]:
+    '''
+    Indices already recorded in the JSONL output at path. A last line torn by an interrupted run is cut off
+    so that appending continues on a clean line.
+    '''
+    if not os.path.exists(path):
+        return set()
+    indices = set()
+    with open(path, "r+") as f:
+        end = 0
+        for line in iter(f.readline, ""):
+            if not line.endswith("\n"):
+                break
+            try:
+                indices.add(json.loads(line)["index"])
+            except (ValueError, KeyError):
+                break
+            end = f.tell()
+        f.truncate(end)
+    return indices
+
+
+def run_analysis(input_path: str, output_path: str = "analysis.jsonl", settings: dict | None = None,
+                 workers: int | None = None, plies: int | None = None, on_result=None) -> dict:
+    '''
+    Analyses every position of a FEN/EPD or PGN file (each game's first plies half-moves, or all of them) and
+    appends one JSON line per position to output_path as it finishes. Positions already in output_path are
+    skipped, so rerunning an interrupted analysis resumes it. Returns counts of new and skipped positions.
+    '''
+    done = completed_indices(output_path)
+    summary = {"analysed": 0, "skipped": len(done)}
+    start = time.perf_counter()
+    with open(output_path, "a") as out:
+        for record in analyse_positions(read_positions(input_path, plies), settings, workers, skip=done):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            summary["analysed"] += 1
+            if on_result is not None:
+                on_result(record)
+    summary["elapsed"] = time.perf_counter() - start
+    return summary
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="main.py analyse", description="Analyse every position of an EPD/PGN file.")
+    parser.add_argument("input", help="FEN/EPD file (one position per line) or PGN file")
+    parser.add_argument("--output", default="analysis.jsonl", help="JSONL results; an existing file is resumed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--plies", type=int, default=None, help="only the first plies positions of each PGN game")
+    parser.add_argument("--depth", type=int, default=DEFAULT_SETTINGS["depth"])
+    parser.add_argument("--time", type=float, default=None, help="seconds per position")
+    parser.add_argument("--mode", default=DEFAULT_SETTINGS["mode"])
+    parser.add_argument("--search", default=DEFAULT_SETTINGS["search"])
+    parser.add_argument("--policy", default=DEFAULT_SETTINGS["policy"])
+    args = parser.parse_args(argv)
+
+    settings = {"mode": args.mode, "search": args.search, "policy": args.policy, "depth": args.depth,
+                "time": args.time}
+    summary = run_analysis(args.input, args.output, settings, args.workers, args.plies,
+                           on_result=lambda r: print(f"{r['index']:6d}  {r['move']}  {r['score']}  "
+                                                     f"depth {r['depth']}  {r['time']:.2f}s", flush=True))
+    print(f"analysed {summary['analysed']} positions ({summary['skipped']} already done) in "
+          f"{summary['elapsed']:.1f}s -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import argparse
+import json
+import os
+import sys
+import time
+import chess
+import chess.pgn
+
+
+DEFAULT_PLAYER = {"mode": "analytic", "search": "alphabeta", "policy": "all", "depth": None, "time": None}
+MAX_PLIES = 200  # games still running after this many half-moves are adjudicated drawn
+QUEUE_PER_WORKER = 2  # games submitted ahead of each worker, so none idles while results are written
+
+
+def parse_player(tokens: list[str]) -> dict:
+    '''
+    Engine settings from "key=value" tokens: mode, search, policy, depth (iterative deepening target)
+    and time (seconds per move). Unset keys keep the DEFAULT_PLAYER values.
+    '''
+    player = dict(DEFAULT_PLAYER)
+    for token in tokens:
+        name, _, value = token.partition("=")
+        if name not in player or not value:
+            raise ValueError(f"Bad player setting {token!r}; expected key=value with key in {sorted(player)}")
+        player[name] = int(value) if name == "depth" else float(value) if name == "time" else value
+    return player
+
+
+def describe_player(player: dict) -> str:
+    return " ".join(f"{name}={value}" for name, value in player.items() if value is not None)
+
+
+def play_game(game_id: int, white: dict, black: dict, start_fen: str = chess.STARTING_FEN,
+              max_plies: int = MAX_PLIES) -> dict:
+    '''
+    Worker task: plays one engine game and returns its PGN text, result and per-move timing records.
+    '''
+    from engine import QuantumChessEngine
+    from grover import seed_analytic_rng
+
+    # Reproducible per game, but different between games
+    seed_analytic_rng(game_id)
+    engines = {}
+    for color, player in ((chess.WHITE, white), (chess.BLACK, black)):
+        engines[color] = QuantumChessEngine(mode=player["mode"], search=player["search"], policy=player["policy"],
+                                            profile=False)
+
+    board = chess.Board(start_fen)
+    moves = []
+    while not board.is_game_over(claim_draw=True) and len(moves) < max_plies:
+        player = white if board.turn == chess.WHITE else black
+        engine = engines[board.turn]
+        start = time.perf_counter()
+        move = engine.select_quantum_move(board, time_limit=player["time"], max_depth=player["depth"])
+        elapsed = time.perf_counter() - start
+        moves.append({"game": game_id, "ply": len(moves) + 1, "side": "white" if board.turn else "black",
+                      "move": move.uci(), "time": elapsed, "depth": engine.last_depth})
+        board.push(move)
+
+    result = board.result(claim_draw=True) if board.is_game_over(claim_draw=True) else "1/2-1/2"
+    game = chess.pgn.Game.from_board(board)
+    game.headers["Event"] = "Quantum Chess Engine arena"
+    game.headers["Round"] = str(game_id + 1)
+    game.headers["White"] = describe_player(white)
+    game.headers["Black"] = describe_player(black)
+    game.headers["Result"] = result
+    if start_fen != chess.STARTING_FEN:
+        game.headers["FEN"] = start_fen
+        game.headers["SetUp"] = "1"
+    return {"game": game_id, "result": result, "pgn": str(game), "moves": moves}
+
+
+def load_openings(path: str) -> list[str]:
+    '''
+    Start positions as FENs: one per FEN/EPD line, or the final position of every game in a PGN file.
+    '''
+    if not path.endswith(".pgn"):
+        from position_cache import read_positions
+        return [board.fen() for board in read_positions(path)]
+    openings = []
+    with open(path) as f:
+        while (game := chess.pgn.read_game(f)) is not None:
+            openings.append(game.end().board().fen())
+    return openings
+
+
+def run_arena(player_a: dict, player_b: dict, games: int, workers: int | None = None,
+              pgn_path: str = "arena.pgn", timings_path: str = "arena_moves.jsonl",
+              openings: list[str] | None = None, max_plies: int = MAX_PLIES, on_game=None) -> dict:
+    '''
+    Plays games between player_a and player_b (alternating colours) on a process pool. Each finished game
+    is appended to pgn_path and its moves to timings_path as it completes; on_game(summary) is called after
+    each. Games are submitted only as workers free up, so memory stays flat however many are played.
+    Returns the final summary with score from player_a's point of view.
+    '''
+    workers = workers or os.cpu_count() or 1
+    openings = openings or [chess.STARTING_FEN]
+    summary = {"games": 0, "a_wins": 0, "b_wins": 0, "draws": 0, "moves": 0, "move_time": 0.0}
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(pgn_path, "a") as pgn_file, \
+            open(timings_path, "a") as timings_file:
+        pending = {}
+        game_ids = iter(range(games))
+        while True:
+            # Tops the queue up to a few games per worker, then records whichever games finish first
+            for game_id in game_ids:
+                # Each opening is played once with either colour
+                a_is_white = game_id % 2 == 0
+                white, black = (player_a, player_b) if a_is_white else (player_b, player_a)
+                opening = openings[(game_id // 2) % len(openings)]
+                pending[pool.submit(play_game, game_id, white, black, opening, max_plies)] = a_is_white
+                if len(pending) >= workers * QUEUE_PER_WORKER:
+                    break
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                _record_game(future.result(), pending.pop(future), pgn_file, timings_file, summary)
+                _update_rates(summary, time.perf_counter() - start)
+                if on_game is not None:
+                    on_game(summary)
+    _update_rates(summary, time.perf_counter() - start)
+    return summary
+
+
+def _record_game(game: dict, a_is_white: bool, pgn_file, timings_file, summary: dict) -> None:
+    # Appends a finished game to the PGN and timing files and counts it in summary
+    pgn_file.write(game["pgn"] + "\n\n")
+    pgn_file.flush()
+    for record in game["moves"]:
+        record["player"] = "A" if (record["side"] == "white") == a_is_white else "B"
+        timings_file.write(json.dumps(record) + "\n")
+    timings_file.flush()
+
+    summary["games"] += 1
+    if game["result"] == "1/2-1/2":
+        summary["draws"] += 1
+    elif (game["result"] == "1-0") == a_is_white:
+        summary["a_wins"] += 1
+    else:
+        summary["b_wins"] += 1
+    summary["moves"] += len(game["moves"])
+    summary["move_time"] += sum(record["time"] for record in game["moves"])
+    return
+
+
+def _update_rates(summary: dict, elapsed: float) -> None:
+    summary["elapsed"] = elapsed
+    summary["games_per_hour"] = summary["games"] * 3600 / max(elapsed, 1e-9)
+    summary["avg_move_time"] = summary["move_time"] / max(summary["moves"], 1)
+    summary["score"] = (summary["a_wins"] + 0.5 * summary["draws"]) / max(summary["games"], 1)
+    return
+
+
+def format_summary(summary: dict) -> str:
+    return (f"{summary['games']} games  +{summary['a_wins']} -{summary['b_wins']} ={summary['draws']}  "
+            f"score {summary['score']:.3f}  {summary['games_per_hour']:.1f} games/h  "
+            f"{summary['avg_move_time'] * 1000:.0f} ms/move")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="main.py arena", description="Play engine-vs-engine games headlessly.")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--a", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="player A settings: mode, search, policy, depth, time")
+    parser.add_argument("--b", nargs="*", default=[], metavar="KEY=VALUE", help="player B settings")
+    parser.add_argument("--openings", help="FEN/EPD file, or PGN whose final positions are played in turn")
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES)
+    parser.add_argument("--pgn", default="arena.pgn", help="PGN file finished games are appended to")
+    parser.add_argument("--timings", default="arena_moves.jsonl", help="JSONL file per-move timings are appended to")
+    args = parser.parse_args(argv)
+
+    try:
+        player_a, player_b = parse_player(args.a), parse_player(args.b)
+    except ValueError as error:
+        parser.error(str(error))
+
+    openings = load_openings(args.openings) if args.openings else None
+
+    print(f"A: {describe_player(player_a)}\nB: {describe_player(player_b)}")
+    summary = run_arena(player_a, player_b, args.games, args.workers, args.pgn, args.timings, openings,
+                        args.max_plies, on_game=lambda s: print(format_summary(s), flush=True))
+    print(f"done in {summary.get('elapsed', 0.0):.1f}s -> {args.pgn}, {args.timings}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
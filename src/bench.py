@@ -0,0 +1,302 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import chess
+from grover import (EXECUTION_MODES, ORACLES, REGISTERS, circuit_cache, circuit_metrics, configure_adaptive_shots,
+                    grover_iterations, grover_probabilities, grover_register, grover_select_batch, seed_analytic_rng)
+from quantum_backend import SEARCH_MODES, select_best_quantum_move
+from stats import SearchStats
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+
+BENCH_SCHEMA_VERSION = 1
+
+BENCH_POSITIONS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+    "r3k2r/pppq1ppp/2n2n2/3pp3/3PP3/2N2N2/PPPQ1PPP/R3K2R w KQkq - 0 1",
+    "8/2k5/3p4/p2P1p2/P2P1P2/8/3K4/8 w - - 0 1",
+]
+BENCH_DEPTHS = (1, 2, 3, 4)
+
+# (qubits, marked indices) of Grover registers typical of middlegame positions, for the oracle comparison
+ORACLE_CASES = [
+    (3, [1, 5]),
+    (5, [3, 7, 9, 20, 30]),
+    (6, list(range(0, 64, 5))),
+    (8, list(range(0, 256, 13))),
+]
+
+# (legal moves, marked indices) of Grover selections, mostly just over a power of two, for the register comparison
+SELECTION_CASES = [
+    (5, [1]),
+    (9, [2, 6]),
+    (20, [3, 7, 15]),
+    (33, [4, 11, 12, 20, 27, 31]),
+    (40, [0, 9, 17, 30]),
+]
+
+# Run in a fresh interpreter by measure_startup: seconds to import the engine, to import Qiskit and start Aer,
+# and for a first depth-1 move with the backend ready
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import chess, engine, grover
+imported = time.perf_counter()
+qiskit_loaded = "qiskit" in sys.modules
+grover.warm_up(background=False)
+warmed = time.perf_counter()
+engine.QuantumChessEngine(mode="aer", profile=False).select_quantum_move(chess.Board(), max_depth=1)
+moved = time.perf_counter()
+print(json.dumps({"import_engine": imported - start, "quantum_warm_up": warmed - imported,
+                  "first_move": moved - warmed, "qiskit_loaded_by_engine": qiskit_loaded}))
+"""
+
+DEFAULT_THRESHOLD = 0.25    # allowed relative slowdown before a result counts as a regression
+MIN_COMPARABLE_TIME = 0.05  # seconds; shorter runs are too noisy to compare
+
+
+def peak_rss_kb() -> int | None:
+    '''
+    Peak resident set size of this process in kilobytes, or None where it cannot be measured.
+    '''
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def bench_position(fen: str, depth: int, mode: str = "analytic", search: str = "alphabeta",
+                   policy: str = "all") -> dict:
+    '''
+    Searches one position to depth and returns its timings and counters.
+    '''
+    board = chess.Board(fen)
+    stats = SearchStats()
+    start = time.perf_counter()
+    move = select_best_quantum_move(board, depth, mode=mode, search=search, stats=stats, policy=policy)
+    wall_time = time.perf_counter() - start
+    elapsed = max(wall_time, 1e-9)
+
+    return {
+        "fen": fen,
+        "depth": depth,
+        "wall_time": wall_time,
+        "nodes": stats.nodes,
+        "nodes_per_second": stats.nodes / elapsed,
+        "evaluations": stats.leaves,
+        "evaluations_per_second": stats.leaves / elapsed,
+        "circuits": stats.circuits,
+        "circuits_built": stats.circuits_built,
+        "movegen_time": stats.movegen_time,
+        "evaluation_time": stats.evaluation_time,
+        "build_time": stats.build_time,
+        "transpile_time": stats.transpile_time,
+        "simulation_time": stats.simulation_time,
+        "shots": stats.shots,
+        "peak_rss_kb": peak_rss_kb(),
+        "move": move.uci(),
+    }
+
+
+def run_bench(positions: list[str] | None = None, depths=BENCH_DEPTHS, mode: str = "analytic",
+              search: str = "alphabeta", seed: int = 0, confidence: float | None = None,
+              policy: str = "all") -> dict:
+    '''
+    Runs every position at every depth from a cold circuit cache and returns the versioned report.
+    confidence enables adaptive shots for the run.
+    '''
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"Unknown execution mode {mode!r}; expected one of {EXECUTION_MODES}")
+    if search not in SEARCH_MODES:
+        raise ValueError(f"Unknown search {search!r}; expected one of {SEARCH_MODES}")
+
+    positions = positions if positions is not None else BENCH_POSITIONS
+    seed_analytic_rng(seed)
+    circuit_cache.clear()
+    configure_adaptive_shots(confidence)
+    try:
+        results = [bench_position(fen, depth, mode, search, policy) for depth in depths for fen in positions]
+    finally:
+        configure_adaptive_shots(None)
+    total_time = sum(result["wall_time"] for result in results)
+    total_nodes = sum(result["nodes"] for result in results)
+    return {
+        "version": BENCH_SCHEMA_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"mode": mode, "search": search, "depths": list(depths), "seed": seed, "confidence": confidence,
+                   "policy": policy},
+        "platform": {"python": platform.python_version(), "machine": platform.machine(),
+                     "system": platform.system()},
+        "results": results,
+        "totals": {"wall_time": total_time, "nodes": total_nodes,
+                   "nodes_per_second": total_nodes / max(total_time, 1e-9), "peak_rss_kb": peak_rss_kb()},
+    }
+
+
+def oracle_report(cases=ORACLE_CASES, basis_gates: list[str] | None = None) -> list[dict]:
+    '''
+    Circuit depth, gate count and transpile time of every oracle construction on each case.
+    '''
+    rows = []
+    for n, marked_indices in cases:
+        R = grover_iterations(2 ** n, len(marked_indices))
+        for oracle in ORACLES:
+            rows.append({"qubits": n, "marked": len(marked_indices), "iterations": R, "oracle": oracle,
+                         **circuit_metrics(n, marked_indices, R, oracle, basis_gates)})
+    return rows
+
+
+def selection_report(cases=SELECTION_CASES, trials: int = 1000, confidence: float = 0.99, seed: int = 0) -> list[dict]:
+    '''
+    Exact against padded Grover register on each case: iterations, transpiled gates, the probability that one
+    shot measures a marked move, and, over trials analytic selections with adaptive shots, how often each
+    move is selected, how often that move is a marked one and the mean shots used.
+    '''
+    rows = []
+    for num_moves, marked_indices in cases:
+        for register in REGISTERS:
+            n, R, num_states = grover_register(num_moves, len(marked_indices), register)
+            seed_analytic_rng(seed)
+            stats = SearchStats()
+            selected = grover_select_batch([(num_moves, marked_indices)] * trials, mode="analytic", stats=stats,
+                                           confidence=confidence, register=register)
+            counts = [0] * num_moves
+            for index in selected:
+                counts[index] += 1
+            rows.append({"register": register, "moves": num_moves, "marked": len(marked_indices), "qubits": n,
+                         "iterations": R,
+                         "gates": circuit_metrics(n, marked_indices, R, num_states=num_states)["gates"],
+                         "marked_probability": float(grover_probabilities(n, marked_indices, R, num_states)[marked_indices].sum()),
+                         "selected_marked": sum(counts[i] for i in marked_indices) / trials,
+                         "mean_shots": stats.shots / trials,
+                         "selection": [count / trials for count in counts]})
+    seed_analytic_rng(None)
+    return rows
+
+
+def measure_startup(runs: int = 3) -> dict:
+    '''
+    Startup phase timings (see STARTUP_SCRIPT), the fastest of runs fresh processes for each phase.
+    '''
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=src_dir, capture_output=True,
+                                text=True, check=True).stdout
+        samples.append(json.loads(output.splitlines()[-1]))
+    timings = {key: min(sample[key] for sample in samples)
+               for key in ("import_engine", "quantum_warm_up", "first_move")}
+    timings["qiskit_loaded_by_engine"] = any(sample["qiskit_loaded_by_engine"] for sample in samples)
+    return timings
+
+
+def save_report(report: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return
+
+
+def load_report(path: str) -> dict:
+    with open(path) as f:
+        report = json.load(f)
+    if report.get("version") != BENCH_SCHEMA_VERSION:
+        raise ValueError(f"{path}: bench schema version {report.get('version')}, expected {BENCH_SCHEMA_VERSION}")
+    return report
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    '''
+    Compares two reports position by position and returns a description of every regression:
+    wall time more than threshold slower, or nodes/s more than threshold lower.
+    '''
+    baseline_results = {(r["fen"], r["depth"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        base = baseline_results.get((result["fen"], result["depth"]))
+        if base is None or max(result["wall_time"], base["wall_time"]) < MIN_COMPARABLE_TIME:
+            continue
+        name = f"depth {result['depth']} {result['fen']}"
+        if result["wall_time"] > base["wall_time"] * (1 + threshold):
+            regressions.append(f"{name}: wall time {base['wall_time']:.3f}s -> {result['wall_time']:.3f}s")
+        if result["nodes_per_second"] < base["nodes_per_second"] * (1 - threshold):
+            regressions.append(f"{name}: nodes/s {base['nodes_per_second']:.0f} -> "
+                               f"{result['nodes_per_second']:.0f}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="main.py bench", description="Benchmark the search on fixed positions.")
+    parser.add_argument("--depths", type=int, nargs="+", default=list(BENCH_DEPTHS))
+    # Aer, like the engine: in analytic mode no circuit is built, so those counters stay at 0
+    parser.add_argument("--mode", choices=EXECUTION_MODES, default="aer")
+    parser.add_argument("--search", choices=SEARCH_MODES, default="alphabeta")
+    parser.add_argument("--output", default="bench.json", help="where to write the JSON report")
+    parser.add_argument("--baseline", help="report to compare against; exits with status 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--confidence", type=float, help="stop sampling each circuit early at this confidence")
+    parser.add_argument("--policy", default="all", help="where Grover selection runs: all, root, top:K, branching:B")
+    parser.add_argument("--oracles", action="store_true", help="only compare the oracle constructions")
+    parser.add_argument("--startup", action="store_true", help="only measure process startup phases")
+    parser.add_argument("--selection", action="store_true",
+                        help="only compare move selection with the exact and the padded Grover register")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        timings = measure_startup()
+        print(f"import engine {timings['import_engine'] * 1000:.0f}ms  "
+              f"qiskit + aer warm-up {timings['quantum_warm_up'] * 1000:.0f}ms  "
+              f"first depth-1 move {timings['first_move'] * 1000:.0f}ms"
+              f"{'  (engine import loaded qiskit)' if timings['qiskit_loaded_by_engine'] else ''}")
+        return 0
+
+    if args.oracles:
+        for basis_gates in (None, ["cx", "u"]):
+            print(f"transpiled for {'aer_simulator' if basis_gates is None else ', '.join(basis_gates)}:")
+            for row in oracle_report(basis_gates=basis_gates):
+                print(f"  {row['qubits']} qubits, {row['marked']:2d} marked, R={row['iterations']}  "
+                      f"{row['oracle']:8s} depth {row['depth']:5d}  gates {row['gates']:5d}  "
+                      f"transpile {row['transpile_time'] * 1000:6.1f}ms")
+        return 0
+
+    if args.selection:
+        for row in selection_report(confidence=args.confidence or 0.99):
+            selection = "  ".join(f"{i}:{share:.0%}" for i, share in enumerate(row["selection"]) if share >= 0.01)
+            print(f"{row['moves']:2d} moves, {row['marked']} marked  {row['register']:6s} {row['qubits']} qubits, "
+                  f"R={row['iterations']}  gates {row['gates']:4d}  P(marked) per shot {row['marked_probability']:.3f}  "
+                  f"marked selected {row['selected_marked']:6.1%}  mean shots {row['mean_shots']:6.1f}")
+            print(f"    selected: {selection}")
+        return 0
+
+    report = run_bench(depths=args.depths, mode=args.mode, search=args.search, confidence=args.confidence,
+                       policy=args.policy)
+    save_report(report, args.output)
+    for result in report["results"]:
+        print(f"depth {result['depth']}  {result['wall_time']:8.3f}s  {result['nodes_per_second']:9.0f} nodes/s  "
+              f"{result['evaluations_per_second']:9.0f} evals/s  {result['circuits_built']:3d} circuits built  "
+              f"{result['fen']}")
+    print(f"total {report['totals']['wall_time']:.3f}s, {report['totals']['nodes_per_second']:.0f} nodes/s, "
+          f"peak RSS {report['totals']['peak_rss_kb']} KB -> {args.output}")
+    if args.mode != "aer":
+        print(f"{args.mode} mode builds no circuits: circuits built and transpile time are not measured")
+
+    if args.baseline:
+        regressions = compare(report, load_report(args.baseline), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
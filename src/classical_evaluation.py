@@ -1,4 +1,5 @@
 import chess
+import time
 
 
 # Piece-square tables (simplified)
@@ -20,28 +21,80 @@ PIECE_VALUES = {
     chess.KING: 0
 }
 
-def evaluate_position(board: chess.Board) -> int:
+# PIECE_SQUARE_SCORES[color][piece_type][square]: signed material + PSQT contribution of a single piece
+PIECE_SQUARE_SCORES = [[[0] * 64 for _ in range(7)] for _ in chess.COLORS]
+for _color in chess.COLORS:
+    for _piece_type in chess.PIECE_TYPES:
+        for _square in chess.SQUARES:
+            _rank = chess.square_rank(_square) if _color == chess.WHITE else 7 - chess.square_rank(_square)
+            PIECE_SQUARE_SCORES[_color][_piece_type][_square] = (1 if _color == chess.WHITE else -1) * (
+                PIECE_VALUES[_piece_type] + PSQT.get(_piece_type, [0]*8)[_rank])
+
+
+def material_psqt(board: chess.Board) -> int:
     '''
-    Evaluates a board position using Stockfish-inspired heuristics.
+    Material + PSQT part of evaluate_position, summed over the piece bitboards.
     '''
+    score = 0
+    for color in chess.COLORS:
+        table = PIECE_SQUARE_SCORES[color]
+        for piece_type in chess.PIECE_TYPES:
+            scores = table[piece_type]
+            for square in chess.scan_reversed(board.pieces_mask(piece_type, color)):
+                score += scores[square]
+    return score
 
-    if board.is_checkmate():
-        return -99999 if board.turn else 99999
-    if board.is_stalemate() or board.is_insufficient_material():
-        return 0
 
-    score = 0
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece:
-            value = PIECE_VALUES[piece.piece_type]
-            rank = chess.square_rank(square) if piece.color == chess.WHITE else 7 - chess.square_rank(square)
-            psqt_bonus = PSQT.get(piece.piece_type, [0]*8)[rank]
-            modifier = 1 if piece.color == chess.WHITE else -1
-            score += modifier * (value + psqt_bonus)
+def terminal_and_mobility(board: chess.Board) -> tuple[int | None, int]:
+    '''
+    Generates legal moves once and returns (terminal score or None, number of legal moves).
+    The terminal score follows evaluate_position: mate is -99999/99999, stalemate and insufficient material 0.
+    '''
+    mobility = board.legal_moves.count()
+    if mobility == 0:
+        if board.is_check():
+            return (-99999 if board.turn else 99999), 0
+        return 0, 0
+    if board.is_insufficient_material():
+        return 0, mobility
+    return None, mobility
+
+
+def evaluate_position(board: chess.Board, stats=None) -> int:
+    '''
+    Evaluates a board position using Stockfish-inspired heuristics.
+    The evaluation is counted as a leaf, with its time, in stats (a SearchStats) when given.
+    '''
+    if stats is not None:
+        start = time.perf_counter()
+        score = evaluate_position(board)
+        stats.leaves += 1
+        stats.evaluation_time += time.perf_counter() - start
+        return score
+
+    terminal, mobility = terminal_and_mobility(board)
+    if terminal is not None:
+        return terminal
 
     # Add mobility bonus
     # Material score + mobility; more available moves = better position generally; 
     # weighted to not outweight score of a single pawn
-    score += 5 * (len(list(board.legal_moves))) * (1 if board.turn else -1)
-    return score
\ No newline at end of file
+    return material_psqt(board) + 5 * mobility * (1 if board.turn else -1)
+
+
+def evaluate_positions(boards: list[chess.Board]) -> list[int]:
+    '''
+    evaluate_position of every board. Each is loaded into a SearchBoard, which sums material + PSQT once
+    from the piece bitboards, so only the mobility term needs move generation.
+    '''
+    from search_board import SearchBoard  # search_board imports this module
+    return [SearchBoard(board).evaluate() for board in boards]
+
+
+def evaluate_children(board: chess.Board, moves: list[chess.Move]) -> list[int]:
+    '''
+    evaluate_position of every position reached by one of moves, made and unmade on one SearchBoard.
+    '''
+    from search_board import SearchBoard
+    from transposition import encode_move
+    return SearchBoard(board).evaluate_children([encode_move(move) for move in moves])
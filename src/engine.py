@@ -1,10 +1,108 @@
 import chess
 import numpy as np
-from quantum_backend import select_best_quantum_move
+import time
+from collections import namedtuple
+from grover import GroverPolicy, grover_policy
+from position_cache import PositionCache, config_key
+from quantum_backend import search_position, iterative_deepening
+from search import SearchAborted, SearchLimits
+from stats import SearchStats, publish_stats
+from transposition import TranspositionTable, zobrist_key
+
+DEFAULT_DEPTH = 2
+MAX_SEARCH_DEPTH = 32
+
+# Move chosen by a search (None if it was stopped before any depth finished), the depth it came from,
+# and the search's SearchStats (None when the engine was created with profile=False)
+SearchResult = namedtuple("SearchResult", ["move", "depth", "stats"])
 
 class QuantumChessEngine:
-    def __init__(self):
-        pass  # threshold no longer needed here
+    def __init__(self, mode: str = "aer", search: str = "minimax", tt_size_mb: float = 16, workers: int = 1,
+                 profile: bool = True, policy: str | GroverPolicy = "all",
+                 position_cache: str | PositionCache | None = None):
+        # mode: "aer" runs Grover circuits on the simulator, "analytic" samples the closed-form distribution
+        # search: "minimax" runs a circuit per node, "batched" submits all circuits of a ply as one job,
+        # "alphabeta" prunes below the root and runs Grover only over the root moves
+        self.mode = mode
+        self.search = search
+        # policy: where Grover selection runs ("all", "root", "top:K", "branching:B"); other nodes use min/max
+        self.policy = grover_policy(policy)
+        # workers > 1 splits the root moves across a process pool
+        self.workers = workers
+        # profile: collect SearchStats for every search and pass them to the hooks registered in stats
+        self.profile = profile
+        self.tt = TranspositionTable(tt_size_mb) if tt_size_mb > 0 else None
+        # position_cache: persistent (Zobrist key -> score, depth, move) file consulted before every search;
+        # entries are keyed by mode, search and policy as well, so other configurations never share them
+        if isinstance(position_cache, str):
+            position_cache = PositionCache(position_cache)
+        self.position_cache = position_cache
+        self.last_depth = 0
+        self.last_stats = None
+
+    def select_quantum_move(self, board, time_limit: float | None = None, max_depth: int | None = None,
+                            stop_event=None):
+        '''
+        Without limits, searches to DEFAULT_DEPTH. With a time_limit (seconds) and/or max_depth, deepens
+        iteratively and returns the move of the deepest iteration that finished within the budget.
+        Setting stop_event (a threading.Event) from another thread abandons the search; the result is then
+        None unless an iteration had already finished.
+        '''
+        return self.search_move(board, time_limit, max_depth, stop_event).move
+
+    def search_move(self, board, time_limit: float | None = None, max_depth: int | None = None,
+                    stop_event=None) -> SearchResult:
+        '''
+        select_quantum_move, returning the move together with its depth and search statistics.
+        '''
+        stats = SearchStats() if self.profile else None
+        start = time.perf_counter()
+        limits = SearchLimits(time_limit=time_limit, stop_event=stop_event)
+        best_move, best_score, cached = None, 0, None
+        config = config_key(self.mode, self.search, self.policy.spec)
+        if self.position_cache is not None:
+            cached = self.position_cache.lookup(board, max_depth or DEFAULT_DEPTH, config)
+
+        if cached is not None:
+            best_score, best_move = cached
+            self.last_depth = max_depth or DEFAULT_DEPTH
+        elif time_limit is None and max_depth is None:
+            if self.tt is not None:
+                self.tt.new_search()
+            self.last_depth = DEFAULT_DEPTH
+            try:
+                best_score, best_move = search_position(board.copy(), depth=DEFAULT_DEPTH, mode=self.mode,
+                                                        search=self.search, stats=stats, tt=self.tt,
+                                                        workers=self.workers, limits=limits, policy=self.policy)
+            except SearchAborted:
+                self.last_depth = 0
+        else:
+            for _, score, move in self.iterate(board, limits, max_depth or MAX_SEARCH_DEPTH, stats):
+                best_score, best_move = score, move
+
+        if (cached is None and best_move and self.last_depth > 0 and self.position_cache is not None
+                and not self.position_cache.readonly):
+            self.position_cache.store(zobrist_key(board) ^ config, self.last_depth, best_score, best_move)
+
+        self.last_stats = stats
+        if stats is not None:
+            stats.search_time += time.perf_counter() - start
+            publish_stats(stats, {"fen": board.fen(), "move": best_move.uci() if best_move else None,
+                                  "depth": self.last_depth, "mode": self.mode, "search": self.search,
+                                  "policy": self.policy.spec, "cached": cached is not None})
+        return SearchResult(best_move, self.last_depth, stats)
 
-    def select_quantum_move(self, board):
-        return select_best_quantum_move(board, depth=2)
\ No newline at end of file
+    def iterate(self, board, limits: SearchLimits | None = None, max_depth: int = MAX_SEARCH_DEPTH,
+                stats: SearchStats | None = None):
+        '''
+        Iterative deepening with the engine's settings, yielding (depth, score, move) as each depth completes.
+        Front-ends use this to report progress; select_quantum_move keeps only the last result.
+        '''
+        if self.tt is not None:
+            self.tt.new_search()
+        self.last_depth = 0
+        for depth, score, move in iterative_deepening(board, max_depth, mode=self.mode, search=self.search,
+                                                      stats=stats, tt=self.tt, limits=limits, workers=self.workers,
+                                                      policy=self.policy):
+            self.last_depth = depth
+            yield depth, score, move
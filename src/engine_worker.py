@@ -0,0 +1,164 @@
+import queue
+import threading
+import chess
+from engine import QuantumChessEngine
+from search_board import SearchBoard
+from transposition import decode_move, zobrist_key
+
+
+PONDER_REPLIES = 3
+
+
+def likely_replies(board: chess.Board, count: int = PONDER_REPLIES) -> list[chess.Move]:
+    '''
+    The count replies that look best for the side to move after a one-ply evaluation.
+    '''
+    search_board = SearchBoard(board)
+    moves = search_board.legal_moves()
+    if not moves:
+        return []
+    scores = search_board.evaluate_children(moves)
+    ranked = sorted(zip(scores, range(len(moves))), reverse=board.turn == chess.WHITE)
+    return [decode_move(moves[i]) for _, i in ranked[:count]]
+
+
+class EngineWorker:
+    '''
+    Runs QuantumChessEngine searches on a background thread.
+
+    request_move() returns immediately and poll() hands back the move once it is ready. After the engine
+    has moved, ponder() pre-searches the engine's answer to the opponent's most likely replies; when the
+    opponent then plays one of them, the pondered move is returned without a new search.
+    '''
+
+    def __init__(self, engine: QuantumChessEngine | None = None, time_limit: float | None = None,
+                 ponder_replies: int = PONDER_REPLIES, on_result=None):
+        self.engine = engine if engine is not None else QuantumChessEngine()
+        # Called without arguments whenever a move becomes available to poll(), possibly from the worker thread
+        self.on_result = on_result
+        self.time_limit = time_limit
+        self.ponder_replies = ponder_replies
+        self.thinking = False
+        self.ponder_hits = 0
+
+        self._lock = threading.Lock()
+        self._tasks = queue.Queue()
+        self._result = None
+        self._pending_key = None
+        self._move_event = threading.Event()
+        self._pondered = {}
+        self._ponder_events = {}
+        self._thread = threading.Thread(target=self._run, name="engine-worker", daemon=True)
+        self._thread.start()
+
+    def request_move(self, board: chess.Board) -> None:
+        '''
+        Starts searching a move for board; the result becomes available through poll().
+        '''
+        key = zobrist_key(board)
+        with self._lock:
+            self._move_event.set()
+            if key in self._pondered:
+                self.ponder_hits += 1
+                self._result = self._pondered.pop(key)
+                self._pending_key = None
+                self.thinking = False
+                self._cancel_ponder()
+                self._notify()
+                return
+
+            self._result = None
+            self._pending_key = key
+            self.thinking = True
+            # Keep a ponder search that is already working on this exact position; drop the rest
+            running = self._ponder_events.pop(key, None)
+            self._cancel_ponder()
+            if running is not None:
+                self._ponder_events[key] = running
+                return
+            self._move_event = threading.Event()
+            self._tasks.put(("move", board.copy(), key, self._move_event))
+        return
+
+    def poll(self) -> chess.Move | None:
+        '''
+        Returns the requested move once, when it is ready, and None otherwise.
+        '''
+        with self._lock:
+            result, self._result = self._result, None
+        return result
+
+    def ponder(self, board: chess.Board) -> None:
+        '''
+        Pre-searches the engine's answer to each of the opponent's likely replies in board.
+        '''
+        with self._lock:
+            self._cancel_ponder()
+            self._pondered.clear()
+            for reply in likely_replies(board, self.ponder_replies):
+                position = board.copy()
+                position.push(reply)
+                key = zobrist_key(position)
+                stop_event = threading.Event()
+                self._ponder_events[key] = stop_event
+                self._tasks.put(("ponder", position, key, stop_event))
+        return
+
+    def stop(self) -> None:
+        '''
+        Abandons pondering and any pending request.
+        '''
+        with self._lock:
+            self._cancel_ponder()
+            self._pondered.clear()
+            self._move_event.set()
+            self._pending_key = None
+            self._result = None
+            self.thinking = False
+        return
+
+    def shutdown(self) -> None:
+        self.stop()
+        self._tasks.put(None)
+        self._thread.join(timeout=5)
+        return
+
+    def _notify(self) -> None:
+        if self.on_result is not None:
+            self.on_result()
+        return
+
+    def _cancel_ponder(self) -> None:
+        # Caller holds the lock
+        for stop_event in self._ponder_events.values():
+            stop_event.set()
+        self._ponder_events.clear()
+        return
+
+    def _run(self) -> None:
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            kind, board, key, stop_event = task
+            if stop_event.is_set():
+                continue
+
+            move = self.engine.select_quantum_move(board, time_limit=self.time_limit, stop_event=stop_event)
+
+            with self._lock:
+                if kind == "ponder":
+                    if self._ponder_events.get(key) is stop_event:
+                        del self._ponder_events[key]
+                    if stop_event.is_set() or move is None:
+                        continue
+                    if self._pending_key != key:
+                        self._pondered[key] = move
+                        continue
+                    self.ponder_hits += 1
+                elif stop_event.is_set() or self._pending_key != key:
+                    continue
+                self._result = move
+                self._pending_key = None
+                self.thinking = False
+            self._notify()
@@ -0,0 +1,682 @@
+from collections import Counter, OrderedDict, namedtuple
+from statistics import NormalDist
+from typing import TYPE_CHECKING
+import numpy as np
+import math
+import threading
+import time
+
+if TYPE_CHECKING:
+    from qiskit import QuantumCircuit
+
+
+EXECUTION_MODES = ("aer", "analytic")
+
+# "diagonal" applies the oracle as one diagonal phase gate over the marked set; "mcx" is the original
+# X + multi-controlled-X chain per marked index, kept for comparison
+ORACLES = ("diagonal", "mcx")
+DEFAULT_ORACLE = "diagonal"
+
+# "exact" amplifies within a uniform superposition of exactly num_moves basis states, with the iteration count
+# that is optimal for that subspace; "padded" is the original Hadamard register padded to a power of two, whose
+# surplus states are folded back onto the moves by index modulo num_moves
+REGISTERS = ("exact", "padded")
+DEFAULT_REGISTER = "exact"
+
+# Adaptive shots: circuits are sampled MIN_ADAPTIVE_SHOTS at a time, doubling the total each round, until
+# the leading outcome is separated from the runner-up at the configured confidence or the shot cap is reached
+MIN_ADAPTIVE_SHOTS = 32
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+# Qiskit and Aer are imported on first use (or by warm_up), so importing the engine stays fast
+QiskitStack = namedtuple("QiskitStack", ["QuantumCircuit", "transpile", "DiagonalGate", "Aer"])
+
+_rng = np.random.default_rng()
+_qiskit = None
+_backend = None
+_backend_lock = threading.Lock()
+_shot_confidence = None
+
+
+def seed_analytic_rng(seed: int | None) -> None:
+    '''
+    Reseeds the generator used to draw shots in analytic mode.
+    '''
+    global _rng
+    _rng = np.random.default_rng(seed)
+    return
+
+
+def configure_adaptive_shots(confidence: float | None) -> None:
+    '''
+    Sets the default confidence for adaptive shot allocation (e.g. 0.99), or None to always run the full shot count.
+    '''
+    global _shot_confidence
+    _check_confidence(confidence)
+    _shot_confidence = confidence
+    return
+
+
+def adaptive_shot_confidence() -> float | None:
+    return _shot_confidence
+
+
+def _check_confidence(confidence: float | None) -> None:
+    if confidence is not None and not 0.5 <= confidence < 1:
+        raise ValueError(f"confidence must be in [0.5, 1), got {confidence}")
+    return
+
+
+def is_separated(counts, confidence: float, marked_indices: list[int] | None = None) -> bool:
+    '''
+    Sign test on the leading outcome and its runner-up: True once the leader's excess is significant at the
+    given one-sided confidence (normal approximation to the binomial).
+    With marked_indices, counts is indexed by basis state and the runner-up is the most frequent outcome on
+    the other side of the oracle: marked states are equally likely by construction, so sampling cannot (and
+    need not) separate them from each other.
+    '''
+    counts = np.asarray(counts)
+    if counts.size == 0:
+        return False
+    leader_index = int(np.argmax(counts))
+    leader = int(counts[leader_index])
+    if marked_indices is None:
+        rivals = np.delete(counts, leader_index)
+    else:
+        is_marked = np.zeros(counts.size, dtype=bool)
+        is_marked[marked_indices] = True
+        rivals = counts[is_marked != is_marked[leader_index]]
+    runner_up = int(rivals.max()) if rivals.size else 0
+    z = NormalDist().inv_cdf(confidence)
+    return leader - runner_up > z * math.sqrt(leader + runner_up)
+
+
+def _next_increment(used: int, max_shots: int) -> int:
+    return min(max(MIN_ADAPTIVE_SHOTS, used), max_shots - used)
+
+
+def sample_adaptive(probs: np.ndarray, max_shots: int, confidence: float,
+                    marked_indices: list[int] | None = None) -> tuple[np.ndarray, int]:
+    '''
+    Draws shots from probs in increments until the leader is separated or max_shots is reached.
+    Returns the accumulated counts and the number of shots used.
+    '''
+    counts = np.zeros(len(probs), dtype=np.int64)
+    used = 0
+    while used < max_shots:
+        step = _next_increment(used, max_shots)
+        counts += _rng.multinomial(step, probs)
+        used += step
+        if is_separated(counts, confidence, marked_indices):
+            break
+    return counts, used
+
+
+def _counts_array(counts: dict[str, int], num_states: int) -> np.ndarray:
+    # Aer counts keyed by bitstring -> counts indexed by basis state
+    array = np.zeros(num_states, dtype=np.int64)
+    for bits, count in counts.items():
+        array[int(bits, 2)] = count
+    return array
+
+
+def run_adaptive(circuits: list, max_shots: int, confidence: float,
+                 marked: list[list[int]] | None = None) -> tuple[list[dict[str, int]], list[int]]:
+    '''
+    Runs transpiled circuits on the shared backend in increments; each round submits the circuits whose
+    leader is not yet separated as one job. marked optionally gives each circuit's marked indices
+    (see is_separated). Returns the accumulated counts and shots used per circuit.
+    '''
+    totals = [Counter() for _ in circuits]
+    used = [0] * len(circuits)
+    pending = list(range(len(circuits)))
+    while pending:
+        step = _next_increment(used[pending[0]], max_shots)
+        result = get_backend().run([circuits[i] for i in pending], shots=step).result() # type: ignore
+        for j, i in enumerate(pending):
+            totals[i].update(result.get_counts(j))
+            used[i] += step
+
+        still_pending = []
+        for i in pending:
+            if used[i] >= max_shots:
+                continue
+            if marked is None:
+                separated = is_separated(list(totals[i].values()), confidence)
+            else:
+                separated = is_separated(_counts_array(totals[i], 2 ** circuits[i].num_clbits), confidence, marked[i])
+            if not separated:
+                still_pending.append(i)
+        pending = still_pending
+    return [dict(counts) for counts in totals], used
+
+
+def grover_iterations(N: int, num_marked: int) -> int:
+    '''
+    Number of Grover iterations used for N basis states with num_marked solutions.
+    '''
+    return max(1, int(math.ceil(np.pi / 4 * np.sqrt(N / num_marked))))
+
+
+def optimal_iterations(num_states: int, num_marked: int) -> int:
+    '''
+    Iteration count that maximises the marked probability sin^2((2R + 1) theta), sin(theta) = sqrt(M / N):
+    floor(pi / (4 theta)). Zero when half or more of the states are marked, where amplifying would overshoot.
+    '''
+    return int(np.pi / (4 * np.arcsin(np.sqrt(num_marked / num_states))))
+
+
+def qiskit_stack() -> QiskitStack:
+    '''
+    Returns the Qiskit classes used here, importing qiskit and qiskit_aer on the first call.
+    '''
+    global _qiskit
+    if _qiskit is None:
+        from qiskit import QuantumCircuit, transpile
+        from qiskit.circuit.library import DiagonalGate
+        from qiskit_aer import Aer
+        _qiskit = QiskitStack(QuantumCircuit, transpile, DiagonalGate, Aer)
+    return _qiskit
+
+
+def _append_mcx_oracle(qc: "QuantumCircuit", n: int, marked_indices: list[int]) -> None:
+    # Phase flip of each marked index in turn: X gates onto |1..1>, H-MCX-H (a multi-controlled Z), undo the X gates
+    for idx in marked_indices:
+        bits = format(idx, f"0{n}b")
+        for i, bit in enumerate(reversed(bits)):
+            if bit == "0": qc.x(i)
+        if n > 1:
+            qc.h(n - 1)
+            qc.mcx(list(range(n - 1)), n - 1)
+            qc.h(n - 1)
+        else:
+            qc.z(0)
+        for i, bit in enumerate(reversed(bits)):
+            if bit == "0": qc.x(i)
+    return
+
+
+def _append_zero_reflection(qc: "QuantumCircuit", n: int) -> None:
+    # Phase flip of |0..0>: X gates onto |1..1>, a multi-controlled Z, undo the X gates
+    qc.x(range(n))
+    if n > 1:
+        qc.h(n - 1)
+        qc.mcx(list(range(n - 1)), n - 1)
+        qc.h(n - 1)
+    else:
+        qc.z(0)
+    qc.x(range(n))
+    return
+
+
+def _uniform_state_gate(n: int, num_states: int):
+    '''
+    Exact preparation of the uniform superposition of basis states 0..num_states-1 (num_states not a power
+    of two) in O(n) gates.
+
+    With num_states = 2**a_m + ... + 2**a_0 (a_m = n - 1), the states split into one block per set bit a_j:
+    the values that match num_states above bit a_j, have a 0 at a_j and anything below. A chain of rotations,
+    each controlled by the set bit above being 1, leaves qubit a_j at 0 with the block's probability
+    2**a_j / num_states. Every other qubit is then put in superposition iff the nearest set bit above it is
+    0, low qubits first so that each control is read before it is itself changed.
+    '''
+    qc = qiskit_stack().QuantumCircuit(n)
+    set_bits = [bit for bit in range(n) if num_states >> bit & 1]
+    for i in range(len(set_bits) - 1, 0, -1):
+        bit = set_bits[i]
+        theta = 2 * np.arccos(np.sqrt(2 ** bit / (num_states % 2 ** (bit + 1))))
+        if i == len(set_bits) - 1:
+            qc.ry(theta, bit)
+        else:
+            qc.cry(theta, set_bits[i + 1], bit)
+    for qubit in range(n - 1):
+        above = next(bit for bit in set_bits if bit > qubit)
+        if above == set_bits[0]:
+            qc.h(qubit) # a_0 is never rotated, so its control always holds
+        else:
+            qc.ch(above, qubit, ctrl_state=0)
+    return qc.to_gate(label="prepare")
+
+
+def build_grover_circuit(n: int, marked_indices: list[int], R: int, oracle: str = DEFAULT_ORACLE,
+                         num_states: int | None = None) -> "QuantumCircuit":
+    '''
+    Builds the n-qubit Grover circuit (without measurements) that amplifies marked_indices for R iterations.
+    oracle picks how the phase flip is built (see ORACLES); both give the same state.
+    With num_states below 2**n the start state is the uniform superposition of basis states 0..num_states-1,
+    prepared exactly, and the diffusion reflects about that state, so no amplitude leaves the subspace.
+    '''
+    if oracle not in ORACLES:
+        raise ValueError(f"Unknown oracle {oracle!r}, expected one of {ORACLES}")
+    qiskit = qiskit_stack()
+    qc = qiskit.QuantumCircuit(n)
+    if num_states is None or num_states == 2 ** n:
+        prepare = None
+        qc.h(range(n))
+    else:
+        prepare = _uniform_state_gate(n, num_states)
+        qc.append(prepare, range(n))
+
+    if oracle == "diagonal":
+        # -1 on every marked basis state (qubit 0 is the least significant bit, as in the counts)
+        phases = np.ones(2 ** n)
+        phases[list(set(marked_indices))] = -1
+        diagonal = qiskit.DiagonalGate(phases.tolist())
+
+    for _ in range(R):
+        # Oracle
+        if oracle == "diagonal":
+            qc.append(diagonal, range(n))
+        else:
+            _append_mcx_oracle(qc, n, marked_indices)
+        qc.barrier()
+
+        # Diffusion: reflection about the start state
+        if prepare is None:
+            qc.h(range(n))
+            _append_zero_reflection(qc, n)
+            qc.h(range(n))
+        else:
+            qc.append(prepare.inverse(), range(n))
+            _append_zero_reflection(qc, n)
+            qc.append(prepare, range(n))
+
+    return qc
+
+
+def circuit_metrics(n: int, marked_indices: list[int], R: int, oracle: str = DEFAULT_ORACLE,
+                    basis_gates: list[str] | None = None, num_states: int | None = None) -> dict:
+    '''
+    Depth, gate count and transpile time of the measured Grover circuit, transpiled for the Aer backend or,
+    with basis_gates (e.g. ["cx", "u"]), for a generic gate set.
+    '''
+    qc = build_grover_circuit(n, marked_indices, R, oracle, num_states)
+    qc.measure_all()
+    start = time.perf_counter()
+    if basis_gates is None:
+        transpiled_qc = qiskit_stack().transpile(qc, get_backend())
+    else:
+        transpiled_qc = qiskit_stack().transpile(qc, basis_gates=basis_gates)
+    return {"depth": transpiled_qc.depth(), "gates": transpiled_qc.size(),
+            "transpile_time": time.perf_counter() - start}
+
+
+def get_backend():
+    '''
+    Returns the process-wide Aer simulator handle, creating it on first use.
+    '''
+    global _backend
+    # The lock makes a search that starts during warm_up wait for it instead of initialising Aer twice
+    with _backend_lock:
+        if _backend is None:
+            _backend = qiskit_stack().Aer.get_backend("aer_simulator")
+    return _backend
+
+
+def _warm_up() -> None:
+    # Transpiling and running a trivial circuit also loads the transpiler passes and Aer's simulator
+    qiskit = qiskit_stack()
+    qc = qiskit.QuantumCircuit(1)
+    qc.h(0)
+    qc.measure_all()
+    backend = get_backend()
+    backend.run(qiskit.transpile(qc, backend), shots=1).result()
+    return
+
+
+def warm_up(background: bool = True) -> threading.Thread | None:
+    '''
+    Imports Qiskit and initialises the Aer backend ahead of the first quantum search, on a daemon thread
+    (returned) unless background is False. Analytic and classical searches never need it.
+    '''
+    if not background:
+        _warm_up()
+        return None
+    thread = threading.Thread(target=_warm_up, name="qiskit-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+class CircuitCache:
+    '''
+    LRU cache of transpiled, measured Grover circuits keyed by (qubit count, marked indices, iterations, oracle,
+    register size).
+    Each entry keeps the circuit's gate count alongside it so instrumentation does not have to recount.
+    '''
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._circuits = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, n: int, marked_indices: list[int], R: int, stats=None, oracle: str = DEFAULT_ORACLE,
+            num_states: int | None = None):
+        '''
+        Returns the transpiled circuit, building it on a miss.
+        When stats is given, its gate count is added to stats.gates and a miss is counted in
+        stats.circuits_built, build_time and transpile_time.
+        '''
+        key = (n, tuple(marked_indices), R, oracle, num_states)
+        with self._lock:
+            entry = self._circuits.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._circuits.move_to_end(key)
+            else:
+                self.misses += 1
+
+        if entry is None:
+            start = time.perf_counter()
+            qc = build_grover_circuit(n, marked_indices, R, oracle, num_states)
+            qc.measure_all()
+            built = time.perf_counter()
+            transpiled_qc = qiskit_stack().transpile(qc, get_backend())
+            entry = (transpiled_qc, transpiled_qc.size())
+            if stats is not None:
+                stats.circuits_built += 1
+                stats.build_time += built - start
+                stats.transpile_time += time.perf_counter() - built
+
+            with self._lock:
+                if self.maxsize > 0:
+                    self._circuits[key] = entry
+                    self._evict()
+
+        if stats is not None:
+            stats.gates += entry[1]
+        return entry[0]
+
+    def resize(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+        return
+
+    def clear(self) -> None:
+        with self._lock:
+            self._circuits.clear()
+            self.hits = 0
+            self.misses = 0
+        return
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._circuits))
+
+    def _evict(self) -> None:
+        while len(self._circuits) > self.maxsize:
+            self._circuits.popitem(last=False)
+        return
+
+
+circuit_cache = CircuitCache()
+
+
+def configure_circuit_cache(maxsize: int) -> None:
+    '''
+    Sets the size bound of the process-wide circuit cache, evicting least recently used entries if needed.
+    '''
+    circuit_cache.resize(maxsize)
+    return
+
+
+def circuit_cache_info() -> CacheInfo:
+    return circuit_cache.info()
+
+
+def run_circuit(qc, shots=1024, stats=None, confidence: float | None = None):
+    '''
+    Measures, transpiles and runs qc, returning the counts. The circuit, its qubits, gates and shots and
+    the transpile and simulation time are added to stats (a SearchStats) when given.
+    With a confidence, shots is only a cap: sampling stops early once the leading outcome is separated.
+    '''
+    _check_confidence(confidence)
+    qc.measure_all()
+    backend = get_backend()
+    start = time.perf_counter()
+    transpiled_qc = qiskit_stack().transpile(qc, backend)
+    transpiled = time.perf_counter()
+    if confidence is None:
+        counts = backend.run(transpiled_qc, shots=shots).result().get_counts() # type: ignore
+        used = shots
+    else:
+        (counts,), (used,) = run_adaptive([transpiled_qc], shots, confidence)
+    if stats is not None:
+        stats.circuits += 1
+        stats.qubits += qc.num_qubits
+        stats.gates += transpiled_qc.size()
+        stats.shots += used
+        stats.circuit_shots.append(used)
+        stats.transpile_time += transpiled - start
+        stats.simulation_time += time.perf_counter() - transpiled
+    return counts
+
+
+def grover_statevector(n: int, marked_indices: list[int], R: int, num_states: int | None = None) -> np.ndarray:
+    '''
+    Closed-form amplitudes after R Grover iterations on a uniform start state over the first num_states
+    (default 2**n) basis states of n qubits (up to global phase).
+
+    With M of N states marked and sin(theta) = sqrt(M / N), every marked state carries
+    sin((2R + 1) theta) / sqrt(M) and every unmarked state cos((2R + 1) theta) / sqrt(N - M).
+    States outside the register keep amplitude 0.
+    '''
+    N = 2 ** n if num_states is None else num_states
+    marked = np.unique(np.asarray(marked_indices, dtype=np.int64))
+    M = len(marked)
+    theta = np.arcsin(np.sqrt(M / N))
+    angle = (2 * R + 1) * theta
+
+    amplitudes = np.zeros(2 ** n)
+    amplitudes[:N] = np.cos(angle) / np.sqrt(N - M) if N > M else 0.0
+    amplitudes[marked] = np.sin(angle) / np.sqrt(M)
+    return amplitudes
+
+
+def grover_probabilities(n: int, marked_indices: list[int], R: int, num_states: int | None = None) -> np.ndarray:
+    '''
+    Measurement distribution over the 2**n basis states after R Grover iterations.
+    '''
+    probs = grover_statevector(n, marked_indices, R, num_states) ** 2
+    return probs / probs.sum()
+
+
+def sample_analytic_counts(n: int, marked_indices: list[int], R: int, shots: int = 1024,
+                           num_states: int | None = None) -> dict[str, int]:
+    '''
+    Draws shots from the analytic distribution and returns Aer-style counts keyed by bitstring.
+    '''
+    counts = _rng.multinomial(shots, grover_probabilities(n, marked_indices, R, num_states))
+    return {format(i, f"0{n}b"): int(c) for i, c in enumerate(counts) if c}
+
+
+def mark_moves(move_scores: list[int], is_white: bool) -> list[int]:
+    '''
+    Adaptive thresholding: marks the moves whose scores are at least half a std. dev. better than the mean.
+    '''
+    mu = np.mean(move_scores)
+    sigma = np.std(move_scores)
+    theta = mu + 0.5 * sigma if is_white else mu - 0.5 * sigma
+    return [i for i, s in enumerate(move_scores)
+            if (s >= theta if is_white else s <= theta)]
+
+
+def grover_register(num_moves: int, num_marked: int, register: str = DEFAULT_REGISTER) -> tuple[int, int, int]:
+    '''
+    Qubit count, iteration count and number of basis states in superposition used to select among num_moves
+    moves (see REGISTERS).
+    '''
+    if register not in REGISTERS:
+        raise ValueError(f"Unknown register {register!r}, expected one of {REGISTERS}")
+    n = int(np.ceil(np.log2(num_moves)))
+    if register == "exact":
+        return n, optimal_iterations(num_moves, num_marked), num_moves
+    return n, grover_iterations(2 ** n, num_marked), 2 ** n
+
+
+def grover_select_batch(jobs: list[tuple[int, list[int]]], mode: str = "aer", shots: int = 1024,
+                        stats=None, confidence: float | None = None, register: str = DEFAULT_REGISTER) -> list[int]:
+    '''
+    Runs one Grover selection per (num_moves, marked_indices) job and returns the selected index of each.
+    In "aer" mode every circuit is submitted in a single backend job so the simulator can parallelise across them.
+    confidence (default: the configure_adaptive_shots setting) turns shots into a cap for adaptive sampling.
+    register chooses between the exact and the padded register (see REGISTERS).
+    When stats (a SearchStats) is given, the circuits run, their qubits, Grover iterations and shots, and
+    for "aer" the gates, circuits built and time spent building and transpiling are added to it, together
+    with the simulation (or analytic sampling) time and the shots used by each circuit.
+    '''
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"Unknown execution mode {mode!r}, expected one of {EXECUTION_MODES}")
+    confidence = _shot_confidence if confidence is None else confidence
+    _check_confidence(confidence)
+    if not jobs:
+        return []
+
+    registers = [grover_register(num_moves, len(marked_indices), register) for num_moves, marked_indices in jobs]
+    if stats is not None:
+        stats.circuits += len(jobs)
+        stats.qubits += sum(n for n, _, _ in registers)
+        stats.grover_iterations += sum(R for _, R, _ in registers)
+
+    if mode == "analytic":
+        start = time.perf_counter()
+        selected = []
+        used = []
+        for (num_moves, marked_indices), (n, R, num_states) in zip(jobs, registers):
+            # Same shot statistics as the simulator, without building a circuit
+            probs = grover_probabilities(n, marked_indices, R, num_states)
+            if confidence is None:
+                counts, circuit_shots = _rng.multinomial(shots, probs), shots
+            else:
+                counts, circuit_shots = sample_adaptive(probs, shots, confidence, marked_indices)
+            selected.append(int(np.argmax(counts)) % num_moves)
+            used.append(circuit_shots)
+    else:
+        circuits = [circuit_cache.get(n, marked_indices, R, stats, num_states=num_states)
+                    for (_, marked_indices), (n, R, num_states) in zip(jobs, registers)]
+        start = time.perf_counter()
+        if confidence is None:
+            result = get_backend().run(circuits, shots=shots).result() # type: ignore
+            all_counts = [result.get_counts(i) for i in range(len(jobs))]
+            used = [shots] * len(jobs)
+        else:
+            all_counts, used = run_adaptive(circuits, shots, confidence, [marked for _, marked in jobs])
+        selected = []
+        for (num_moves, _), counts in zip(jobs, all_counts):
+            best_bin = max(counts, key=counts.get)
+            selected.append(int(best_bin, 2) % num_moves)
+
+    if stats is not None:
+        stats.simulation_time += time.perf_counter() - start
+        stats.shots += sum(used)
+        stats.circuit_shots.extend(used)
+    return selected
+
+
+def grover_select(num_moves: int, marked_indices: list[int], mode: str = "aer", shots: int = 1024,
+                  stats=None, confidence: float | None = None, register: str = DEFAULT_REGISTER) -> int:
+    '''
+    Runs Grover amplification over num_moves candidates and returns the index of the most frequent outcome.
+    '''
+    return grover_select_batch([(num_moves, marked_indices)], mode=mode, shots=shots, stats=stats,
+                               confidence=confidence, register=register)[0]
+
+
+class GroverPolicy:
+    '''
+    Decides which nodes pick their move with Grover selection; every other node takes the classical min/max.
+
+    max_ply is the deepest ply (root = 0) that uses Grover and min_branching the fewest legal moves a node
+    needs; None leaves either unrestricted. Policies are written as specs: "all", "root", "top:K" (the top
+    K plies) and "branching:B", joined with "," to require all of them (e.g. "top:2,branching:20").
+    '''
+    __slots__ = ("max_ply", "min_branching")
+
+    def __init__(self, max_ply: int | None = None, min_branching: int | None = None):
+        self.max_ply = max_ply
+        self.min_branching = min_branching
+
+    @classmethod
+    def parse(cls, spec: str) -> "GroverPolicy":
+        policy = cls()
+        for term in spec.replace(" ", "").lower().split(","):
+            name, _, value = term.partition(":")
+            if name == "all" and not value:
+                continue
+            elif name == "root" and not value:
+                policy.max_ply = 0
+            elif name == "top" and value.isdigit() and int(value) > 0:
+                policy.max_ply = int(value) - 1
+            elif name == "branching" and value.isdigit():
+                policy.min_branching = int(value)
+            else:
+                raise ValueError(f"Unknown Grover policy {spec!r}; expected all, root, top:K or branching:B")
+        return policy
+
+    @property
+    def spec(self) -> str:
+        terms = []
+        if self.max_ply is not None:
+            terms.append("root" if self.max_ply == 0 else f"top:{self.max_ply + 1}")
+        if self.min_branching is not None:
+            terms.append(f"branching:{self.min_branching}")
+        return ",".join(terms) or "all"
+
+    def uses_grover(self, ply: int, num_moves: int) -> bool:
+        if self.max_ply is not None and ply > self.max_ply:
+            return False
+        return self.min_branching is None or num_moves >= self.min_branching
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, GroverPolicy) and self.spec == other.spec
+
+    def __hash__(self) -> int:
+        return hash(self.spec)
+
+    def __repr__(self) -> str:
+        return f"GroverPolicy.parse({self.spec!r})"
+
+
+ALL_NODES = GroverPolicy()
+
+
+def grover_policy(policy: "str | GroverPolicy | None") -> GroverPolicy:
+    '''
+    Accepts a GroverPolicy, a policy spec or None (Grover at every node).
+    '''
+    if policy is None:
+        return ALL_NODES
+    if isinstance(policy, str):
+        return GroverPolicy.parse(policy)
+    return policy
+
+
+def best_index(move_scores: list[int], is_white: bool) -> int:
+    '''
+    Classical min/max: index of the best score for the side to move.
+    '''
+    return int(np.argmax(move_scores) if is_white else np.argmin(move_scores))
+
+
+def select_from_scores(move_scores: list[int], is_white: bool, mode: str = "aer", shots: int = 1024,
+                       stats=None, confidence: float | None = None) -> int:
+    '''
+    Picks the index of a move from its scores: the only move, the best move when nothing is marked,
+    otherwise a Grover selection over the marked moves.
+    '''
+    if len(move_scores) == 1:
+        return 0
+
+    marked_indices = mark_moves(move_scores, is_white)
+    if len(marked_indices) == 0:
+        return best_index(move_scores, is_white)
+
+    return grover_select(len(move_scores), marked_indices, mode=mode, shots=shots, stats=stats,
+                         confidence=confidence)
@@ -1,102 +1,199 @@
+import os
 import pygame
 import chess
 from engine import QuantumChessEngine
+from engine_worker import EngineWorker
 
 WIDTH, HEIGHT = 512, 512
 SQ_SIZE = HEIGHT // 8
-FPS = 30
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets")
+PIECES = ['wP','wR','wN','wB','wQ','wK','bP','bR','bN','bB','bQ','bK']
+
+# Posted from the engine thread when a move is ready, so the idle event loop wakes up to collect it
+ENGINE_MOVE_EVENT = pygame.USEREVENT + 1
+
+# Scaled piece surfaces by square size; a reset or resize reuses them instead of reloading the PNGs
+_image_cache = {}
+
+
+def load_images(size: int = SQ_SIZE) -> dict:
+    if size not in _image_cache:
+        _image_cache[size] = {p: pygame.transform.scale(pygame.image.load(os.path.join(ASSETS_DIR, f"{p}.png")),
+                                                        (size, size)) for p in PIECES}
+    return _image_cache[size]
+
+
+def square_rect(square: int) -> pygame.Rect:
+    col = chess.square_file(square)
+    row = 7 - chess.square_rank(square)
+    return pygame.Rect(col*SQ_SIZE, row*SQ_SIZE, SQ_SIZE, SQ_SIZE)
+
 
 class ChessGUI:
+    '''
+    Event-driven board: the loop blocks in pygame.event.wait until input arrives or the engine posts a move.
+    The empty board is rendered once to a cached surface and only squares whose piece changed are redrawn;
+    overlays (thinking indicator, dialogs) force one full redraw when they appear or disappear.
+    '''
+
     def __init__(self):
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Quantum Chess Engine")
-        self.clock = pygame.time.Clock()
         self.images = self.load_images()
+        self.board_surface = self.render_board_surface()
         self.board = chess.Board()
         self.engine = QuantumChessEngine()
+        # Searches run on a background thread so the event loop keeps running while the engine thinks
+        self.worker = EngineWorker(self.engine, on_result=lambda: pygame.event.post(pygame.event.Event(ENGINE_MOVE_EVENT)))
         self.selected_square = None
         self.reset_game()
         return
 
     def load_images(self):
-        pieces = ['wP','wR','wN','wB','wQ','wK','bP','bR','bN','bB','bQ','bK']
-        return {p: pygame.transform.scale(pygame.image.load(f"../assets/{p}.png"), (SQ_SIZE, SQ_SIZE)) for p in pieces}
+        return load_images(SQ_SIZE)
 
-    def draw_board(self):
+    def render_board_surface(self):
+        surface = pygame.Surface((WIDTH, HEIGHT))
         colors = [pygame.Color("white"), pygame.Color("gray")]
         for r in range(8):
             for c in range(8):
                 color = colors[(r + c) % 2]
-                pygame.draw.rect(self.screen, color, pygame.Rect(c*SQ_SIZE, r*SQ_SIZE, SQ_SIZE, SQ_SIZE))
+                pygame.draw.rect(surface, color, pygame.Rect(c*SQ_SIZE, r*SQ_SIZE, SQ_SIZE, SQ_SIZE))
+        return surface
+
+    def draw_board(self):
+        self.screen.blit(self.board_surface, (0, 0))
+        return
+
+    def draw_piece(self, square, piece):
+        piece_code = ('w' if piece.color == chess.WHITE else 'b') + piece.symbol().upper()
+        self.screen.blit(self.images[piece_code], square_rect(square))
         return
 
     def draw_pieces(self):
-        for square in chess.SQUARES:
-            piece = self.board.piece_at(square)
-            if piece:
-                col = chess.square_file(square)
-                row = 7 - chess.square_rank(square)
-                piece_code = ('w' if piece.color == chess.WHITE else 'b') + piece.symbol().upper()
-                self.screen.blit(self.images[piece_code], pygame.Rect(col*SQ_SIZE, row*SQ_SIZE, SQ_SIZE, SQ_SIZE))
+        for square, piece in self.board.piece_map().items():
+            self.draw_piece(square, piece)
         return
-    
+
+    def invalidate(self):
+        '''
+        Forces the next render to redraw the whole window.
+        '''
+        self.drawn_pieces = None
+        return
+
+    def render(self):
+        '''
+        Brings the window up to date with the board, touching only the squares that changed since the last call.
+        '''
+        pieces = self.board.piece_map()
+        thinking = self.worker.thinking
+        if self.drawn_pieces is None or thinking != self.drawn_thinking:
+            self.draw_board()
+            self.draw_pieces()
+            if thinking:
+                self.draw_thinking()
+            if self.game_over:
+                self.show_endgame_message(self.endgame_message)
+            pygame.display.flip()
+        else:
+            dirty = []
+            for square in set(pieces) | set(self.drawn_pieces):
+                if pieces.get(square) != self.drawn_pieces.get(square):
+                    rect = square_rect(square)
+                    self.screen.blit(self.board_surface, rect, rect)
+                    if square in pieces:
+                        self.draw_piece(square, pieces[square])
+                    dirty.append(rect)
+            if dirty:
+                pygame.display.update(dirty)
+        self.drawn_pieces = pieces
+        self.drawn_thinking = thinking
+        return
+
     def reset_game(self):
         self.board = chess.Board()
         self.selected_square = None
         self.game_over = False
+        self.endgame_message = None
+        self.worker.stop()
         self.play_as_white = self.ask_player_color()
         # Quantum engine plays first if player chose black
         if not self.play_as_white:
-            ai_move = self.engine.select_quantum_move(self.board)
-            if ai_move:
-                self.board.push(ai_move)
+            self.worker.request_move(self.board)
+        self.invalidate()
+        return
+
+    def poll_engine(self):
+        ai_move = self.worker.poll()
+        if ai_move:
+            self.board.push(ai_move)
+            # Ponder on the human's time
+            if not self.board.is_game_over():
+                self.worker.ponder(self.board)
+            self.check_game_over()
+        return
+
+    def check_game_over(self):
+        if self.board.is_checkmate():
+            winner = "White" if self.board.turn == chess.BLACK else "Black"
+            self.endgame_message = f"Checkmate! {winner} wins."
+        elif self.board.is_stalemate():
+            self.endgame_message = "Stalemate! Game drawn."
+        else:
+            return
+        self.game_over = True
+        self.invalidate()
         return
-    
-    
+
+    def draw_thinking(self):
+        font = pygame.font.SysFont(None, 24)
+        txt = font.render("Thinking...", True, pygame.Color("white"))
+        box = pygame.Rect(WIDTH - txt.get_width() - 16, 4, txt.get_width() + 12, txt.get_height() + 8)
+        pygame.draw.rect(self.screen, pygame.Color("black"), box)
+        self.screen.blit(txt, (box.left + 6, box.top + 4))
+        return
+
+    def wait_for_click(self):
+        '''
+        Blocks until the mouse is pressed and returns the position; closing the window exits.
+        '''
+        while True:
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT:
+                self.worker.shutdown()
+                pygame.quit()
+                exit()
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                return event.pos
+
     def ask_player_color(self):
         font = pygame.font.SysFont(None, 32)
         white_rect = pygame.Rect(WIDTH//4 - 60, HEIGHT//2 - 25, 120, 50)
         black_rect = pygame.Rect(3*WIDTH//4 - 60, HEIGHT//2 - 25, 120, 50)
 
-        while True:
-            self.screen.fill((30, 30, 30))
-            txt = font.render("Choose your color:", True, pygame.Color("white"))
-            self.screen.blit(txt, (WIDTH//2 - txt.get_width()//2, HEIGHT//4))
+        self.screen.fill((30, 30, 30))
+        txt = font.render("Choose your color:", True, pygame.Color("white"))
+        self.screen.blit(txt, (WIDTH//2 - txt.get_width()//2, HEIGHT//4))
 
-            pygame.draw.rect(self.screen, pygame.Color("white"), white_rect)
-            pygame.draw.rect(self.screen, pygame.Color("black"), black_rect)
-            w_txt = font.render("White", True, pygame.Color("black"))
-            b_txt = font.render("Black", True, pygame.Color("white"))
-            self.screen.blit(w_txt, (white_rect.centerx - w_txt.get_width()//2, white_rect.centery - w_txt.get_height()//2))
-            self.screen.blit(b_txt, (black_rect.centerx - b_txt.get_width()//2, black_rect.centery - b_txt.get_height()//2))
+        pygame.draw.rect(self.screen, pygame.Color("white"), white_rect)
+        pygame.draw.rect(self.screen, pygame.Color("black"), black_rect)
+        w_txt = font.render("White", True, pygame.Color("black"))
+        b_txt = font.render("Black", True, pygame.Color("white"))
+        self.screen.blit(w_txt, (white_rect.centerx - w_txt.get_width()//2, white_rect.centery - w_txt.get_height()//2))
+        self.screen.blit(b_txt, (black_rect.centerx - b_txt.get_width()//2, black_rect.centery - b_txt.get_height()//2))
+        pygame.display.flip()
 
-            pygame.display.flip()
-            self.clock.tick(FPS)
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if white_rect.collidepoint(event.pos):
-                        return True
-                    elif black_rect.collidepoint(event.pos):
-                        return False
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if white_rect.collidepoint(event.pos):
-                        return True
-                    elif black_rect.collidepoint(event.pos):
-                        return False
-        return
-    
+        while True:
+            pos = self.wait_for_click()
+            if white_rect.collidepoint(pos):
+                return True
+            elif black_rect.collidepoint(pos):
+                return False
 
     def prompt_promotion_choice(self):
-        pygame.event.clear()  # 🔁 Flush pending events to avoid auto-dismissal
+        pygame.event.clear(pygame.MOUSEBUTTONDOWN)  # 🔁 Flush pending clicks to avoid auto-dismissal
         font = pygame.font.SysFont(None, 28)
         options = [(chess.QUEEN, "Queen"), (chess.ROOK, "Rook"), (chess.BISHOP, "Bishop"), (chess.KNIGHT, "Knight")]
         buttons = []
@@ -106,89 +203,78 @@ class ChessGUI:
             rect = pygame.Rect(box.left + 10 + i * 70, box.centery - 20, 60, 40)
             buttons.append((rect, label))
 
+        pygame.draw.rect(self.screen, pygame.Color("black"), box)
+        pygame.draw.rect(self.screen, pygame.Color("white"), box, 2)
+
+        txt = font.render("Choose promotion:", True, pygame.Color("white"))
+        self.screen.blit(txt, (box.centerx - txt.get_width() // 2, box.top + 10))
+
+        for i, (rect, label) in enumerate(buttons):
+            pygame.draw.rect(self.screen, pygame.Color("gray"), rect)
+            label_surface = font.render(label, True, pygame.Color("black"))
+            self.screen.blit(label_surface, (rect.centerx - label_surface.get_width()//2, rect.centery - label_surface.get_height()//2))
+        pygame.display.update(box)
+
         while True:
-            self.draw_board()
-            self.draw_pieces()
-            pygame.draw.rect(self.screen, pygame.Color("black"), box)
-            pygame.draw.rect(self.screen, pygame.Color("white"), box, 2)
+            pos = self.wait_for_click()
+            for i, (rect, _) in enumerate(buttons):
+                if rect.collidepoint(pos):
+                    self.invalidate()
+                    return options[i][0]
 
-            txt = font.render("Choose promotion:", True, pygame.Color("white"))
-            self.screen.blit(txt, (box.centerx - txt.get_width() // 2, box.top + 10))
+    def handle_event(self, e):
+        '''
+        Applies one input event; returns False once the window should close.
+        '''
+        if e.type == pygame.QUIT:
+            return False
 
-            for i, (rect, label) in enumerate(buttons):
-                pygame.draw.rect(self.screen, pygame.Color("gray"), rect)
-                label_surface = font.render(label, True, pygame.Color("black"))
-                self.screen.blit(label_surface, (rect.centerx - label_surface.get_width()//2, rect.centery - label_surface.get_height()//2))
+        if self.game_over:
+            if e.type == pygame.KEYDOWN:
+                if e.key == pygame.K_r:
+                    self.reset_game()
+                elif e.key == pygame.K_q:
+                    return False
+            return True
 
-            pygame.display.flip()
-            self.clock.tick(FPS)
-
-            for e in pygame.event.get():
-                if e.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
-                elif e.type == pygame.MOUSEBUTTONDOWN:
-                    for i, (rect, _) in enumerate(buttons):
-                        if rect.collidepoint(e.pos):
-                            return options[i][0]
-            return
+        if e.type == pygame.MOUSEBUTTONDOWN and not self.board.is_game_over() and not self.worker.thinking:
+            x, y = e.pos
+            col, row = x // SQ_SIZE, 7 - (y // SQ_SIZE)
+            square = chess.square(col, row)
+            if self.selected_square is None:
+                self.selected_square = square
+            else:
+                move = chess.Move(self.selected_square, square)
+
+                # Handle promotion
+                if (self.board.piece_at(self.selected_square) and
+                    self.board.piece_at(self.selected_square).piece_type == chess.PAWN and # type: ignore
+                    chess.square_rank(square) in [0, 7]):
+                    promo_piece = self.prompt_promotion_choice()
+                    move = chess.Move(self.selected_square, square, promotion=promo_piece)
+
+                if move in self.board.legal_moves:
+                    self.board.push(move)
+                    if not self.board.is_game_over():
+                        self.worker.request_move(self.board)
+                    self.check_game_over()
+                self.selected_square = None
+        return True
 
     def run(self):
         running = True
+        self.render()
         while running:
-            for e in pygame.event.get():
-                if e.type == pygame.QUIT:
-                    running = False
-
-                if self.game_over:
-                    if e.type == pygame.KEYDOWN:
-                        if e.key == pygame.K_r:
-                            self.reset_game()
-                        elif e.key == pygame.K_q:
-                            running = False
-                    continue
-
-                elif e.type == pygame.MOUSEBUTTONDOWN and not self.board.is_game_over():
-                    x, y = pygame.mouse.get_pos()
-                    col, row = x // SQ_SIZE, 7 - (y // SQ_SIZE)
-                    square = chess.square(col, row)
-                    if self.selected_square is None:
-                        self.selected_square = square
-                    else:
-                        move = chess.Move(self.selected_square, square)
-
-                        # Handle promotion
-                        if (self.board.piece_at(self.selected_square) and
-                            self.board.piece_at(self.selected_square).piece_type == chess.PAWN and # type: ignore
-                            chess.square_rank(square) in [0, 7]):
-                            promo_piece = self.prompt_promotion_choice()
-                            move = chess.Move(self.selected_square, square, promotion=promo_piece)
-
-                        if move in self.board.legal_moves:
-                            self.board.push(move)
-                            if not self.board.is_game_over():
-                                ai_move = self.engine.select_quantum_move(self.board)
-                                if ai_move:
-                                    self.board.push(ai_move)
-                        self.selected_square = None
-
-            self.draw_board()
-            self.draw_pieces()
-
-            if self.board.is_checkmate():
-                self.game_over = True
-                winner = "White" if self.board.turn == chess.BLACK else "Black"
-                self.show_endgame_message(f"Checkmate! {winner} wins.")
-            elif self.board.is_stalemate():
-                self.game_over = True
-                self.show_endgame_message("Stalemate! Game drawn.")
-
-            self.clock.tick(FPS)
-            pygame.display.flip()
+            # Sleep until something happens; the engine thread posts ENGINE_MOVE_EVENT when its move is ready
+            for e in [pygame.event.wait()] + pygame.event.get():
+                running = self.handle_event(e) and running
+            self.poll_engine()
+            self.render()
 
+        self.worker.shutdown()
         pygame.quit()
         return
-    
+
     def show_endgame_message(self, message):
         font = pygame.font.SysFont(None, 36)
         box_width, box_height = 400, 150
@@ -1,5 +1,39 @@
-from gui import ChessGUI
+import sys
 
-if __name__ == "__main__":
+
+def run_gui():
+    # Imported here so headless commands do not need pygame or a display
+    from gui import ChessGUI
     gui = ChessGUI()
-    gui.run()
\ No newline at end of file
+    gui.run()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "gui"
+    if command in ("gui", "uci", "serve"):
+        # Interactive front-ends start at once; Qiskit and Aer load in the background for the first quantum move
+        # (safe with Threads > 1: root-parallel workers are spawned, not forked from this process)
+        from grover import warm_up
+        warm_up()
+    if command == "uci":
+        import uci
+        uci.main()
+    elif command == "bench":
+        import bench
+        sys.exit(bench.main(sys.argv[2:]))
+    elif command == "cache":
+        import position_cache
+        sys.exit(position_cache.main(sys.argv[2:]))
+    elif command == "arena":
+        import arena
+        sys.exit(arena.main(sys.argv[2:]))
+    elif command == "analyse":
+        import analysis
+        sys.exit(analysis.main(sys.argv[2:]))
+    elif command == "serve":
+        import service
+        sys.exit(service.main(sys.argv[2:]))
+    elif command == "gui":
+        run_gui()
+    else:
+        sys.exit(f"Unknown command {command!r}; expected one of: gui, uci, bench, cache, arena, analyse, serve")
\ No newline at end of file
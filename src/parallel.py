@@ -0,0 +1,208 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import multiprocessing
+import os
+import threading
+import time
+import chess
+from classical_evaluation import evaluate_position
+from grover import (GroverPolicy, adaptive_shot_confidence, best_index, configure_adaptive_shots, grover_policy,
+                    select_from_scores)
+from search import SearchAborted, SearchLimits
+from stats import SearchStats
+from transposition import TranspositionTable
+
+
+WORKER_TT_SIZE_MB = 16
+POLL_INTERVAL = 0.02  # seconds between checks of the parent's limits while root moves are searched
+ABORT_TIMEOUT = 2.0  # seconds aborted tasks get to return before the pool is torn down
+
+_pool = None
+_pool_workers = 0
+# Set by the parent to abort the tasks of a root search; shared with the workers at pool start-up
+_stop_event = None
+# One root search uses the pool (and _stop_event) at a time
+_search_lock = threading.Lock()
+
+# Per-worker transposition tables, kept for the lifetime of the worker process
+_worker_tables = {}
+
+
+def _init_worker(stop_event, warm_up: bool) -> None:
+    '''
+    Runs once in every worker process: keeps the pool's stop event and, for an "aer" pool, pays for the
+    Qiskit/Aer imports and backend start-up up front. Analytic and classical searches never load Qiskit.
+    '''
+    global _stop_event
+    _stop_event = stop_event
+    import quantum_backend
+    if warm_up:
+        from grover import warm_up as warm_up_backend
+        warm_up_backend(background=False)
+    return
+
+
+def _worker_table(search: str, policy_spec: str) -> TranspositionTable:
+    # One table per search mode and policy, since minimax tables hold Grover-selected scores
+    if (search, policy_spec) not in _worker_tables:
+        _worker_tables[search, policy_spec] = TranspositionTable(WORKER_TT_SIZE_MB)
+    return _worker_tables[search, policy_spec]
+
+
+def _score_root_move(fen: str, uci: str, depth: int, mode: str, search: str,
+                     deadline: float | None, confidence: float | None = None,
+                     policy_spec: str = "all", max_nodes: int | None = None) -> tuple[int, dict] | None:
+    '''
+    Worker task: plays uci on the position given by fen and searches the result to depth.
+    deadline is a time.time() wall-clock instant, so tasks that wait in the queue do not get a fresh budget.
+    confidence and policy_spec mirror the parent's adaptive shot setting and Grover policy (the searched
+    position is at ply 1). Returns (score, search counters), or None if the deadline, max_nodes or the
+    pool's stop event ended the search.
+    '''
+    time_left = deadline - time.time() if deadline is not None else None
+    if (time_left is not None and time_left <= 0) or (_stop_event is not None and _stop_event.is_set()):
+        return None
+    configure_adaptive_shots(confidence)
+    policy = GroverPolicy.parse(policy_spec)
+    from quantum_backend import quantum_minimax, quantum_minimax_batched
+    from search import AlphaBetaSearch, INFINITY
+
+    board = chess.Board(fen)
+    board.push_uci(uci)
+    stats = SearchStats()
+    tt = _worker_table(search, policy_spec)
+    limits = SearchLimits(time_limit=time_left, max_nodes=max_nodes, stop_event=_stop_event)
+
+    try:
+        if search == "alphabeta":
+            score = AlphaBetaSearch(mode=mode, stats=stats, tt=tt, limits=limits).alphabeta(
+                board, depth, -INFINITY, INFINITY, 1)
+        elif search == "batched":
+            score, _ = quantum_minimax_batched(board, depth, mode, stats, tt, limits, policy, 1)
+        else:
+            score, _ = quantum_minimax(board, depth, mode, stats, tt, limits, policy, 1)
+    except SearchAborted:
+        return None
+    return score, stats.as_dict()
+
+
+def get_pool(workers: int | None = None, mode: str = "aer") -> ProcessPoolExecutor:
+    '''
+    Returns the long-lived worker pool, (re)creating it only when the worker count changes.
+    A pool first created for "aer" warms up Qiskit in every worker; otherwise workers load it on first use.
+    Workers are spawned rather than forked: a fork of a process that has already run Aer deadlocks in
+    Aer's OpenMP runtime.
+    '''
+    global _pool, _pool_workers, _stop_event
+    workers = workers or os.cpu_count() or 1
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        context = multiprocessing.get_context("spawn")
+        _stop_event = context.Event()
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                    initargs=(_stop_event, mode == "aer"))
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool(terminate: bool = False) -> None:
+    '''
+    Shuts the pool down; with terminate, its workers are killed first instead of waited for.
+    '''
+    global _pool, _pool_workers, _stop_event
+    if _pool is not None:
+        if terminate:
+            # ProcessPoolExecutor has no public way to kill its workers before Python 3.14
+            for process in list(_pool._processes.values()):
+                process.terminate()
+        _pool.shutdown(wait=not terminate, cancel_futures=True)
+    _pool = None
+    _pool_workers = 0
+    _stop_event = None
+    return
+
+
+def _gather(futures: list, limits: SearchLimits | None) -> list:
+    # Waits for every task, checking the parent's limits in between; on abort the pending tasks are
+    # cancelled and the running ones told to stop before SearchAborted propagates. Workers that do not
+    # return within ABORT_TIMEOUT are terminated and the pool recreated by the next search
+    pending = set(futures)
+    nodes = 0
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result is None:
+                    raise SearchAborted("root move search aborted")
+                nodes += result[1]["nodes"]
+            if limits is not None:
+                if limits.max_nodes is not None and limits.nodes + nodes > limits.max_nodes:
+                    raise SearchAborted("node limit reached")
+                limits.check()
+    except SearchAborted:
+        _stop_event.set() # type: ignore
+        for future in pending:
+            future.cancel()
+        _, pending = wait(pending, timeout=ABORT_TIMEOUT)
+        if pending:
+            shutdown_pool(terminate=True)
+        raise
+    if limits is not None:
+        limits.nodes += nodes
+    return [future.result() for future in futures]
+
+
+def score_root_moves(board: chess.Board, depth: int, mode: str = "aer", search: str = "minimax",
+                     workers: int | None = None, stats: SearchStats | None = None,
+                     limits: SearchLimits | None = None,
+                     policy: GroverPolicy | None = None) -> tuple[list[chess.Move], list[int]]:
+    '''
+    Searches every root move to depth - 1 on the worker pool and returns the moves with their scores.
+    The time, node and stop limits in limits apply to the whole root search: the deadline is passed to the
+    workers, a stop or an exhausted node budget ends their tasks, and SearchAborted is raised.
+    Root searches from several threads take turns on the pool.
+    '''
+    legal_moves = list(board.legal_moves)
+    fen = board.fen()
+    deadline = None
+    max_nodes = None
+    if limits is not None:
+        limits.check()
+        if limits.deadline is not None:
+            deadline = time.time() + (limits.deadline - time.monotonic())
+        if limits.max_nodes is not None:
+            max_nodes = limits.max_nodes - limits.nodes
+
+    confidence = adaptive_shot_confidence()
+    policy_spec = grover_policy(policy).spec
+    with _search_lock:
+        pool = get_pool(workers, mode)
+        _stop_event.clear() # type: ignore
+        futures = [pool.submit(_score_root_move, fen, move.uci(), depth - 1, mode, search, deadline, confidence,
+                               policy_spec, max_nodes)
+                   for move in legal_moves]
+        results = _gather(futures, limits)
+
+    if stats is not None:
+        stats.nodes += 1
+        for _, counts in results: # type: ignore
+            stats.merge(counts)
+    return legal_moves, [score for score, _ in results] # type: ignore
+
+
+def parallel_root_search(board: chess.Board, depth: int, mode: str = "aer", search: str = "minimax",
+                         workers: int | None = None, stats: SearchStats | None = None,
+                         limits: SearchLimits | None = None, policy: GroverPolicy | None = None) -> tuple[int, chess.Move]:
+    '''
+    Root-parallel search: root moves are searched on the worker pool and the root's Grover selection
+    runs here over the gathered child scores.
+    '''
+    if depth == 0 or board.is_game_over():
+        return evaluate_position(board), chess.Move.null()
+
+    legal_moves, move_scores = score_root_moves(board, depth, mode, search, workers, stats, limits, policy)
+    if grover_policy(policy).uses_grover(0, len(legal_moves)):
+        best_idx = select_from_scores(move_scores, board.turn, mode=mode, stats=stats)
+    else:
+        best_idx = best_index(move_scores, board.turn)
+    return move_scores[best_idx], legal_moves[best_idx]
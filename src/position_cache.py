@@ -0,0 +1,258 @@
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import chess
+import chess.pgn
+import numpy as np
+from quantum_backend import search_position
+from transposition import zobrist_key, encode_move, decode_move
+
+
+MAGIC = b"QCPC"
+FORMAT_VERSION = 1
+
+# Header: magic, format version, bucket count, write generation (padded to HEADER_SIZE bytes)
+HEADER = struct.Struct("<4sHxxIB")
+HEADER_SIZE = 64
+# Record: key ^ data, data = score (32 bits) | move (16) | depth (8) | generation (8)
+RECORD = struct.Struct("<QQ")
+BUCKET_SLOTS = 4
+BUCKET_SIZE = BUCKET_SLOTS * RECORD.size
+
+DEFAULT_CACHE_MB = 64
+AGE_WEIGHT = 2  # depth plies an entry is worth less for every generation it has not been rewritten
+
+
+def config_key(mode: str, search: str, policy: str) -> int:
+    '''
+    64-bit salt for a search configuration (execution mode, search and Grover policy spec). It is XORed into
+    the Zobrist key of every record, so a result is only served to the configuration that produced it.
+    '''
+    digest = hashlib.blake2b(f"{mode}/{search}/{policy}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _pack(score: int, move_code: int, depth: int, generation: int) -> int:
+    return (score & 0xFFFFFFFF) | (move_code << 32) | (min(depth, 255) << 48) | (generation << 56)
+
+
+def _unpack(data: int) -> tuple[int, int, int, int]:
+    score = data & 0xFFFFFFFF
+    if score >= 1 << 31:
+        score -= 1 << 32
+    return score, (data >> 32) & 0xFFFF, (data >> 48) & 0xFF, data >> 56
+
+
+class PositionCache:
+    '''
+    On-disk table of (Zobrist key ^ config_key -> score, depth, best move) in a fixed-size file accessed through mmap,
+    so several engine processes can share it and it survives restarts.
+
+    Records sit in buckets of BUCKET_SLOTS. Each stores key ^ data next to data, so a record torn by a
+    concurrent writer fails validation and reads as a miss. A full bucket replaces the record with the lowest
+    depth - AGE_WEIGHT * age, where age counts the writing sessions since the record was stored.
+    '''
+
+    def __init__(self, path: str, size_mb: float = DEFAULT_CACHE_MB, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self.probes = 0
+        self.hits = 0
+
+        if not os.path.exists(path):
+            if readonly:
+                raise FileNotFoundError(path)
+            self._create(path, size_mb)
+
+        self._file = open(path, "rb" if readonly else "r+b")
+        access = mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE
+        self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+        magic, version, self.num_buckets, generation = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} position cache")
+        if len(self._map) < HEADER_SIZE + self.num_buckets * BUCKET_SIZE:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+
+        self.mask = self.num_buckets - 1
+        if readonly:
+            self.generation = generation
+        else:
+            # Every writing session is a new generation, so entries it does not refresh age
+            self.generation = (generation + 1) & 0xFF
+            HEADER.pack_into(self._map, 0, MAGIC, FORMAT_VERSION, self.num_buckets, self.generation)
+
+    @staticmethod
+    def _create(path: str, size_mb: float) -> None:
+        capacity = max(1, int(size_mb * 1024 * 1024) // BUCKET_SIZE)
+        num_buckets = 1 << (capacity.bit_length() - 1)
+        with open(path, "wb") as f:
+            header = HEADER.pack(MAGIC, FORMAT_VERSION, num_buckets, 0)
+            f.write(header + bytes(HEADER_SIZE - len(header)))
+            f.truncate(HEADER_SIZE + num_buckets * BUCKET_SIZE)
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+        return
+
+    def close(self) -> None:
+        if self._map is not None:
+            if not self.readonly:
+                self._map.flush()
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return
+
+    def _bucket(self, key: int) -> int:
+        return HEADER_SIZE + (key & self.mask) * BUCKET_SIZE
+
+    def probe(self, key: int) -> tuple[int, int, chess.Move] | None:
+        '''
+        Returns (score, depth, best move) stored for key, or None on a miss.
+        '''
+        self.probes += 1
+        offset = self._bucket(key)
+        for slot in range(BUCKET_SLOTS):
+            check, data = RECORD.unpack_from(self._map, offset + slot * RECORD.size) # type: ignore
+            if data and check ^ data == key:
+                self.hits += 1
+                score, move_code, depth, _ = _unpack(data)
+                return score, depth, decode_move(move_code)
+        return None
+
+    def lookup(self, board: chess.Board, depth: int, config: int = 0) -> tuple[int, chess.Move] | None:
+        '''
+        (score, move) for board if it was searched at least depth plies deep, under the configuration whose
+        config_key is config, and the move is legal here.
+        '''
+        entry = self.probe(zobrist_key(board) ^ config)
+        if entry is None or entry[1] < depth or not entry[2] or not board.is_legal(entry[2]):
+            return None
+        return entry[0], entry[2]
+
+    def store(self, key: int, depth: int, score: int, move: chess.Move | None = None) -> None:
+        if self.readonly:
+            raise PermissionError(f"{self.path} was opened read-only")
+        offset = self._bucket(key)
+        victim, victim_priority = None, None
+        for slot in range(BUCKET_SLOTS):
+            slot_offset = offset + slot * RECORD.size
+            check, data = RECORD.unpack_from(self._map, slot_offset) # type: ignore
+            if data and check ^ data == key:
+                if _unpack(data)[2] > depth:
+                    return  # keep the deeper result for this position
+                victim = slot_offset
+                break
+            # Empty slots come first, then the shallowest and oldest record
+            if not data:
+                priority = -1 << 16
+            else:
+                _, _, slot_depth, slot_generation = _unpack(data)
+                priority = slot_depth - AGE_WEIGHT * ((self.generation - slot_generation) & 0xFF)
+            if victim_priority is None or priority < victim_priority:
+                victim, victim_priority = slot_offset, priority
+
+        data = _pack(score, encode_move(move) if move else 0, depth, self.generation)
+        RECORD.pack_into(self._map, victim, key ^ data, data) # type: ignore
+        return
+
+    def used(self) -> int:
+        '''
+        Number of occupied records (scans the whole file).
+        '''
+        words = np.frombuffer(self._map, dtype="<u8", count=2 * self.capacity, offset=HEADER_SIZE) # type: ignore
+        count = int(np.count_nonzero(words[1::2]))
+        del words  # the mmap cannot be closed while a buffer onto it exists
+        return count
+
+    @property
+    def capacity(self) -> int:
+        return self.num_buckets * BUCKET_SLOTS
+
+
+def read_positions(path: str, plies: int | None = 12):
+    '''
+    Yields the positions in a file lazily: one FEN/EPD per line, or for .pgn files every position of each
+    game's first plies half-moves (all of them if plies is None).
+    '''
+    if path.endswith(".pgn"):
+        with open(path) as f:
+            while (game := chess.pgn.read_game(f)) is not None:
+                board = game.board()
+                for ply, move in enumerate(game.mainline_moves()):
+                    if plies is not None and ply >= plies:
+                        break
+                    yield board.copy()
+                    board.push(move)
+        return
+
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split()
+            # EPD lines carry four FEN fields followed by operations
+            is_fen = len(fields) >= 6 and fields[4].isdigit() and fields[5].isdigit()
+            yield chess.Board(" ".join(fields[:6] if is_fen else fields[:4]))
+    return
+
+
+def populate(cache: PositionCache, positions, engine, depth: int) -> int:
+    '''
+    Searches each position with engine to depth and stores the results; returns the number of new searches.
+    Positions already cached at least that deep are skipped.
+    '''
+    searched = 0
+    config = config_key(engine.mode, engine.search, engine.policy.spec)
+    for board in positions:
+        if board.is_game_over() or cache.lookup(board, depth, config) is not None:
+            continue
+        score, move = search_position(board.copy(), depth, mode=engine.mode, search=engine.search,
+                                      tt=engine.tt, workers=engine.workers, policy=engine.policy)
+        cache.store(zobrist_key(board) ^ config, depth, score, move)
+        searched += 1
+    return searched
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="main.py cache", description="Manage the persistent position cache.")
+    parser.add_argument("action", choices=("populate", "info"))
+    parser.add_argument("--cache", default="positions.qcc", help="cache file")
+    parser.add_argument("--size-mb", type=float, default=DEFAULT_CACHE_MB, help="size of a new cache file")
+    parser.add_argument("--positions", help="FEN/EPD file, or PGN whose opening positions are searched")
+    parser.add_argument("--plies", type=int, default=12, help="opening plies taken from each PGN game")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--mode", default="analytic")
+    parser.add_argument("--search", default="alphabeta")
+    parser.add_argument("--policy", default="all")
+    args = parser.parse_args(argv)
+
+    if args.action == "info":
+        with PositionCache(args.cache, readonly=True) as cache:
+            print(f"{args.cache}: {cache.used()} of {cache.capacity} records used, generation {cache.generation}")
+        return 0
+
+    if not args.positions:
+        parser.error("populate needs --positions")
+    from engine import QuantumChessEngine
+    engine = QuantumChessEngine(mode=args.mode, search=args.search, policy=args.policy, profile=False)
+    with PositionCache(args.cache, args.size_mb) as cache:
+        searched = populate(cache, read_positions(args.positions, args.plies), engine, args.depth)
+        print(f"searched {searched} positions to depth {args.depth}; {cache.used()} of {cache.capacity} records used")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,105 +1,329 @@
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer 
 import numpy as np
 import chess
-import math
-from classical_evaluation import evaluate_position
+import time
+from grover import (grover_select_batch, mark_moves, select_from_scores, run_circuit, best_index, grover_policy,
+                    GroverPolicy, EXECUTION_MODES)
+from parallel import parallel_root_search
+from search import AlphaBetaSearch, SearchAborted, SearchLimits, alphabeta_search
+from search_board import SearchBoard
+from stats import SearchStats
+from transposition import TranspositionTable, decode_move, EXACT
 
 
+SEARCH_MODES = ("minimax", "batched", "alphabeta")
+
 # # Simple evaluation based on material balance and mobility
 # PIECE_VALUES = {
 #     "P": 1, "N": 3, "B": 3, "R": 5, "Q": 9, "K": 0
 # }
 
-def run_circuit(qc, shots=1024):
-    qc.measure_all()
-    backend = Aer.get_backend("aer_simulator")
-    transpiled_qc = transpile(qc, backend)
-    job = backend.run(transpiled_qc, shots=shots) # type: ignore
-    return job.result().get_counts()
+def _probe(tt: TranspositionTable, key: int, board: SearchBoard, depth: int) -> tuple[int, int] | None:
+    # Reuses a stored (score, move code) for a transposition searched at least this deep
+    entry = tt.probe(key)
+    if entry is None or entry[1] < depth or entry[2] != EXACT:
+        return None
+    move = entry[3]
+    if move and move not in board.legal_moves():
+        return None
+    return entry[0], move
+
+
+def _legal_moves(board: SearchBoard, stats: SearchStats | None) -> list[int]:
+    if stats is None:
+        return board.legal_moves()
+    start = time.perf_counter()
+    legal_moves = board.legal_moves()
+    stats.movegen_time += time.perf_counter() - start
+    return legal_moves
+
+
+def _evaluate(board: SearchBoard, stats: SearchStats | None, moves: list[int] | None = None) -> int:
+    # A leaf: evaluate_position of the search board, counted with its time in stats
+    if stats is None:
+        return board.evaluate(moves)
+    start = time.perf_counter()
+    score = board.evaluate(moves)
+    stats.leaves += 1
+    stats.evaluation_time += time.perf_counter() - start
+    return score
+
+
+def _evaluate_children(board: SearchBoard, moves: list[int], stats: SearchStats | None) -> list[int]:
+    if stats is None:
+        return board.evaluate_children(moves)
+    start = time.perf_counter()
+    scores = board.evaluate_children(moves)
+    stats.nodes += len(moves)
+    stats.leaves += len(moves)
+    stats.evaluation_time += time.perf_counter() - start
+    return scores
 
 
-def quantum_minimax(board: chess.Board, depth: int) -> tuple[int, chess.Move]:
+def quantum_minimax(board: chess.Board, depth: int, mode: str = "aer", stats: SearchStats | None = None,
+                    tt: TranspositionTable | None = None, limits: SearchLimits | None = None,
+                    policy: GroverPolicy | None = None, ply: int = 0) -> tuple[int, chess.Move]:
     '''
     Recursive depth-d search using Grover-style amplification for move selection.
+    mode selects how Grover circuits are executed: "aer" shot simulation or the "analytic" NumPy sampler.
+    policy decides which nodes (by ply below the search root and branching) use Grover; the rest take the
+    classical min/max.
+    Positions already searched to at least this depth are taken from tt when it is given.
+    The tree is walked on a SearchBoard copy, so board is left unchanged even when limits raise SearchAborted.
     '''
+    score, move = _quantum_minimax(SearchBoard(board), depth, mode, stats, tt, limits, grover_policy(policy), ply)
+    return score, decode_move(move)
 
-    if depth == 0 or board.is_game_over():
-        return evaluate_position(board), chess.Move.null()
-
-    legal_moves = list(board.legal_moves)
-    if len(legal_moves) == 0:
-        return evaluate_position(board), chess.Move.null()
-
-    move_scores = []
-    for move in legal_moves:
-        board.push(move)
-        score, _ = quantum_minimax(board, depth - 1)
-        board.pop()
-        move_scores.append(score)
-
-    if len(legal_moves) == 1:
-        return move_scores[0], legal_moves[0]
-
-    is_white = board.turn
-    best_score = max(move_scores) if is_white else min(move_scores)
-
-    # Adaptive thresholding
-    # Choose moves that have values >= half a std. dev above the mean
-    mu = np.mean(move_scores)
-    sigma = np.std(move_scores)
-    theta = mu + 0.5 * sigma if is_white else mu - 0.5 * sigma
-    marked_indices = [i for i, s in enumerate(move_scores)
-                      if (s >= theta if is_white else s <= theta)]
-
-    if len(marked_indices) == 0:
-        best_index = np.argmax(move_scores) if is_white else np.argmin(move_scores)
-        return move_scores[best_index], legal_moves[best_index]
-
-    N = 2 ** int(np.ceil(np.log2(len(legal_moves))))
-    n = int(np.log2(N))
-    R = max(1, int(math.ceil(np.pi / 4 * np.sqrt(N / len(marked_indices)))))
-
-    qc = QuantumCircuit(n)
-    qc.h(range(n))
-
-    for _ in range(R):
-        # Oracle
-        for idx in marked_indices:
-            bits = format(idx, f"0{n}b")
-            for i, bit in enumerate(reversed(bits)):
-                if bit == "0": qc.x(i)
-            if n > 1:
-                qc.h(n - 1)
-                qc.mcx(list(range(n - 1)), n - 1)
-                qc.h(n - 1)
-            else:
-                qc.z(0)
-            for i, bit in enumerate(reversed(bits)):
-                if bit == "0": qc.x(i)
-        qc.barrier()
-
-        # Diffusion
-        qc.h(range(n))
-        qc.x(range(n))
-        if n > 1:
-            qc.h(n - 1)
-            qc.mcx(list(range(n - 1)), n - 1)
-            qc.h(n - 1)
-        else:
-            qc.z(0)
-        qc.x(range(n))
-        qc.h(range(n))
-
-    counts = run_circuit(qc)
-    best_bin = max(counts, key=counts.get)
-    best_idx = int(best_bin, 2) % len(legal_moves)
 
+def _quantum_minimax(board: SearchBoard, depth: int, mode: str, stats: SearchStats | None,
+                     tt: TranspositionTable | None, limits: SearchLimits | None, policy: GroverPolicy,
+                     ply: int) -> tuple[int, int]:
+    if stats is not None:
+        stats.nodes += 1
+    if limits is not None:
+        limits.check()
+
+    key = 0
+    if tt is not None:
+        key = board.zobrist()
+        hit = _probe(tt, key, board, depth)
+        if hit is not None:
+            return hit
+
+    legal_moves = _legal_moves(board, stats) if depth > 0 else None
+    if legal_moves is None or board.is_game_over(legal_moves):
+        score = _evaluate(board, stats, legal_moves)
+        if tt is not None:
+            tt.store(key, depth, score, EXACT)
+        return score, 0
+
+    if depth == 1:
+        # Frontier node: the children are leaves
+        move_scores = _evaluate_children(board, legal_moves, stats)
+    else:
+        move_scores = []
+        for move in legal_moves:
+            board.make(move)
+            score, _ = _quantum_minimax(board, depth - 1, mode, stats, tt, limits, policy, ply + 1)
+            board.unmake()
+            move_scores.append(score)
+
+    if policy.uses_grover(ply, len(legal_moves)):
+        best_idx = select_from_scores(move_scores, board.turn, mode=mode, stats=stats)
+    else:
+        best_idx = best_index(move_scores, board.turn)
+    if tt is not None:
+        tt.store(key, depth, move_scores[best_idx], EXACT, legal_moves[best_idx])
     return move_scores[best_idx], legal_moves[best_idx]
 
-def select_best_quantum_move(board: chess.Board, depth: int = 2) -> chess.Move:
+
+class _SearchNode:
+    '''
+    Interior node of an expanded search tree; children are either nodes or leaf scores.
+    '''
+    __slots__ = ("moves", "is_white", "children", "score", "move", "key", "depth", "grover")
+
+    def __init__(self, moves: list[int], is_white: bool, key: int, depth: int, grover: bool = True):
+        self.moves = moves
+        self.is_white = is_white
+        self.key = key
+        self.depth = depth
+        self.grover = grover
+        self.children = []
+        self.score = 0
+        self.move = 0
+
+
+def _expand_tree(board: SearchBoard, depth: int, levels: list[list[_SearchNode]], stats: SearchStats | None,
+                 tt: TranspositionTable | None, limits: SearchLimits | None, policy: GroverPolicy, ply: int):
+    '''
+    Classical pass: expands the tree depth-first, scoring leaves and grouping interior nodes by height.
+    Returns the leaf score or the node together with its height above the leaves.
+    Transpositions found in tt are treated as leaves.
+    '''
+    if stats is not None:
+        stats.nodes += 1
+    if limits is not None:
+        limits.check()
+
+    key = 0
+    if tt is not None:
+        key = board.zobrist()
+        hit = _probe(tt, key, board, depth)
+        if hit is not None:
+            return hit[0], 0
+
+    legal_moves = _legal_moves(board, stats) if depth > 0 else None
+    if legal_moves is None or board.is_game_over(legal_moves):
+        score = _evaluate(board, stats, legal_moves)
+        if tt is not None:
+            tt.store(key, depth, score, EXACT)
+        return score, 0
+
+    node = _SearchNode(legal_moves, board.turn, key, depth, policy.uses_grover(ply, len(legal_moves)))
+    height = 1
+    if depth == 1:
+        # Frontier node: the children are leaves
+        node.children = _evaluate_children(board, legal_moves, stats)
+    else:
+        for move in legal_moves:
+            board.make(move)
+            child, child_height = _expand_tree(board, depth - 1, levels, stats, tt, limits, policy, ply + 1)
+            board.unmake()
+            node.children.append(child)
+            height = max(height, child_height + 1)
+
+    while len(levels) <= height:
+        levels.append([])
+    levels[height].append(node)
+    return node, height
+
+
+def batched_search(board: chess.Board, depth: int, stats: SearchStats | None = None,
+                   tt: TranspositionTable | None = None, limits: SearchLimits | None = None,
+                   policy: GroverPolicy | None = None, ply: int = 0):
+    '''
+    Generator form of quantum_minimax that resolves the tree one ply at a time, from the leaves up.
+    Yields the list of (num_moves, marked_indices) Grover jobs pending at each ply, expects the selected
+    indices to be sent back, and returns (score, move) for the root.
+    '''
+    search_board = SearchBoard(board)
+    if tt is not None:
+        # _expand_tree keeps only the score of a transposition, so a root already in tt is answered here
+        hit = _probe(tt, search_board.zobrist(), search_board, depth)
+        if hit is not None:
+            if stats is not None:
+                stats.nodes += 1
+            return hit[0], decode_move(hit[1])
+
+    levels = []
+    root, _ = _expand_tree(search_board, depth, levels, stats, tt, limits, grover_policy(policy), ply)
+    if not isinstance(root, _SearchNode):
+        return root, chess.Move.null()
+
+    for level in levels[1:]:
+        pending = []
+        jobs = []
+        for node in level:
+            move_scores = [c.score if isinstance(c, _SearchNode) else c for c in node.children]
+            node.children = move_scores
+
+            if len(node.moves) == 1:
+                node.score, node.move = move_scores[0], node.moves[0]
+                continue
+
+            marked_indices = mark_moves(move_scores, node.is_white) if node.grover else []
+            if len(marked_indices) == 0:
+                best_idx = best_index(move_scores, node.is_white)
+                node.score, node.move = move_scores[best_idx], node.moves[best_idx]
+                continue
+
+            pending.append(node)
+            jobs.append((len(node.moves), marked_indices))
+
+        if jobs:
+            selected = yield jobs
+            for node, best_idx in zip(pending, selected):
+                node.score, node.move = node.children[best_idx], node.moves[best_idx]
+
+        if tt is not None:
+            for node in level:
+                tt.store(node.key, node.depth, node.score, EXACT, node.move)
+
+    return root.score, decode_move(root.move)
+
+
+def quantum_minimax_batched(board: chess.Board, depth: int, mode: str = "aer", stats: SearchStats | None = None,
+                            tt: TranspositionTable | None = None, limits: SearchLimits | None = None,
+                            policy: GroverPolicy | None = None, ply: int = 0) -> tuple[int, chess.Move]:
+    '''
+    Same search as quantum_minimax, but every Grover circuit of a ply is executed in one backend job.
+    '''
+    search = batched_search(board, depth, stats, tt, limits, policy, ply)
+    try:
+        jobs = next(search)
+        while True:
+            jobs = search.send(grover_select_batch(jobs, mode=mode, stats=stats))
+    except StopIteration as stop:
+        return stop.value
+
+
+def select_best_quantum_move(board: chess.Board, depth: int = 2, mode: str = "aer", search: str = "minimax",
+                             stats: SearchStats | None = None, tt: TranspositionTable | None = None,
+                             workers: int = 1, limits: SearchLimits | None = None,
+                             policy: "str | GroverPolicy | None" = None) -> chess.Move:
     '''
     Interface for the engine to select the best move using quantum search.
+    search picks the tree walk: "minimax" runs one circuit per node as it recurses, "batched" runs one job per ply,
+    "alphabeta" prunes below the root and only runs Grover selection over the root moves.
+    Node and circuit counts and per-phase timers are accumulated into stats when it is given, and tt (if any) is probed and filled at every node;
+    keep one table per search mode and policy, since minimax tables hold Grover-selected rather than exact scores.
+    policy (a GroverPolicy or spec such as "root", "top:2" or "branching:20") limits Grover selection to
+    some nodes; the others take the classical min/max. alphabeta only ever uses Grover at the root.
+    With workers > 1 the root moves are searched in parallel on a long-lived process pool (workers keep
+    their own tables) and the root's Grover selection runs on the gathered scores.
+    Raises SearchAborted if limits are exceeded.
+    '''
+    _, move = search_position(board, depth, mode, search, stats, tt, workers, limits, policy)
+    return move
+
+
+def search_position(board: chess.Board, depth: int = 2, mode: str = "aer", search: str = "minimax",
+                    stats: SearchStats | None = None, tt: TranspositionTable | None = None,
+                    workers: int = 1, limits: SearchLimits | None = None,
+                    policy: "str | GroverPolicy | None" = None) -> tuple[int, chess.Move]:
     '''
-    _, move = quantum_minimax(board, depth)
-    return move
\ No newline at end of file
+    select_best_quantum_move, returning the chosen move's score along with it.
+    '''
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"Unknown execution mode {mode!r}, expected one of {EXECUTION_MODES}")
+    if search not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode {search!r}, expected one of {SEARCH_MODES}")
+
+    policy = grover_policy(policy)
+    if workers > 1:
+        return parallel_root_search(board, depth, mode, search, workers, stats, limits, policy)
+    if search == "alphabeta":
+        return alphabeta_search(board, depth, mode, stats, tt, limits, policy)
+    if search == "batched":
+        return quantum_minimax_batched(board, depth, mode, stats, tt, limits, policy)
+    return quantum_minimax(board, depth, mode, stats, tt, limits, policy)
+
+
+def iterative_deepening(board: chess.Board, max_depth: int, mode: str = "aer", search: str = "minimax",
+                        stats: SearchStats | None = None, tt: TranspositionTable | None = None,
+                        limits: SearchLimits | None = None, workers: int = 1,
+                        policy: "str | GroverPolicy | None" = None):
+    '''
+    Searches depth 1, 2, ... max_depth and yields (depth, score, move) for every iteration that completes
+    within limits. The first iteration ignores the time and node budget so a move is available (it can still
+    be stopped through limits.stop_event). Later iterations
+    search the previous best move first and, through tt, its continuation.
+    '''
+    if search not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode {search!r}, expected one of {SEARCH_MODES}")
+
+    policy = grover_policy(policy)
+    searcher = AlphaBetaSearch(mode=mode, stats=stats, tt=tt, policy=policy)
+    best_move = None
+    for depth in range(1, max_depth + 1):
+        iteration_limits = limits
+        if depth == 1 and limits is not None:
+            iteration_limits = SearchLimits(stop_event=limits.stop_event)
+        try:
+            if workers > 1:
+                score, move = parallel_root_search(board, depth, mode, search, workers, stats, iteration_limits,
+                                                   policy)
+            elif search == "alphabeta":
+                searcher.limits = iteration_limits
+                score, move = searcher.search_root(board, depth, best_move)
+            elif search == "batched":
+                score, move = quantum_minimax_batched(board, depth, mode, stats, tt, iteration_limits, policy)
+            else:
+                score, move = quantum_minimax(board, depth, mode, stats, tt, iteration_limits, policy)
+        except SearchAborted:
+            return
+
+        best_move = move
+        yield depth, score, move
+        if not move:
+            return
\ No newline at end of file
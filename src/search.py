@@ -0,0 +1,243 @@
+import chess
+import time
+from classical_evaluation import evaluate_position
+from grover import GroverPolicy, best_index, grover_policy, select_from_scores
+from search_board import SearchBoard
+from stats import SearchStats
+from transposition import TranspositionTable, decode_move, encode_move, EXACT, LOWER, UPPER
+
+
+INFINITY = 10 ** 9
+MAX_PLY = 128
+
+# Move ordering tiers; history scores stay below KILLER_BONUS
+CAPTURE_BONUS = 1_000_000
+PROMOTION_BONUS = 900_000
+CHECK_BONUS = 500_000
+KILLER_BONUS = 400_000
+HISTORY_CAP = 300_000
+
+
+class SearchAborted(Exception):
+    '''
+    Raised from inside a search when its limits are exceeded; the partially searched result is discarded.
+    '''
+
+
+class SearchLimits:
+    '''
+    Wall-clock, node and external stop limits checked at every node of a search.
+    '''
+    __slots__ = ("deadline", "max_nodes", "stop_event", "nodes")
+
+    def __init__(self, time_limit: float | None = None, max_nodes: int | None = None, stop_event=None):
+        self.deadline = time.monotonic() + time_limit if time_limit is not None else None
+        self.max_nodes = max_nodes
+        self.stop_event = stop_event
+        self.nodes = 0
+
+    def check(self) -> None:
+        self.nodes += 1
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SearchAborted("time limit reached")
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SearchAborted("node limit reached")
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchAborted("search stopped")
+        return
+
+
+class AlphaBetaSearch:
+    '''
+    Alpha-beta search with move ordering (MVV-LVA captures, checks, killer and history heuristics).
+    Root moves are scored exactly and chosen with the same Grover selection as quantum_minimax (unless policy
+    excludes the root); every node below the root is resolved by classical alpha-beta min/max.
+    '''
+
+    def __init__(self, mode: str = "aer", stats: SearchStats | None = None, tt: TranspositionTable | None = None,
+                 limits: SearchLimits | None = None, policy: GroverPolicy | None = None):
+        self.mode = mode
+        self.policy = grover_policy(policy)
+        self.stats = stats if stats is not None else SearchStats()
+        # Phase timers are only kept for callers that asked for stats
+        self.timing = stats is not None
+        self.tt = tt
+        self.limits = limits
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [[0] * 64 for _ in range(64)]
+
+    def order_moves(self, board: chess.Board | SearchBoard, moves: list, ply: int, first_move=None) -> list:
+        '''
+        moves in search order. Takes a SearchBoard with move codes, or a chess.Board with chess.Move objects.
+        '''
+        if isinstance(board, chess.Board):
+            first_code = encode_move(first_move) if first_move else 0
+            ordered = self.order_moves(SearchBoard(board), [encode_move(move) for move in moves], ply, first_code)
+            return [decode_move(move) for move in ordered]
+
+        killers = self.killers[ply] if ply < MAX_PLY else (0, 0)
+        types = board.types
+        history = self.history
+
+        def key(move: int) -> int:
+            if move == first_move:
+                return INFINITY
+            frm = move & 63
+            to = (move >> 6) & 63
+            score = 0
+            if board.is_capture(move):
+                # An empty target square is an en passant capture
+                score += CAPTURE_BONUS + 10 * (types[to] or chess.PAWN) - types[frm]
+            elif move == killers[0] or move == killers[1]:
+                score += KILLER_BONUS
+            else:
+                score += history[frm][to]
+            if move >> 12:
+                score += PROMOTION_BONUS + (move >> 12)
+            if board.gives_check(move):
+                score += CHECK_BONUS
+            return score
+
+        return sorted(moves, key=key, reverse=True)
+
+    def generate_moves(self, board: SearchBoard, ply: int, first_move: int = 0) -> list[int]:
+        '''
+        Legal moves of board in search order; the time taken counts as move generation.
+        '''
+        if not self.timing:
+            return self.order_moves(board, board.legal_moves(), ply, first_move)
+        start = time.perf_counter()
+        moves = self.order_moves(board, board.legal_moves(), ply, first_move)
+        self.stats.movegen_time += time.perf_counter() - start
+        return moves
+
+    def alphabeta(self, board: chess.Board, depth: int, alpha: int, beta: int, ply: int) -> int:
+        '''
+        Minimax value of board searched to depth within the (alpha, beta) window.
+        '''
+        return self._alphabeta(SearchBoard(board), depth, alpha, beta, ply)
+
+    def _alphabeta(self, board: SearchBoard, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.stats.nodes += 1
+        if self.limits is not None:
+            self.limits.check()
+
+        key = 0
+        hash_move = 0
+        alpha_orig, beta_orig = alpha, beta
+        if self.tt is not None:
+            key = board.zobrist()
+            entry = self.tt.probe(key)
+            if entry is not None:
+                tt_score, tt_depth, tt_flag, tt_move = entry
+                if tt_depth >= depth:
+                    if tt_flag == EXACT:
+                        return tt_score
+                    if tt_flag == LOWER:
+                        alpha = max(alpha, tt_score)
+                    elif tt_flag == UPPER:
+                        beta = min(beta, tt_score)
+                    if alpha >= beta:
+                        return tt_score
+                hash_move = tt_move
+
+        moves = self.generate_moves(board, ply, hash_move) if depth > 0 else None
+        if moves is None or board.is_game_over(moves):
+            self.stats.leaves += 1
+            if self.timing:
+                start = time.perf_counter()
+                score = board.evaluate(moves)
+                self.stats.evaluation_time += time.perf_counter() - start
+            else:
+                score = board.evaluate(moves)
+            if self.tt is not None:
+                self.tt.store(key, depth, score, EXACT)
+            return score
+
+        maximizing = board.turn == chess.WHITE
+        best = -INFINITY if maximizing else INFINITY
+        best_move = 0
+
+        for move in moves:
+            board.make(move)
+            score = self._alphabeta(board, depth - 1, alpha, beta, ply + 1)
+            board.unmake()
+
+            if (score > best) if maximizing else (score < best):
+                best, best_move = score, move
+            if maximizing:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+
+            if alpha >= beta:
+                self.stats.cutoffs += 1
+                self._record_cutoff(board, move, depth, ply)
+                break
+
+        if self.tt is not None:
+            if best <= alpha_orig:
+                flag = UPPER
+            elif best >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            self.tt.store(key, depth, best, flag, best_move)
+        return best
+
+    def search_root(self, board: chess.Board, depth: int,
+                    first_move: chess.Move | None = None) -> tuple[int, chess.Move]:
+        '''
+        Scores every root move with a full window and picks one with Grover selection.
+        first_move (e.g. the previous iteration's choice) is searched first.
+        '''
+        self.stats.nodes += 1
+        if self.limits is not None:
+            self.limits.check()
+
+        if depth == 0 or board.is_game_over():
+            return evaluate_position(board, self.stats), chess.Move.null()
+
+        search_board = SearchBoard(board)
+        first_code = encode_move(first_move) if first_move else 0
+        key = 0
+        if self.tt is not None:
+            key = search_board.zobrist()
+            entry = self.tt.probe(key)
+            if not first_code and entry is not None:
+                first_code = entry[3]
+
+        legal_moves = self.generate_moves(search_board, 0, first_code)
+
+        move_scores = []
+        for move in legal_moves:
+            search_board.make(move)
+            score = self._alphabeta(search_board, depth - 1, -INFINITY, INFINITY, 1)
+            search_board.unmake()
+            move_scores.append(score)
+
+        if self.policy.uses_grover(0, len(legal_moves)):
+            best_idx = select_from_scores(move_scores, board.turn, mode=self.mode, stats=self.stats)
+        else:
+            best_idx = best_index(move_scores, board.turn)
+        if self.tt is not None:
+            # Root scores are exact minimax values; the chosen move seeds ordering for the next search
+            minimax_score = max(move_scores) if board.turn == chess.WHITE else min(move_scores)
+            self.tt.store(key, depth, minimax_score, EXACT, legal_moves[best_idx])
+        return move_scores[best_idx], decode_move(legal_moves[best_idx])
+
+    def _record_cutoff(self, board: SearchBoard, move: int, depth: int, ply: int) -> None:
+        if board.is_capture(move):
+            return
+        if ply < MAX_PLY and self.killers[ply][0] != move:
+            self.killers[ply][1] = self.killers[ply][0]
+            self.killers[ply][0] = move
+        frm, to = move & 63, (move >> 6) & 63
+        self.history[frm][to] = min(HISTORY_CAP, self.history[frm][to] + depth * depth)
+        return
+
+
+def alphabeta_search(board: chess.Board, depth: int, mode: str = "aer", stats: SearchStats | None = None,
+                     tt: TranspositionTable | None = None, limits: SearchLimits | None = None,
+                     policy: GroverPolicy | None = None) -> tuple[int, chess.Move]:
+    return AlphaBetaSearch(mode=mode, stats=stats, tt=tt, limits=limits, policy=policy).search_root(board, depth)
@@ -0,0 +1,521 @@
+import chess
+import chess.polyglot
+from classical_evaluation import PIECE_SQUARE_SCORES, material_psqt
+
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = chess.PIECE_TYPES
+PROMOTIONS = (QUEEN, ROOK, BISHOP, KNIGHT)
+SEVENTY_FIVE_MOVES = 150  # half-moves without a capture or pawn move after which the game is drawn
+
+BB_ALL = chess.BB_ALL
+BB_SQUARES = chess.BB_SQUARES
+KNIGHT_ATTACKS = chess.BB_KNIGHT_ATTACKS
+KING_ATTACKS = chess.BB_KING_ATTACKS
+PAWN_ATTACKS = chess.BB_PAWN_ATTACKS  # [color][square]: squares a pawn of color on square attacks
+DIAG_MASKS, DIAG_ATTACKS = chess.BB_DIAG_MASKS, chess.BB_DIAG_ATTACKS
+FILE_MASKS, FILE_ATTACKS = chess.BB_FILE_MASKS, chess.BB_FILE_ATTACKS
+RANK_MASKS, RANK_ATTACKS = chess.BB_RANK_MASKS, chess.BB_RANK_ATTACKS
+ROOK_RAYS = [RANK_ATTACKS[square][0] | FILE_ATTACKS[square][0] for square in chess.SQUARES]
+BISHOP_RAYS = [DIAG_ATTACKS[square][0] for square in chess.SQUARES]
+BETWEEN = [[chess.between(a, b) for b in chess.SQUARES] for a in chess.SQUARES]
+LINE = chess.BB_RAYS  # [a][b]: the whole line through a and b, 0 if they are not aligned
+
+# Polyglot Zobrist keys, laid out as in transposition.zobrist_key
+_RANDOM = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+PIECE_KEYS = [[[_RANDOM[64 * ((piece_type - 1) * 2 + int(color)) + square] if piece_type else 0
+                for square in chess.SQUARES] for piece_type in range(7)] for color in (chess.BLACK, chess.WHITE)]
+TURN_KEY = _RANDOM[780]
+EP_KEYS = [_RANDOM[772 + file] for file in range(8)]
+_CASTLING_KEYS = [(chess.BB_H1, _RANDOM[768]), (chess.BB_A1, _RANDOM[769]),
+                  (chess.BB_H8, _RANDOM[770]), (chess.BB_A8, _RANDOM[771])]
+CASTLING_KEYS = {}
+for _rights in range(16):
+    _mask = sum(mask for bit, (mask, _) in enumerate(_CASTLING_KEYS) if _rights >> bit & 1)
+    CASTLING_KEYS[_mask] = 0
+    for mask, value in _CASTLING_KEYS:
+        if _mask & mask:
+            CASTLING_KEYS[_mask] ^= value
+
+# Per colour: (castling-rights rook square, king to, squares that must be empty, squares the king crosses)
+CASTLING = [
+    [(chess.BB_H8, chess.G8, chess.BB_F8 | chess.BB_G8, (chess.F8, chess.G8)),
+     (chess.BB_A8, chess.C8, chess.BB_B8 | chess.BB_C8 | chess.BB_D8, (chess.D8, chess.C8))],
+    [(chess.BB_H1, chess.G1, chess.BB_F1 | chess.BB_G1, (chess.F1, chess.G1)),
+     (chess.BB_A1, chess.C1, chess.BB_B1 | chess.BB_C1 | chess.BB_D1, (chess.D1, chess.C1))],
+]
+BACK_RANKS = [chess.BB_RANK_8, chess.BB_RANK_1]
+
+
+class SearchBoard:
+    '''
+    Compact position for the search loops: integer bitboards plus a square -> piece type array, with
+    make/unmake through an undo stack instead of chess.Board's copied board states. Moves are 16-bit codes
+    (transposition.encode_move), so they go straight into the transposition table.
+
+    The Zobrist key and the material + PSQT score are updated incrementally. Unlike chess.Board there is no
+    move history, so repetitions are not detected; game over means checkmate, stalemate, insufficient material
+    or the seventy-five-move rule. Only standard (non-Chess960) castling is supported.
+    '''
+    __slots__ = ("bb", "occ", "types", "turn", "castling", "ep_square", "halfmove_clock", "fullmove_number",
+                 "key", "material", "_history")
+
+    def __init__(self, board: chess.Board | None = None):
+        board = board if board is not None else chess.Board()
+        if board.chess960:
+            raise ValueError("SearchBoard does not support Chess960 castling")
+        self.bb = [0, board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings]
+        self.occ = [board.occupied_co[chess.BLACK], board.occupied_co[chess.WHITE]]
+        self.types = [board.piece_type_at(square) or 0 for square in chess.SQUARES]
+        self.turn = board.turn
+        self.castling = board.clean_castling_rights()
+        self.ep_square = board.ep_square
+        self.halfmove_clock = board.halfmove_clock
+        self.fullmove_number = board.fullmove_number
+        self.material = material_psqt(board)
+        self._history = []
+
+        key = CASTLING_KEYS[self.castling]
+        for square, piece_type in enumerate(self.types):
+            if piece_type:
+                key ^= PIECE_KEYS[bool(self.occ[chess.WHITE] & BB_SQUARES[square])][piece_type][square]
+        self.key = key ^ TURN_KEY if self.turn == chess.WHITE else key
+        return
+
+    def to_board(self) -> chess.Board:
+        board = chess.Board(None)
+        for square, piece_type in enumerate(self.types):
+            if piece_type:
+                board.set_piece_at(square, chess.Piece(piece_type, bool(self.occ[chess.WHITE] & BB_SQUARES[square])))
+        board.turn = self.turn
+        board.castling_rights = self.castling
+        board.ep_square = self.ep_square
+        board.halfmove_clock = self.halfmove_clock
+        board.fullmove_number = self.fullmove_number
+        return board
+
+    def zobrist(self) -> int:
+        '''
+        Same value as transposition.zobrist_key(self.to_board()).
+        '''
+        if self.ep_square is not None and (PAWN_ATTACKS[not self.turn][self.ep_square] & self.bb[PAWN]
+                                           & self.occ[self.turn]):
+            return self.key ^ EP_KEYS[self.ep_square & 7]
+        return self.key
+
+    def attackers(self, color: bool, square: int, occupied: int) -> int:
+        '''
+        Pieces of color attacking square, with sliders blocked by occupied.
+        '''
+        bb = self.bb
+        queens = bb[QUEEN]
+        return self.occ[color] & (
+            (KNIGHT_ATTACKS[square] & bb[KNIGHT]) | (KING_ATTACKS[square] & bb[KING])
+            | (PAWN_ATTACKS[not color][square] & bb[PAWN])
+            | ((RANK_ATTACKS[square][RANK_MASKS[square] & occupied]
+                | FILE_ATTACKS[square][FILE_MASKS[square] & occupied]) & (bb[ROOK] | queens))
+            | (DIAG_ATTACKS[square][DIAG_MASKS[square] & occupied] & (bb[BISHOP] | queens)))
+
+    def king(self, color: bool) -> int:
+        return (self.bb[KING] & self.occ[color]).bit_length() - 1
+
+    def is_check(self) -> bool:
+        return bool(self.attackers(not self.turn, self.king(self.turn), self.occ[0] | self.occ[1]))
+
+    def legal_moves(self) -> list[int]:
+        '''
+        Codes of every legal move: king moves are tested against the attacked squares, other pieces are
+        restricted to blocking or capturing a single checker and to their pin line.
+        '''
+        us = self.turn
+        them = not us
+        bb = self.bb
+        occ_us = self.occ[us]
+        occ_them = self.occ[them]
+        occupied = occ_us | occ_them
+        king = (bb[KING] & occ_us).bit_length() - 1
+        attackers = self.attackers
+        moves = []
+        append = moves.append
+
+        targets = KING_ATTACKS[king] & ~occ_us
+        without_king = occupied ^ BB_SQUARES[king]
+        while targets:
+            to_bb = targets & -targets
+            targets ^= to_bb
+            to = to_bb.bit_length() - 1
+            if not attackers(them, to, without_king):
+                append(king | to << 6)
+
+        checkers = attackers(them, king, occupied)
+        if checkers:
+            if checkers & (checkers - 1):
+                return moves  # double check: only the king can move
+            target = BETWEEN[king][checkers.bit_length() - 1] | checkers
+        else:
+            target = BB_ALL
+            if self.castling:
+                for king_to in self._castling_targets(occupied):
+                    append(king | king_to << 6)
+
+        pinned, pin_lines = self._pins(king, occ_us, occ_them, occupied)
+        allowed = ~occ_us & target
+        pieces = occ_us & ~bb[KING] & ~bb[PAWN]
+        while pieces:
+            from_bb = pieces & -pieces
+            pieces ^= from_bb
+            frm = from_bb.bit_length() - 1
+            piece_type = self.types[frm]
+            if piece_type == KNIGHT:
+                if from_bb & pinned:
+                    continue
+                dests = KNIGHT_ATTACKS[frm] & allowed
+            else:
+                dests = 0
+                if piece_type != BISHOP:
+                    dests = (RANK_ATTACKS[frm][RANK_MASKS[frm] & occupied]
+                             | FILE_ATTACKS[frm][FILE_MASKS[frm] & occupied])
+                if piece_type != ROOK:
+                    dests |= DIAG_ATTACKS[frm][DIAG_MASKS[frm] & occupied]
+                dests &= allowed
+                if from_bb & pinned:
+                    dests &= pin_lines[frm] # type: ignore
+            while dests:
+                to_bb = dests & -dests
+                dests ^= to_bb
+                append(frm | (to_bb.bit_length() - 1) << 6)
+
+        pawns = occ_us & bb[PAWN]
+        moves.extend(self._pawn_moves(pawns, king, occ_them, occupied, target, pinned, pin_lines, True))
+        return moves
+
+    def _pawn_moves(self, pawns: int, king: int, occ_them: int, occupied: int, target: int, pinned: int,
+                    pin_lines: dict | None, en_passant: bool) -> list[int]:
+        us = self.turn
+        step = 8 if us else -8
+        promotion_rank = 7 if us else 0
+        start_rank = 1 if us else 6
+        moves = []
+        append = moves.append
+        while pawns:
+            from_bb = pawns & -pawns
+            pawns ^= from_bb
+            frm = from_bb.bit_length() - 1
+            line = pin_lines[frm] if from_bb & pinned else BB_ALL # type: ignore
+
+            dests = PAWN_ATTACKS[us][frm] & occ_them
+            to = frm + step
+            if not BB_SQUARES[to] & occupied:
+                dests |= BB_SQUARES[to]
+                if frm >> 3 == start_rank and not BB_SQUARES[to + step] & occupied:
+                    dests |= BB_SQUARES[to + step]
+            dests &= target & line
+            while dests:
+                to_bb = dests & -dests
+                dests ^= to_bb
+                to = to_bb.bit_length() - 1
+                if to >> 3 == promotion_rank:
+                    for promotion in PROMOTIONS:
+                        append(frm | to << 6 | promotion << 12)
+                else:
+                    append(frm | to << 6)
+        if en_passant:
+            moves.extend(self._en_passant_moves(self.occ[us] & self.bb[PAWN], king, occupied))
+        return moves
+
+    def _en_passant_moves(self, pawns: int, king: int, occupied: int) -> list[int]:
+        ep_square = self.ep_square
+        if ep_square is None:
+            return []
+        us = self.turn
+        moves = []
+        captured_bb = BB_SQUARES[ep_square - 8 if us else ep_square + 8]
+        capturers = PAWN_ATTACKS[not us][ep_square] & pawns
+        while capturers:
+            from_bb = capturers & -capturers
+            capturers ^= from_bb
+            # Removes two pawns from a rank at once, so check the resulting position directly
+            after = occupied ^ from_bb ^ captured_bb | BB_SQUARES[ep_square]
+            if not self.attackers(not us, king, after) & ~captured_bb:
+                moves.append(from_bb.bit_length() - 1 | ep_square << 6)
+        return moves
+
+    def _castling_targets(self, occupied: int) -> list[int]:
+        # King destinations of the castling moves available when the side to move is not in check
+        them = not self.turn
+        return [king_to for rights, king_to, empty, crossed in CASTLING[self.turn]
+                if self.castling & rights and not occupied & empty
+                and not any(self.attackers(them, square, occupied) for square in crossed)]
+
+    def _pins(self, king: int, occ_us: int, occ_them: int, occupied: int) -> tuple[int, dict | None]:
+        '''
+        Own pieces pinned to the king, and the line each may still move along (None if nothing is pinned).
+        '''
+        bb = self.bb
+        queens = bb[QUEEN]
+        pinned = 0
+        pin_lines = None
+        snipers = ((ROOK_RAYS[king] & (bb[ROOK] | queens)) | (BISHOP_RAYS[king] & (bb[BISHOP] | queens))) & occ_them
+        while snipers:
+            sniper_bb = snipers & -snipers
+            snipers ^= sniper_bb
+            sniper = sniper_bb.bit_length() - 1
+            blockers = BETWEEN[king][sniper] & occupied
+            if blockers and not blockers & (blockers - 1) and blockers & occ_us:
+                pinned |= blockers
+                if pin_lines is None:
+                    pin_lines = {}
+                pin_lines[blockers.bit_length() - 1] = LINE[king][sniper]
+        return pinned, pin_lines
+
+    def count_legal_moves(self) -> int:
+        '''
+        len(self.legal_moves()) without building the list: destinations are counted as whole bitboards,
+        with pawn pushes and captures shifted set-wise.
+        '''
+        us = self.turn
+        them = not us
+        bb = self.bb
+        occ_us = self.occ[us]
+        occ_them = self.occ[them]
+        occupied = occ_us | occ_them
+        king = (bb[KING] & occ_us).bit_length() - 1
+        attackers = self.attackers
+        count = 0
+
+        targets = KING_ATTACKS[king] & ~occ_us
+        without_king = occupied ^ BB_SQUARES[king]
+        while targets:
+            to_bb = targets & -targets
+            targets ^= to_bb
+            if not attackers(them, to_bb.bit_length() - 1, without_king):
+                count += 1
+
+        checkers = attackers(them, king, occupied)
+        if checkers:
+            if checkers & (checkers - 1):
+                return count
+            target = BETWEEN[king][checkers.bit_length() - 1] | checkers
+        else:
+            target = BB_ALL
+            if self.castling:
+                count += len(self._castling_targets(occupied))
+
+        pinned, pin_lines = self._pins(king, occ_us, occ_them, occupied)
+        allowed = ~occ_us & target
+        pieces = occ_us & ~bb[KING] & ~bb[PAWN]
+        types = self.types
+        while pieces:
+            from_bb = pieces & -pieces
+            pieces ^= from_bb
+            frm = from_bb.bit_length() - 1
+            piece_type = types[frm]
+            if piece_type == KNIGHT:
+                if not from_bb & pinned:
+                    count += (KNIGHT_ATTACKS[frm] & allowed).bit_count()
+                continue
+            dests = 0
+            if piece_type != BISHOP:
+                dests = RANK_ATTACKS[frm][RANK_MASKS[frm] & occupied] | FILE_ATTACKS[frm][FILE_MASKS[frm] & occupied]
+            if piece_type != ROOK:
+                dests |= DIAG_ATTACKS[frm][DIAG_MASKS[frm] & occupied]
+            dests &= allowed
+            if from_bb & pinned:
+                dests &= pin_lines[frm] # type: ignore
+            count += dests.bit_count()
+
+        pawns = occ_us & bb[PAWN]
+        empty = BB_ALL ^ occupied
+        free = pawns & ~pinned
+        if us:
+            single = (free << 8) & empty
+            pushes = (single, ((single & chess.BB_RANK_3) << 8) & empty,
+                      ((free & ~chess.BB_FILE_A) << 7) & occ_them, ((free & ~chess.BB_FILE_H) << 9) & occ_them)
+        else:
+            single = (free >> 8) & empty
+            pushes = (single, ((single & chess.BB_RANK_6) >> 8) & empty,
+                      ((free & ~chess.BB_FILE_A) >> 9) & occ_them, ((free & ~chess.BB_FILE_H) >> 7) & occ_them)
+        for dests in pushes:
+            dests &= target
+            # Every promotion square counts four moves
+            count += dests.bit_count() + 3 * (dests & chess.BB_BACKRANKS).bit_count()
+
+        # Pinned pawns and en passant are rare; count them from the generated moves
+        ep_square = self.ep_square
+        if pinned & pawns or (ep_square is not None and PAWN_ATTACKS[them][ep_square] & pawns):
+            count += len(self._pawn_moves(pawns & pinned, king, occ_them, occupied, target, pinned, pin_lines, False))
+            count += len(self._en_passant_moves(pawns, king, occupied))
+        return count
+
+    def make(self, move: int) -> None:
+        frm = move & 63
+        to = (move >> 6) & 63
+        promotion = move >> 12
+        bb = self.bb
+        occ = self.occ
+        types = self.types
+        us = self.turn
+        them = not us
+        piece_type = types[frm]
+        captured = types[to]
+        captured_square = to
+        if piece_type == PAWN and to == self.ep_square and not captured:
+            captured = PAWN
+            captured_square = to - 8 if us else to + 8
+        self._history.append((move, piece_type, captured, captured_square, self.castling, self.ep_square,
+                              self.halfmove_clock, self.key, self.material))
+
+        key = self.key ^ TURN_KEY
+        material = self.material
+        own_keys = PIECE_KEYS[us]
+        own_scores = PIECE_SQUARE_SCORES[us]
+        if captured:
+            captured_bb = BB_SQUARES[captured_square]
+            bb[captured] ^= captured_bb
+            occ[them] ^= captured_bb
+            types[captured_square] = 0
+            key ^= PIECE_KEYS[them][captured][captured_square]
+            material -= PIECE_SQUARE_SCORES[them][captured][captured_square]
+
+        from_bb = BB_SQUARES[frm]
+        to_bb = BB_SQUARES[to]
+        new_type = promotion or piece_type
+        bb[piece_type] ^= from_bb
+        bb[new_type] |= to_bb
+        occ[us] ^= from_bb | to_bb
+        types[frm] = 0
+        types[to] = new_type
+        key ^= own_keys[piece_type][frm] ^ own_keys[new_type][to]
+        material += own_scores[new_type][to] - own_scores[piece_type][frm]
+
+        if piece_type == KING and (to - frm == 2 or frm - to == 2):
+            rook_from, rook_to = (frm + 3, frm + 1) if to > frm else (frm - 4, frm - 1)
+            rook_bb = BB_SQUARES[rook_from] | BB_SQUARES[rook_to]
+            bb[ROOK] ^= rook_bb
+            occ[us] ^= rook_bb
+            types[rook_from] = 0
+            types[rook_to] = ROOK
+            key ^= own_keys[ROOK][rook_from] ^ own_keys[ROOK][rook_to]
+            material += own_scores[ROOK][rook_to] - own_scores[ROOK][rook_from]
+
+        castling = self.castling
+        if castling:
+            castling &= ~(from_bb | to_bb)
+            if piece_type == KING:
+                castling &= ~BACK_RANKS[us]
+            if castling != self.castling:
+                key ^= CASTLING_KEYS[self.castling] ^ CASTLING_KEYS[castling]
+                self.castling = castling
+
+        self.ep_square = (frm + to) >> 1 if piece_type == PAWN and (to - frm == 16 or frm - to == 16) else None
+        self.halfmove_clock = 0 if piece_type == PAWN or captured else self.halfmove_clock + 1
+        if not us:
+            self.fullmove_number += 1
+        self.turn = them
+        self.key = key
+        self.material = material
+        return
+
+    def unmake(self) -> None:
+        (move, piece_type, captured, captured_square, self.castling, self.ep_square, self.halfmove_clock,
+         self.key, self.material) = self._history.pop()
+        frm = move & 63
+        to = (move >> 6) & 63
+        bb = self.bb
+        occ = self.occ
+        types = self.types
+        them = self.turn
+        us = not them
+
+        from_bb = BB_SQUARES[frm]
+        to_bb = BB_SQUARES[to]
+        bb[(move >> 12) or piece_type] ^= to_bb
+        bb[piece_type] |= from_bb
+        occ[us] ^= from_bb | to_bb
+        types[to] = 0
+        types[frm] = piece_type
+
+        if piece_type == KING and (to - frm == 2 or frm - to == 2):
+            rook_from, rook_to = (frm + 3, frm + 1) if to > frm else (frm - 4, frm - 1)
+            rook_bb = BB_SQUARES[rook_from] | BB_SQUARES[rook_to]
+            bb[ROOK] ^= rook_bb
+            occ[us] ^= rook_bb
+            types[rook_to] = 0
+            types[rook_from] = ROOK
+
+        if captured:
+            captured_bb = BB_SQUARES[captured_square]
+            bb[captured] |= captured_bb
+            occ[them] |= captured_bb
+            types[captured_square] = captured
+
+        if not us:
+            self.fullmove_number -= 1
+        self.turn = us
+        return
+
+    def is_capture(self, move: int) -> bool:
+        to = (move >> 6) & 63
+        return bool(self.types[to]) or (to == self.ep_square and self.types[move & 63] == PAWN)
+
+    def gives_check(self, move: int) -> bool:
+        self.make(move)
+        check = self.is_check()
+        self.unmake()
+        return check
+
+    def is_insufficient_material(self) -> bool:
+        return self._insufficient(chess.WHITE) and self._insufficient(chess.BLACK)
+
+    def _insufficient(self, color: bool) -> bool:
+        # Same rules as chess.Board.has_insufficient_material
+        bb = self.bb
+        own = self.occ[color]
+        if own & (bb[PAWN] | bb[ROOK] | bb[QUEEN]):
+            return False
+        if own & bb[KNIGHT]:
+            return (chess.popcount(own) <= 2
+                    and not self.occ[not color] & ~bb[KING] & ~bb[QUEEN])
+        if own & bb[BISHOP]:
+            same_color = (not bb[BISHOP] & chess.BB_DARK_SQUARES) or (not bb[BISHOP] & chess.BB_LIGHT_SQUARES)
+            return same_color and not bb[PAWN] and not bb[KNIGHT]
+        return True
+
+    def is_game_over(self, moves: list[int]) -> bool:
+        '''
+        Whether the game has ended, given the legal moves of the position.
+        '''
+        return not moves or self.halfmove_clock >= SEVENTY_FIVE_MOVES or self.is_insufficient_material()
+
+    def evaluate(self, moves: list[int] | None = None) -> int:
+        '''
+        classical_evaluation.evaluate_position of this position; moves are its legal moves if already known.
+        '''
+        mobility = len(moves) if moves is not None else self.count_legal_moves()
+        if mobility == 0:
+            if self.is_check():
+                return -99999 if self.turn else 99999
+            return 0
+        if self.is_insufficient_material():
+            return 0
+        return self.material + (5 * mobility if self.turn else -5 * mobility)
+
+    def evaluate_children(self, moves: list[int]) -> list[int]:
+        scores = []
+        for move in moves:
+            self.make(move)
+            scores.append(self.evaluate())
+            self.unmake()
+        return scores
+
+    def perft(self, depth: int) -> int:
+        '''
+        Number of leaf positions depth plies below this one.
+        '''
+        if depth <= 1:
+            return self.count_legal_moves() if depth == 1 else 1
+        count = 0
+        for move in self.legal_moves():
+            self.make(move)
+            count += self.perft(depth - 1)
+            self.unmake()
+        return count
@@ -0,0 +1,374 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+import time
+import chess
+from grover import EXECUTION_MODES, GroverPolicy, grover_policy, grover_select_batch
+from quantum_backend import batched_search
+from search import SearchAborted, SearchLimits
+from stats import SearchStats
+
+
+DEFAULT_DEPTH = 2
+BATCH_WINDOW = 0.005     # seconds the scheduler waits for other games' circuits before running a batch
+MAX_BATCH_JOBS = 256     # Grover circuits per simulator batch; bounds how long any one batch can take
+LATENCY_WINDOW = 1000    # recent request latencies kept for the percentiles reported by "stats"
+
+
+class CircuitScheduler:
+    '''
+    Collects the Grover jobs pending from concurrent searches and runs them as shared simulator batches.
+
+    Each search awaits select() with the jobs of its current ply. Once BATCH_WINDOW has passed, the scheduler
+    takes pending requests in deadline order up to max_batch_jobs circuits, runs them as one
+    grover_select_batch call (one backend job in "aer" mode) on its own thread and hands every request its
+    share of the selections. Cancelled requests are dropped before their batch runs.
+    '''
+
+    def __init__(self, mode: str = "aer", shots: int = 1024, batch_window: float = BATCH_WINDOW,
+                 max_batch_jobs: int = MAX_BATCH_JOBS):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode {mode!r}; expected one of {EXECUTION_MODES}")
+        self.mode = mode
+        self.shots = shots
+        self.batch_window = batch_window
+        self.max_batch_jobs = max_batch_jobs
+        self.stats = SearchStats()
+        self.batches = 0
+        self._queue = []  # heap of (deadline, sequence number, jobs, future)
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        # One simulation at a time: the circuit cache and Aer backend are shared, and Aer parallelises each batch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="grover-batch")
+        self._task = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=True)
+        return
+
+    async def select(self, jobs: list[tuple[int, list[int]]], deadline: float | None = None) -> list[int]:
+        '''
+        Selected index of every (num_moves, marked_indices) job, once the batch they join has run.
+        Requests with earlier deadlines (time.monotonic() values) are batched first.
+        '''
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (math.inf if deadline is None else deadline, next(self._sequence), jobs, future))
+        self._wakeup.set()
+        return await future
+
+    def _next_batch(self) -> list[tuple[list, asyncio.Future]]:
+        batch, size = [], 0
+        while self._queue:
+            _, _, jobs, future = self._queue[0]
+            if future.cancelled():
+                heapq.heappop(self._queue)
+                continue
+            # A single request larger than the cap still runs, on its own
+            if batch and size + len(jobs) > self.max_batch_jobs:
+                break
+            heapq.heappop(self._queue)
+            batch.append((jobs, future))
+            size += len(jobs)
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Let searches of other games reach their next ply so their circuits share the batch
+            await asyncio.sleep(self.batch_window)
+            batch = self._next_batch()
+            if self._queue:
+                self._wakeup.set()
+            if not batch:
+                continue
+
+            all_jobs = [job for jobs, _ in batch for job in jobs]
+            try:
+                selected = await loop.run_in_executor(self._executor, grover_select_batch, all_jobs, self.mode,
+                                                      self.shots, self.stats)
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            self.batches += 1
+            start = 0
+            for jobs, future in batch:
+                if not future.done():
+                    future.set_result(selected[start:start + len(jobs)])
+                start += len(jobs)
+
+
+def parse_move_request(message: dict) -> tuple[str, int | None, float | None]:
+    '''
+    The (fen, depth, timeout) of a "move" message, with the defaults of EngineService.search for missing keys.
+    Raises ValueError for a malformed field, so bad requests get an error reply instead of failing the search.
+    '''
+    fen = message.get("fen", chess.STARTING_FEN)
+    depth = message.get("depth")
+    timeout = message.get("timeout")
+    if not isinstance(fen, str):
+        raise ValueError("fen must be a string")
+    chess.Board(fen)
+    if depth is not None and (isinstance(depth, bool) or not isinstance(depth, int) or depth < 1):
+        raise ValueError("depth must be a positive integer")
+    if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise ValueError("timeout must be a positive number of seconds")
+    return fen, depth, timeout
+
+
+def _step(search, value):
+    # StopIteration cannot cross an executor future, so the generator's return value is passed back as data
+    try:
+        return False, search.send(value)
+    except StopIteration as stop:
+        return True, stop.value
+
+
+class EngineService:
+    '''
+    Hosts move searches for many games in one process. Every request runs the batched quantum minimax on a
+    thread pool and sends the Grover circuits of each ply to a shared CircuitScheduler, so concurrent games
+    fill each other's simulator batches.
+    '''
+
+    def __init__(self, mode: str = "aer", depth: int = DEFAULT_DEPTH, policy: str | GroverPolicy = "all",
+                 batch_window: float = BATCH_WINDOW, max_batch_jobs: int = MAX_BATCH_JOBS,
+                 workers: int | None = None):
+        self.depth = depth
+        self.policy = grover_policy(policy)
+        self.scheduler = CircuitScheduler(mode, batch_window=batch_window, max_batch_jobs=max_batch_jobs)
+        # Tree expansion and evaluation; it overlaps with the simulation running on the scheduler's thread
+        self._executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                            thread_name_prefix="search")
+        self.counts = {"requests": 0, "completed": 0, "expired": 0, "cancelled": 0, "failed": 0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    async def __aenter__(self):
+        self.scheduler.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.scheduler.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        return
+
+    async def search(self, fen: str, depth: int | None = None, timeout: float | None = None) -> dict:
+        '''
+        Searches fen and returns {"move", "score", "depth", "nodes", "time"}, or {"error", "time"} when the
+        timeout (seconds) expires first. Cancelling the awaiting task stops the search.
+        '''
+        depth = depth or self.depth
+        board = chess.Board(fen)
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        stop_event = threading.Event()
+        stats = SearchStats()
+        self.counts["requests"] += 1
+        try:
+            score, move = await asyncio.wait_for(self._search(board, depth, deadline, stop_event, stats), timeout)
+            self.counts["completed"] += 1
+            result = {"move": move.uci() if move else None, "score": score, "depth": depth, "nodes": stats.nodes}
+        except (asyncio.TimeoutError, SearchAborted):
+            self.counts["expired"] += 1
+            result = {"error": "deadline exceeded"}
+        except asyncio.CancelledError:
+            self.counts["cancelled"] += 1
+            raise
+        finally:
+            # Ends the tree expansion still running on a search thread, if any
+            stop_event.set()
+        result["time"] = time.monotonic() - start
+        self.latencies.append(result["time"])
+        return result
+
+    async def _search(self, board: chess.Board, depth: int, deadline: float | None, stop_event: threading.Event,
+                      stats: SearchStats) -> tuple[int, chess.Move | None]:
+        loop = asyncio.get_running_loop()
+        time_limit = deadline - time.monotonic() if deadline is not None else None
+        limits = SearchLimits(time_limit=time_limit, stop_event=stop_event)
+        search = batched_search(board, depth, stats, None, limits, self.policy)
+        done, value = await loop.run_in_executor(self._executor, _step, search, None)
+        while not done:
+            selected = await self.scheduler.select(value, deadline)
+            done, value = await loop.run_in_executor(self._executor, _step, search, selected)
+        score, move = value
+        return score, move or None
+
+    def status(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float | None:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else None
+
+        return {**self.counts, "batches": self.scheduler.batches, "circuits": self.scheduler.stats.circuits,
+                "circuits_per_batch": self.scheduler.stats.circuits / max(self.scheduler.batches, 1),
+                "latency_p50": percentile(0.5), "latency_p95": percentile(0.95),
+                "latency_max": latencies[-1] if latencies else None}
+
+    async def handle(self, message: dict, send, requests: dict) -> bool:
+        '''
+        Processes one protocol message; move requests run as tasks kept in requests (id -> task) until they
+        reply. Returns False on "quit".
+        '''
+        op = message.get("op", "move")
+        request_id = message.get("id")
+        if op == "move":
+            if request_id in requests:
+                send({"id": request_id, "error": "duplicate id"})
+                return True
+            try:
+                fen, depth, timeout = parse_move_request(message)
+            except ValueError as error:
+                self.counts["requests"] += 1
+                self.counts["failed"] += 1
+                send({"id": request_id, "error": str(error)})
+                return True
+            task = asyncio.get_running_loop().create_task(self._respond(request_id, fen, depth, timeout, send,
+                                                                        requests))
+            task.add_done_callback(lambda task: self._cancelled_early(task, request_id, send, requests))
+            requests[request_id] = task
+        elif op == "cancel":
+            task = requests.get(request_id)
+            if task is not None:
+                task.cancel()
+        elif op == "stats":
+            send({"id": request_id, **self.status()})
+        elif op == "quit":
+            return False
+        else:
+            send({"id": request_id, "error": f"unknown op {op!r}"})
+        return True
+
+    async def _respond(self, request_id, fen: str, depth: int | None, timeout: float | None, send,
+                       requests: dict) -> None:
+        try:
+            result = await self.search(fen, depth, timeout)
+        except asyncio.CancelledError:
+            result = {"error": "cancelled"}
+        except Exception as error:
+            # Every request gets a reply, whatever went wrong in its search
+            self.counts["failed"] += 1
+            result = {"error": str(error) or type(error).__name__}
+        finally:
+            requests.pop(request_id, None)
+        send({"id": request_id, **result})
+        return
+
+    def _cancelled_early(self, task: asyncio.Task, request_id, send, requests: dict) -> None:
+        # A request cancelled before its task first ran never reaches _respond's handler, so reply here
+        if task.cancelled():
+            requests.pop(request_id, None)
+            self.counts["requests"] += 1
+            self.counts["cancelled"] += 1
+            send({"id": request_id, "error": "cancelled"})
+        return
+
+    async def serve_lines(self, read_line, send) -> None:
+        '''
+        Runs the JSON-lines protocol over one connection: read_line() is awaited for each request line ("" at
+        end of input) and send(dict) writes a reply. Outstanding requests are answered before returning.
+        '''
+        requests = {}
+        while line := await read_line():
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                send({"error": "invalid JSON"})
+                continue
+            if not await self.handle(message, send, requests):
+                for task in list(requests.values()):
+                    task.cancel()
+                break
+        if requests:
+            await asyncio.gather(*requests.values(), return_exceptions=True)
+        return
+
+
+async def serve_stdio(service: EngineService) -> None:
+    loop = asyncio.get_running_loop()
+
+    def send(reply: dict) -> None:
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+        return
+
+    # A plain thread reads stdin, which works for pipes, files and terminals alike
+    await service.serve_lines(lambda: loop.run_in_executor(None, sys.stdin.readline), send)
+    return
+
+
+async def serve_socket(service: EngineService, host: str, port: int) -> None:
+    async def connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def read_line() -> str:
+            # Replies are written without waiting; a client that stops reading them stops having its
+            # requests read, so the write buffer cannot grow without bound
+            await writer.drain()
+            return (await reader.readline()).decode()
+
+        def send(reply: dict) -> None:
+            writer.write((json.dumps(reply) + "\n").encode())
+            return
+
+        try:
+            await service.serve_lines(read_line, send)
+        finally:
+            writer.close()
+        return
+
+    server = await asyncio.start_server(connection, host, port)
+    async with server:
+        await server.serve_forever()
+    return
+
+
+async def _serve(args) -> None:
+    async with EngineService(args.mode, args.depth, args.policy, args.batch_window / 1000,
+                             args.max_batch_jobs) as service:
+        if args.port is None:
+            await serve_stdio(service)
+        else:
+            await serve_socket(service, args.host, args.port)
+    return
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="main.py serve",
+                                     description="Serve move requests for many games as JSON lines.")
+    parser.add_argument("--mode", choices=EXECUTION_MODES, default="aer")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="default search depth")
+    parser.add_argument("--policy", default="all", help="where Grover selection runs: all, root, top:K, branching:B")
+    parser.add_argument("--port", type=int, help="listen on this TCP port instead of stdin/stdout")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--batch-window", type=float, default=BATCH_WINDOW * 1000, help="milliseconds")
+    parser.add_argument("--max-batch-jobs", type=int, default=MAX_BATCH_JOBS)
+    args = parser.parse_args(argv)
+    asyncio.run(_serve(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+from typing import Callable
+
+
+class SearchStats:
+    '''
+    Counters and per-phase timers (seconds) collected while searching a move.
+
+    Search functions only touch the object they are given, so passing stats=None turns instrumentation off.
+    '''
+    COUNTERS = ("nodes", "leaves", "cutoffs", "circuits", "circuits_built", "qubits", "gates",
+                "grover_iterations", "shots")
+    TIMERS = ("movegen_time", "evaluation_time", "build_time", "transpile_time", "simulation_time", "search_time")
+    # Shots used by each circuit, in the order they ran
+    SAMPLES = ("circuit_shots",)
+    __slots__ = COUNTERS + TIMERS + SAMPLES
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        for name in self.TIMERS:
+            setattr(self, name, 0.0)
+        self.circuit_shots = []
+        return
+
+    def as_dict(self) -> dict:
+        return {name: list(getattr(self, name)) if name in self.SAMPLES else getattr(self, name)
+                for name in self.__slots__}
+
+    def merge(self, counts: dict) -> None:
+        '''
+        Adds counters collected elsewhere (e.g. another process's as_dict()) into this object;
+        per-circuit samples are appended.
+        '''
+        for name, value in counts.items():
+            setattr(self, name, getattr(self, name) + value)
+        return
+
+
+# Callbacks receiving (stats, context) after every engine search, e.g. to export metrics
+_hooks = []
+
+
+def add_stats_hook(hook: Callable[[SearchStats, dict], None]) -> None:
+    _hooks.append(hook)
+    return
+
+
+def remove_stats_hook(hook: Callable[[SearchStats, dict], None]) -> None:
+    if hook in _hooks:
+        _hooks.remove(hook)
+    return
+
+
+def publish_stats(stats: SearchStats, context: dict) -> None:
+    '''
+    Passes a finished search's stats and context (position, move, depth, ...) to every registered hook.
+    '''
+    for hook in list(_hooks):
+        hook(stats, context)
+    return
@@ -0,0 +1,140 @@
+import array
+import chess
+import chess.polyglot
+
+
+EMPTY, EXACT, LOWER, UPPER = 0, 1, 2, 3
+
+_RANDOM = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+_PIECE_KEYS = [(piece_type, color, 64 * ((piece_type - 1) * 2 + int(color)))
+               for piece_type in chess.PIECE_TYPES for color in chess.COLORS]
+_CASTLING_KEYS = [(chess.BB_H1, _RANDOM[768]), (chess.BB_A1, _RANDOM[769]),
+                  (chess.BB_H8, _RANDOM[770]), (chess.BB_A8, _RANDOM[771])]
+
+
+def zobrist_key(board: chess.Board) -> int:
+    '''
+    Same value as chess.polyglot.zobrist_hash, computed from the piece bitboards instead of square by square.
+    '''
+    key = 0
+    for piece_type, color, offset in _PIECE_KEYS:
+        for square in chess.scan_reversed(board.pieces_mask(piece_type, color)):
+            key ^= _RANDOM[offset + square]
+
+    castling = board.clean_castling_rights()
+    if castling:
+        for mask, value in _CASTLING_KEYS:
+            if castling & mask:
+                key ^= value
+
+    if board.ep_square:
+        # Only hashed if a pawn of the side to move could capture en passant
+        ep_mask = chess.BB_SQUARES[board.ep_square]
+        ep_mask = chess.shift_down(ep_mask) if board.turn == chess.WHITE else chess.shift_up(ep_mask)
+        ep_mask = chess.shift_left(ep_mask) | chess.shift_right(ep_mask)
+        if ep_mask & board.pawns & board.occupied_co[board.turn]:
+            key ^= _RANDOM[772 + chess.square_file(board.ep_square)]
+
+    if board.turn == chess.WHITE:
+        key ^= _RANDOM[780]
+    return key
+
+
+def encode_move(move: chess.Move) -> int:
+    '''
+    Packs a move into 16 bits: from square, to square and promotion piece type.
+    '''
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(code: int) -> chess.Move:
+    if code == 0:
+        return chess.Move.null()
+    return chess.Move(code & 63, (code >> 6) & 63, (code >> 12) or None)
+
+
+class TranspositionTable:
+    '''
+    Fixed-size transposition table keyed by Zobrist hash.
+
+    Entries live in parallel typed arrays (key, score, depth, bound, best move, generation) rather than
+    per-entry Python objects, so memory is bounded by size_mb. A slot is overwritten when it is empty,
+    holds the same position, was written during an older search, or holds a shallower result.
+    '''
+
+    def __init__(self, size_mb: float = 16):
+        self.size_mb = size_mb
+        self.probes = 0
+        self.hits = 0
+        self.generation = 0
+
+        entry_bytes = sum(array.array(code).itemsize for code in "QiBBHB")
+        capacity = max(1, int(size_mb * 1024 * 1024) // entry_bytes)
+        self.num_entries = 1 << (capacity.bit_length() - 1)
+        self.mask = self.num_entries - 1
+        self._allocate()
+
+    def _allocate(self) -> None:
+        n = self.num_entries
+        self.keys = array.array("Q", bytes(8 * n))
+        self.scores = array.array("i", bytes(4 * n))
+        self.depths = array.array("B", bytes(n))
+        self.flags = array.array("B", bytes(n))
+        self.moves = array.array("H", bytes(2 * n))
+        self.ages = array.array("B", bytes(n))
+        return
+
+    def clear(self) -> None:
+        self._allocate()
+        self.probes = 0
+        self.hits = 0
+        self.generation = 0
+        return
+
+    def new_search(self) -> None:
+        '''
+        Marks entries from earlier searches as replaceable.
+        '''
+        self.generation = (self.generation + 1) & 0xFF
+        return
+
+    def probe(self, key: int) -> tuple[int, int, int, int] | None:
+        '''
+        Returns (score, depth, flag, move code) for the position, or None on a miss.
+        '''
+        self.probes += 1
+        i = key & self.mask
+        if self.flags[i] == EMPTY or self.keys[i] != key:
+            return None
+        self.hits += 1
+        return self.scores[i], self.depths[i], self.flags[i], self.moves[i]
+
+    def store(self, key: int, depth: int, score: int, flag: int, move: chess.Move | int | None = None) -> None:
+        '''
+        move may be a chess.Move or an encode_move code (as used by SearchBoard).
+        '''
+        i = key & self.mask
+        if (self.flags[i] != EMPTY and self.keys[i] != key and self.ages[i] == self.generation
+                and depth < self.depths[i]):
+            return
+
+        # Keep the previous best move when re-storing the same position without one
+        if isinstance(move, chess.Move):
+            move = encode_move(move)
+        move_code = move if move else (self.moves[i] if self.keys[i] == key else 0)
+
+        self.keys[i] = key
+        self.scores[i] = score
+        self.depths[i] = min(depth, 255)
+        self.flags[i] = flag
+        self.moves[i] = move_code
+        self.ages[i] = self.generation
+        return
+
+    def hashfull(self) -> int:
+        '''
+        Permille of slots in use, sampled from the first thousand entries (as reported by UCI engines).
+        '''
+        sample = min(1000, self.num_entries)
+        used = sum(1 for i in range(sample) if self.flags[i] != EMPTY)
+        return used * 1000 // sample
@@ -0,0 +1,253 @@
+import sys
+import threading
+import time
+import chess
+from engine import QuantumChessEngine, DEFAULT_DEPTH, MAX_SEARCH_DEPTH
+from grover import EXECUTION_MODES, GroverPolicy, configure_adaptive_shots
+from quantum_backend import SEARCH_MODES
+from search import SearchLimits
+from stats import SearchStats
+
+
+ENGINE_NAME = "Quantum Chess Engine"
+ENGINE_AUTHOR = "J-Raghoonanan"
+
+# Time management
+MOVE_OVERHEAD = 0.05     # seconds kept back for communication with the GUI
+DEFAULT_MOVES_TO_GO = 30
+INCREMENT_SHARE = 0.75
+MAX_CLOCK_SHARE = 0.5    # never plan to use more than this share of the remaining clock
+
+
+def allocate_time(params: dict, turn: bool) -> float | None:
+    '''
+    Seconds to spend on this move given the arguments of a "go" command, or None for no time limit.
+    '''
+    if "movetime" in params:
+        return max(0.01, params["movetime"] / 1000 - MOVE_OVERHEAD)
+
+    clock = params.get("wtime" if turn == chess.WHITE else "btime")
+    if clock is None:
+        return None
+    increment = params.get("winc" if turn == chess.WHITE else "binc", 0)
+    moves_to_go = params.get("movestogo") or DEFAULT_MOVES_TO_GO
+
+    budget = clock / moves_to_go + INCREMENT_SHARE * increment
+    budget = min(budget, MAX_CLOCK_SHARE * clock)
+    return max(0.01, budget / 1000 - MOVE_OVERHEAD)
+
+
+def parse_go(tokens: list[str]) -> dict:
+    '''
+    Parses the arguments of a "go" command into a dict of integers (and the infinite/ponder flags).
+    '''
+    params = {}
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in ("infinite", "ponder"):
+            params[token] = True
+        elif token in ("movetime", "wtime", "btime", "winc", "binc", "movestogo", "depth", "nodes", "mate"):
+            if i + 1 < len(tokens):
+                params[token] = int(tokens[i + 1])
+                i += 1
+        i += 1
+    return params
+
+
+def parse_position(tokens: list[str]) -> chess.Board:
+    '''
+    Builds the board for "position [startpos | fen <fen>] [moves <m1> ...]".
+    '''
+    if "moves" in tokens:
+        split = tokens.index("moves")
+        setup, moves = tokens[:split], tokens[split + 1:]
+    else:
+        setup, moves = tokens, []
+
+    if setup and setup[0] == "fen":
+        board = chess.Board(" ".join(setup[1:]))
+    else:
+        board = chess.Board()
+    for uci in moves:
+        board.push_uci(uci)
+    return board
+
+
+class UCIEngine:
+    '''
+    Universal Chess Interface front-end for QuantumChessEngine.
+
+    Searches run on a worker thread so "stop", "isready" and "quit" are handled while the engine thinks.
+    '''
+
+    def __init__(self, output=None):
+        self.output = output if output is not None else sys.stdout
+        self.options = {"Mode": "aer", "Search": "minimax", "Hash": 16, "Threads": 1, "ShotConfidence": 0,
+                        "GroverPolicy": "all"}
+        self.engine = self._make_engine()
+        self.board = chess.Board()
+        self._output_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._search_thread = None
+
+    def _make_engine(self) -> QuantumChessEngine:
+        return QuantumChessEngine(mode=self.options["Mode"], search=self.options["Search"],
+                                  tt_size_mb=self.options["Hash"], workers=self.options["Threads"],
+                                  policy=self.options["GroverPolicy"])
+
+    def send(self, line: str) -> None:
+        with self._output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+        return
+
+    def handle(self, line: str) -> bool:
+        '''
+        Processes one command line; returns False once the engine should exit.
+        '''
+        tokens = line.strip().split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send("option name Mode type combo default aer " + " ".join(f"var {m}" for m in EXECUTION_MODES))
+            self.send("option name Search type combo default minimax " + " ".join(f"var {s}" for s in SEARCH_MODES))
+            self.send("option name Hash type spin default 16 min 0 max 4096")
+            self.send("option name Threads type spin default 1 min 1 max 256")
+            self.send("option name ShotConfidence type spin default 0 min 0 max 99")
+            self.send("option name GroverPolicy type string default all")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "setoption":
+            self.wait()
+            self._set_option(args)
+        elif command == "ucinewgame":
+            self.wait()
+            if self.engine.tt is not None:
+                self.engine.tt.clear()
+            self.board = chess.Board()
+        elif command == "position":
+            self.wait()
+            self.board = parse_position(args)
+        elif command == "go":
+            self.wait()
+            self.go(parse_go(args))
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            return False
+        return True
+
+    def _set_option(self, args: list[str]) -> None:
+        if "name" not in args:
+            return
+        name_start = args.index("name") + 1
+        value_start = args.index("value") if "value" in args else len(args)
+        name = " ".join(args[name_start:value_start])
+        value = " ".join(args[value_start + 1:])
+
+        if name in ("Hash", "Threads"):
+            self.options[name] = int(value)
+        elif name == "ShotConfidence":
+            # Percent confidence for adaptive shots; 0 always runs the full shot count
+            percent = min(99, int(value))
+            self.options[name] = percent
+            configure_adaptive_shots(max(50, percent) / 100 if percent > 0 else None)
+            return
+        elif name == "Mode" and value in EXECUTION_MODES:
+            self.options[name] = value
+        elif name == "Search" and value in SEARCH_MODES:
+            self.options[name] = value
+        elif name == "GroverPolicy":
+            try:
+                self.options[name] = GroverPolicy.parse(value).spec
+            except ValueError as error:
+                self.send(f"info string {error}")
+                return
+        else:
+            self.send(f"info string unknown option {name} {value}".rstrip())
+            return
+        self.engine = self._make_engine()
+        return
+
+    def go(self, params: dict) -> None:
+        '''
+        Starts a search on the worker thread; "bestmove" is sent when it finishes or is stopped.
+        '''
+        self._stop_event = threading.Event()
+        self._search_thread = threading.Thread(target=self._search, args=(self.board.copy(), params, self._stop_event),
+                                               daemon=True)
+        self._search_thread.start()
+        return
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.wait()
+        return
+
+    def wait(self) -> None:
+        if self._search_thread is not None:
+            self._search_thread.join()
+            self._search_thread = None
+        return
+
+    def _search(self, board: chess.Board, params: dict, stop_event: threading.Event) -> None:
+        infinite = params.get("infinite", False) or params.get("ponder", False)
+        time_limit = None if infinite else allocate_time(params, board.turn)
+        max_depth = params.get("depth")
+        if max_depth is None:
+            limited = time_limit is not None or "nodes" in params or infinite
+            max_depth = MAX_SEARCH_DEPTH if limited else DEFAULT_DEPTH
+
+        limits = SearchLimits(time_limit=time_limit, max_nodes=params.get("nodes"), stop_event=stop_event)
+        stats = SearchStats()
+        start = time.monotonic()
+        best_move = None
+
+        for depth, score, move in self.engine.iterate(board, limits, max_depth, stats):
+            best_move = move
+            elapsed = max(time.monotonic() - start, 1e-6)
+            # UCI scores are from the side to move's point of view
+            cp = score if board.turn == chess.WHITE else -score
+            pv = f" pv {move.uci()}" if move else ""
+            self.send(f"info depth {depth} score cp {cp} nodes {stats.nodes} nps {int(stats.nodes / elapsed)} "
+                      f"time {int(elapsed * 1000)}{pv}")
+            self.send(f"info string circuits {stats.circuits} qubits {stats.qubits} gates {stats.gates} "
+                      f"iterations {stats.grover_iterations} shots {stats.shots} "
+                      f"movegen {stats.movegen_time * 1000:.0f}ms eval {stats.evaluation_time * 1000:.0f}ms "
+                      f"build {stats.build_time * 1000:.0f}ms transpile {stats.transpile_time * 1000:.0f}ms "
+                      f"simulation {stats.simulation_time * 1000:.0f}ms")
+
+        # In infinite/ponder mode the best move may only be sent after "stop"
+        if infinite:
+            stop_event.wait()
+
+        if best_move:
+            self.send(f"bestmove {best_move.uci()}")
+        else:
+            legal_moves = list(board.legal_moves)
+            self.send(f"bestmove {legal_moves[0].uci() if legal_moves else '0000'}")
+        return
+
+
+def main(input_stream=None, output=None) -> None:
+    '''
+    Reads UCI commands line by line until "quit" or end of input.
+    '''
+    input_stream = input_stream if input_stream is not None else sys.stdin
+    uci = UCIEngine(output)
+    for line in input_stream:
+        if not uci.handle(line):
+            break
+    uci.stop()
+    return
+
+
+if __name__ == "__main__":
+    main()
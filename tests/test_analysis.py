@@ -0,0 +1,56 @@
+import chess
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+# Imported by its flat name so positions submitted to worker processes unpickle there
+import analysis
+
+
+POSITIONS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+    "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1",
+    "8/2k5/3p4/p2P1p2/P2P1P2/8/3K4/8 w - - 0 1",
+]
+SETTINGS = {"depth": 1}
+
+
+def read_records(path) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_analyse_positions_streams_every_position():
+    records = list(analysis.analyse_positions((chess.Board(fen) for fen in POSITIONS), SETTINGS, workers=2))
+    assert sorted(r["index"] for r in records) == list(range(len(POSITIONS)))
+    for record in records:
+        board = chess.Board(record["fen"])
+        assert chess.Move.from_uci(record["move"]) in board.legal_moves
+        assert record["depth"] == 1 and record["nodes"] > 0
+    # Back rank mate in one
+    assert next(r for r in records if r["index"] == 2)["move"] == "a1a8"
+    return
+
+
+def test_run_analysis_resumes(tmp_path):
+    epd = tmp_path / "positions.epd"
+    epd.write_text("\n".join(" ".join(fen.split()[:4]) + ' id "p"' for fen in POSITIONS) + "\n")
+    output = tmp_path / "analysis.jsonl"
+
+    summary = analysis.run_analysis(str(epd), str(output), SETTINGS, workers=2)
+    assert summary == {**summary, "analysed": 4, "skipped": 0}
+    records = read_records(output)
+
+    # Keep two complete lines and a torn third one, as an interrupted run would leave them
+    lines = output.read_text().splitlines(keepends=True)
+    output.write_text(lines[0] + lines[1] + lines[2][:10])
+    summary = analysis.run_analysis(str(epd), str(output), SETTINGS, workers=2)
+    assert summary["analysed"] == 2 and summary["skipped"] == 2
+    resumed = read_records(output)
+    assert sorted(r["index"] for r in resumed) == list(range(len(POSITIONS)))
+    assert {r["index"] for r in resumed[2:]} == {r["index"] for r in records[2:]}
+
+    assert analysis.run_analysis(str(epd), str(output), SETTINGS, workers=2)["analysed"] == 0
+    return
@@ -0,0 +1,52 @@
+import chess
+import chess.pgn
+import io
+import json
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+# Imported by its flat name so games submitted to worker processes unpickle there
+import arena
+
+
+def test_parse_player():
+    player = arena.parse_player(["search=minimax", "policy=top:2,branching:20", "depth=3", "time=0.5"])
+    assert player == {"mode": "analytic", "search": "minimax", "policy": "top:2,branching:20", "depth": 3,
+                      "time": 0.5}
+    with pytest.raises(ValueError):
+        arena.parse_player(["colour=white"])
+    return
+
+def test_arena_streams_games(tmp_path):
+    pgn_path, timings_path = tmp_path / "games.pgn", tmp_path / "moves.jsonl"
+    seen = []
+    summary = arena.run_arena(arena.parse_player(["depth=1"]), arena.parse_player(["depth=1", "policy=root"]),
+                              games=2, workers=2, pgn_path=str(pgn_path), timings_path=str(timings_path),
+                              max_plies=6, on_game=lambda s: seen.append(s["games"]))
+
+    assert seen == [1, 2]
+    assert summary["games"] == summary["a_wins"] + summary["b_wins"] + summary["draws"] == 2
+    assert summary["games_per_hour"] > 0 and summary["avg_move_time"] > 0
+
+    pgn = io.StringIO(pgn_path.read_text())
+    games = [chess.pgn.read_game(pgn), chess.pgn.read_game(pgn)]
+    assert all(len(list(game.mainline_moves())) == 6 for game in games)
+    records = [json.loads(line) for line in timings_path.read_text().splitlines()]
+    assert len(records) == summary["moves"] == 12
+    assert {record["player"] for record in records} == {"A", "B"}
+    return
+
+def test_arena_plays_more_games_than_it_queues(tmp_path):
+    pgn_path = tmp_path / "games.pgn"
+    summary = arena.run_arena(arena.parse_player(["depth=1"]), arena.parse_player(["depth=1"]),
+                              games=2 * arena.QUEUE_PER_WORKER + 1, workers=1, pgn_path=str(pgn_path),
+                              timings_path=str(tmp_path / "moves.jsonl"), max_plies=2)
+    assert summary["games"] == 2 * arena.QUEUE_PER_WORKER + 1
+    pgn = io.StringIO(pgn_path.read_text())
+    rounds = []
+    while (game := chess.pgn.read_game(pgn)) is not None:
+        rounds.append(int(game.headers["Round"]))
+    assert sorted(rounds) == list(range(1, summary["games"] + 1))
+    return
@@ -0,0 +1,68 @@
+import copy
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from src.bench import (main, run_bench, compare, measure_startup, save_report, load_report, selection_report,
+                       BENCH_SCHEMA_VERSION)
+
+
+POSITION = "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3"
+
+
+def test_bench_report(tmp_path):
+    report = run_bench([POSITION], depths=(1, 2))
+    assert report["version"] == BENCH_SCHEMA_VERSION
+    assert [r["depth"] for r in report["results"]] == [1, 2]
+    for result in report["results"]:
+        assert result["nodes"] > 0 and result["evaluations"] > 0
+        assert result["nodes_per_second"] > 0
+        assert result["circuits"] == 1
+
+    path = tmp_path / "bench.json"
+    save_report(report, str(path))
+    assert load_report(str(path)) == report
+    return
+
+def test_default_report_measures_circuits(tmp_path):
+    path = tmp_path / "bench.json"
+    assert main(["--depths", "1", "--output", str(path)]) == 0
+    report = load_report(str(path))
+    assert report["config"]["mode"] == "aer"
+    assert all(result["circuits_built"] > 0 for result in report["results"])
+    return
+
+def test_compare_flags_regressions():
+    baseline = {"version": BENCH_SCHEMA_VERSION, "results": [
+        {"fen": POSITION, "depth": 3, "wall_time": 1.0, "nodes_per_second": 5000.0},
+        {"fen": POSITION, "depth": 1, "wall_time": 0.001, "nodes_per_second": 5000.0},
+    ]}
+    assert compare(baseline, baseline) == []
+
+    slower = copy.deepcopy(baseline)
+    slower["results"][0].update(wall_time=2.0, nodes_per_second=2500.0)
+    # Sub-noise-floor timings are never reported
+    slower["results"][1].update(wall_time=0.01, nodes_per_second=500.0)
+    regressions = compare(slower, baseline, threshold=0.25)
+    assert len(regressions) == 2
+    assert all("depth 3" in regression for regression in regressions)
+    assert compare(slower, baseline, threshold=1.5) == []
+    return
+
+
+def test_engine_import_does_not_load_qiskit():
+    timings = measure_startup(runs=1)
+    assert not timings["qiskit_loaded_by_engine"]
+    assert timings["import_engine"] > 0 and timings["quantum_warm_up"] > 0 and timings["first_move"] > 0
+    return
+
+def test_selection_report_compares_registers():
+    rows = selection_report(cases=[(9, [2, 6])], trials=50)
+    exact, padded = rows
+    assert (exact["register"], padded["register"]) == ("exact", "padded")
+    for row in rows:
+        assert len(row["selection"]) == 9 and abs(sum(row["selection"]) - 1) < 1e-9
+    assert exact["iterations"] < padded["iterations"]
+    assert exact["marked_probability"] > padded["marked_probability"]
+    assert exact["mean_shots"] < padded["mean_shots"]
+    return
@@ -0,0 +1,116 @@
+import chess
+import sys
+import os
+import time
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from src.engine import QuantumChessEngine
+
+
+@pytest.mark.parametrize("search", ["minimax", "batched", "alphabeta"])
+def test_time_limited_move_is_legal(search):
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+    engine = QuantumChessEngine(mode="analytic", search=search)
+
+    start = time.monotonic()
+    move = engine.select_quantum_move(board, time_limit=1.0)
+    elapsed = time.monotonic() - start
+
+    assert move in board.legal_moves
+    assert engine.last_depth >= 1
+    assert elapsed < 3.0, f"Search overran its budget ({elapsed:.2f}s)"
+    assert board.fen() == "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3"
+    return
+
+def test_max_depth_without_time_limit():
+    board = chess.Board()
+    engine = QuantumChessEngine(mode="analytic", search="alphabeta")
+    move = engine.select_quantum_move(board, max_depth=3)
+    assert move in board.legal_moves
+    assert engine.last_depth == 3
+    return
+
+@pytest.mark.parametrize("search", ["minimax", "batched"])
+def test_repeated_search_reuses_table(search):
+    # The second and third searches find the root in the engine's transposition table
+    board = chess.Board()
+    engine = QuantumChessEngine(mode="analytic", search=search)
+    for max_depth in (1, 2, 2):
+        move = engine.select_quantum_move(board, max_depth=max_depth)
+        assert move in board.legal_moves
+        assert engine.last_depth == max_depth
+    return
+
+def wait_for_move(worker, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        move = worker.poll()
+        if move is not None:
+            return move
+        time.sleep(0.01)
+    return None
+
+def test_worker_returns_move_without_blocking():
+    from src.engine_worker import EngineWorker
+    worker = EngineWorker(QuantumChessEngine(mode="analytic", search="alphabeta"))
+    board = chess.Board()
+
+    start = time.monotonic()
+    worker.request_move(board)
+    assert time.monotonic() - start < 0.1, "request_move should not wait for the search"
+    assert worker.thinking
+
+    move = wait_for_move(worker)
+    assert move in board.legal_moves
+    assert not worker.thinking
+    worker.shutdown()
+    return
+
+def test_worker_reuses_pondered_reply():
+    from src.engine_worker import EngineWorker, likely_replies
+    worker = EngineWorker(QuantumChessEngine(mode="analytic", search="alphabeta"), ponder_replies=2)
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+
+    worker.ponder(board)
+    # Let both ponder searches finish before the opponent "moves"
+    deadline = time.monotonic() + 30
+    while worker._ponder_events and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    board.push(likely_replies(board, 2)[0])
+    worker.request_move(board)
+    move = worker.poll()
+    assert move in board.legal_moves, "A pondered reply should be answered immediately"
+    assert worker.ponder_hits == 1
+    worker.shutdown()
+    return
+
+@pytest.mark.parametrize("search", ["minimax", "alphabeta"])
+def test_search_move_reports_stats(search):
+    # The engine publishes through the flat module it imports
+    from stats import add_stats_hook, remove_stats_hook
+    published = []
+    hook = lambda stats, context: published.append((stats, context))
+    add_stats_hook(hook)
+    try:
+        board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+        result = QuantumChessEngine(mode="aer", search=search).search_move(board)
+    finally:
+        remove_stats_hook(hook)
+
+    assert result.move in board.legal_moves and result.depth == 2
+    stats = result.stats
+    assert stats.nodes > stats.leaves > 0
+    assert stats.circuits > 0 and stats.shots == 1024 * stats.circuits
+    assert stats.qubits >= 5 * stats.circuits and stats.grover_iterations >= stats.circuits and stats.gates > 0
+    assert 0 < stats.evaluation_time + stats.movegen_time + stats.simulation_time <= stats.search_time
+    assert published == [(stats, {"fen": board.fen(), "move": result.move.uci(), "depth": 2, "mode": "aer",
+                                  "search": search, "policy": "all", "cached": False})]
+    return
+
+def test_search_move_without_profiling():
+    result = QuantumChessEngine(mode="analytic", search="alphabeta", profile=False).search_move(chess.Board())
+    assert result.move in chess.Board().legal_moves
+    assert result.stats is None
+    return
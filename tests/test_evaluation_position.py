@@ -1,5 +1,9 @@
 import pytest
 import chess
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
 from src.classical_evaluation import evaluate_position
 
 def test_starting_position_evaluation():
@@ -40,4 +44,100 @@ def test_checkmate_detection():
     score = evaluate_position(board)
     print(f"Checkmate evaluation score: {score}")
     assert score == -99999, "Checkmate should return extreme negative value for losing side"
-    return
\ No newline at end of file
+    return
+
+def reference_evaluate_position(board):
+    # Original square-by-square implementation, kept to check the faster versions against
+    from src.classical_evaluation import PIECE_VALUES, PSQT
+    if board.is_checkmate():
+        return -99999 if board.turn else 99999
+    if board.is_stalemate() or board.is_insufficient_material():
+        return 0
+    score = 0
+    for square in chess.SQUARES:
+        piece = board.piece_at(square)
+        if piece:
+            value = PIECE_VALUES[piece.piece_type]
+            rank = chess.square_rank(square) if piece.color == chess.WHITE else 7 - chess.square_rank(square)
+            psqt_bonus = PSQT.get(piece.piece_type, [0]*8)[rank]
+            modifier = 1 if piece.color == chess.WHITE else -1
+            score += modifier * (value + psqt_bonus)
+    score += 5 * (len(list(board.legal_moves))) * (1 if board.turn else -1)
+    return score
+
+def test_evaluation_matches_reference_on_random_games():
+    import random
+    random.seed(11)
+    for _ in range(30):
+        board = chess.Board()
+        while not board.is_game_over() and board.ply() < 200:
+            assert evaluate_position(board) == reference_evaluate_position(board), board.fen()
+            board.push(random.choice(list(board.legal_moves)))
+        assert evaluate_position(board) == reference_evaluate_position(board)
+    return
+
+@pytest.mark.parametrize("fen, uci", [
+    ("r3k2r/pppq1ppp/2n2n2/3pp3/3PP3/2N2N2/PPPQ1PPP/R3K2R w KQkq - 0 1", "e1g1"),  # castling
+    ("r3k2r/pppq1ppp/2n2n2/3pp3/3PP3/2N2N2/PPPQ1PPP/R3K2R b KQkq - 0 1", "e8c8"),
+    ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5d6"),  # en passant
+    ("1n2k3/P7/8/8/8/8/8/4K3 w - - 0 1", "a7b8q"),  # capture-promotion
+    ("4k3/8/8/8/8/8/p7/4K3 b - - 0 1", "a2a1n"),
+])
+def test_search_board_special_moves(fen, uci):
+    from src.search_board import SearchBoard
+    from src.transposition import encode_move
+    board = chess.Board(fen)
+    search_board = SearchBoard(board)
+    move = chess.Move.from_uci(uci)
+    search_board.make(encode_move(move))
+    board.push(move)
+    assert search_board.evaluate() == reference_evaluate_position(board)
+    search_board.unmake()
+    board.pop()
+    assert search_board.to_board().fen() == fen
+    assert search_board.evaluate() == reference_evaluate_position(board)
+    return
+
+def test_evaluate_children_matches_scalar():
+    import random
+    from src.search_board import SearchBoard
+    from src.transposition import decode_move
+    random.seed(13)
+    board = chess.Board()
+    while not board.is_game_over() and board.ply() < 150:
+        search_board = SearchBoard(board)
+        moves = search_board.legal_moves()
+        expected = []
+        for move in moves:
+            board.push(decode_move(move))
+            expected.append(evaluate_position(board))
+            board.pop()
+        assert search_board.evaluate_children(moves) == expected, board.fen()
+        board.push(random.choice(list(board.legal_moves)))
+    return
+
+def test_batched_evaluation_matches_scalar():
+    import random
+    from src.classical_evaluation import evaluate_children, evaluate_positions
+    random.seed(17)
+    boards = []
+    for _ in range(10):
+        board = chess.Board()
+        while not board.is_game_over() and board.ply() < 150:
+            boards.append(board.copy(stack=False))
+            board.push(random.choice(list(board.legal_moves)))
+        boards.append(board.copy(stack=False))
+    boards.append(chess.Board("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 0 3"))
+
+    assert evaluate_positions(boards) == [evaluate_position(b) for b in boards]
+    assert evaluate_positions([]) == []
+
+    board = boards[len(boards) // 2]
+    moves = list(board.legal_moves)
+    expected = []
+    for move in moves:
+        board.push(move)
+        expected.append(evaluate_position(board))
+        board.pop()
+    assert evaluate_children(board, moves) == expected
+    return
@@ -0,0 +1,108 @@
+import chess
+import sys
+import os
+import subprocess
+import threading
+import time
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+import parallel
+from search import AlphaBetaSearch, INFINITY, SearchAborted, SearchLimits
+from engine import QuantumChessEngine
+from quantum_backend import select_best_quantum_move
+from stats import SearchStats
+
+
+@pytest.fixture(scope="module", autouse=True)
+def shutdown_workers():
+    yield
+    parallel.shutdown_pool()
+
+
+def test_parallel_scores_match_serial():
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+    stats = SearchStats()
+    moves, scores = parallel.score_root_moves(board, 3, mode="analytic", search="alphabeta", workers=2, stats=stats)
+
+    searcher = AlphaBetaSearch(mode="analytic")
+    for move, score in zip(moves, scores):
+        board.push(move)
+        assert score == searcher.alphabeta(board, 2, -INFINITY, INFINITY, 1), f"Score mismatch for {move}"
+        board.pop()
+    assert stats.nodes > len(moves)
+    return
+
+@pytest.mark.parametrize("search", ["minimax", "batched", "alphabeta"])
+def test_parallel_move_is_legal(search):
+    board = chess.Board()
+    move = select_best_quantum_move(board, depth=2, mode="analytic", search=search, workers=2)
+    assert move in board.legal_moves
+    return
+
+def test_pool_is_reused():
+    first = parallel.get_pool(2)
+    select_best_quantum_move(chess.Board(), depth=1, mode="analytic", workers=2)
+    assert parallel.get_pool(2) is first
+    return
+
+def test_time_limit_covers_queued_root_moves():
+    # More root moves than workers: tasks that start late must not get a fresh budget
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+    engine = QuantumChessEngine(mode="analytic", workers=2)
+    start = time.monotonic()
+    move = engine.select_quantum_move(board, time_limit=1.0)
+    assert move in board.legal_moves
+    assert time.monotonic() - start < 1.8
+    return
+
+def test_stop_event_aborts_root_search():
+    stop_event = threading.Event()
+    threading.Timer(0.3, stop_event.set).start()
+    start = time.monotonic()
+    with pytest.raises(SearchAborted):
+        parallel.score_root_moves(chess.Board(), 6, mode="analytic", search="minimax", workers=2,
+                                  limits=SearchLimits(stop_event=stop_event))
+    assert time.monotonic() - start < 1.5
+    # The pool is usable again afterwards
+    moves, scores = parallel.score_root_moves(chess.Board(), 2, mode="analytic", search="alphabeta", workers=2)
+    assert len(moves) == len(scores) == 20
+    return
+
+def test_aer_pool_after_parent_ran_aer():
+    # Workers are spawned, so an Aer simulator already run in this process cannot deadlock them
+    from grover import warm_up
+    warm_up(background=False)
+    board = chess.Board()
+    start = time.monotonic()
+    score, move = parallel.parallel_root_search(board, 2, mode="aer", workers=2, limits=SearchLimits(time_limit=30))
+    assert move in board.legal_moves
+    assert time.monotonic() - start < 30
+    return
+
+def test_stuck_workers_are_terminated():
+    pool = parallel.get_pool(2)
+    futures = [pool.submit(time.sleep, 60) for _ in range(2)]
+    start = time.monotonic()
+    with pytest.raises(SearchAborted):
+        parallel._gather(futures, SearchLimits(time_limit=0.2))
+    assert time.monotonic() - start < 0.2 + parallel.ABORT_TIMEOUT + 2
+    # The next search gets a fresh pool
+    assert parallel.get_pool(2) is not pool
+    moves, scores = parallel.score_root_moves(chess.Board(), 2, mode="analytic", search="alphabeta", workers=2)
+    assert len(moves) == len(scores) == 20
+    return
+
+def test_analytic_pool_does_not_load_qiskit():
+    # In a fresh interpreter, so no pool or Qiskit import left by other tests can interfere
+    script = (
+        "import chess, parallel\n"
+        "pool = parallel.get_pool(2, mode='analytic')\n"
+        "parallel.score_root_moves(chess.Board(), 2, mode='analytic', search='alphabeta', workers=2)\n"
+        "print(pool.submit(eval, \"'qiskit' in __import__('sys').modules\").result())\n"
+        "parallel.shutdown_pool()\n"
+    )
+    src_dir = os.path.join(os.path.dirname(__file__), "../src")
+    output = subprocess.run([sys.executable, "-c", script], cwd=src_dir, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False"
+    return
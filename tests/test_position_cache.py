@@ -0,0 +1,91 @@
+import chess
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from src.position_cache import PositionCache, BUCKET_SLOTS, config_key, populate, read_positions
+from src.transposition import zobrist_key
+
+
+def test_store_and_probe(tmp_path):
+    path = str(tmp_path / "cache.qcc")
+    board = chess.Board()
+    with PositionCache(path, size_mb=0.1) as cache:
+        assert cache.probe(zobrist_key(board)) is None
+        cache.store(zobrist_key(board), 3, -42, chess.Move.from_uci("e2e4"))
+        cache.store(zobrist_key(board), 2, 99, chess.Move.from_uci("d2d4"))  # shallower: ignored
+        assert cache.probe(zobrist_key(board)) == (-42, 3, chess.Move.from_uci("e2e4"))
+        assert cache.lookup(board, 3) == (-42, chess.Move.from_uci("e2e4"))
+        assert cache.lookup(board, 4) is None
+
+    # Survives reopening, and a read-only handle refuses writes
+    with PositionCache(path, readonly=True) as cache:
+        assert cache.lookup(board, 3) == (-42, chess.Move.from_uci("e2e4"))
+        with pytest.raises(PermissionError):
+            cache.store(1, 1, 0)
+    return
+
+def test_shared_between_handles(tmp_path):
+    path = str(tmp_path / "cache.qcc")
+    writer = PositionCache(path, size_mb=0.1)
+    reader = PositionCache(path, readonly=True)
+    writer.store(12345, 5, 7)
+    assert reader.probe(12345) == (7, 5, chess.Move.null())
+    writer.close()
+    reader.close()
+    return
+
+def test_full_bucket_replaces_shallowest(tmp_path):
+    with PositionCache(str(tmp_path / "cache.qcc"), size_mb=0.1) as cache:
+        # Keys differing only above the index bits share a bucket
+        keys = [(i + 1) << 40 for i in range(BUCKET_SLOTS + 1)]
+        for depth, key in enumerate(keys[:BUCKET_SLOTS], start=2):
+            cache.store(key, depth, depth)
+        cache.store(keys[-1], 4, 0)
+
+        assert cache.probe(keys[0]) is None, "The shallowest record should be replaced"
+        assert all(cache.probe(key) is not None for key in keys[1:])
+        assert cache.used() == BUCKET_SLOTS
+    return
+
+def test_populate_from_pgn(tmp_path):
+    pgn = tmp_path / "games.pgn"
+    pgn.write_text("1. e4 e5 2. Nf3 Nc6 *\n\n1. d4 d5 *\n")
+    positions = list(read_positions(str(pgn), plies=2))
+    assert [board.fullmove_number for board in positions] == [1, 1, 1, 1]
+    assert len({zobrist_key(board) for board in positions}) == 3  # the start position appears twice
+
+    from engine import QuantumChessEngine
+    engine = QuantumChessEngine(mode="analytic", search="alphabeta", profile=False)
+    with PositionCache(str(tmp_path / "cache.qcc"), size_mb=0.1) as cache:
+        assert populate(cache, positions, engine, 2) == 3
+        for board in positions:
+            score, move = cache.lookup(board, 2, config_key("analytic", "alphabeta", "all"))
+            assert move in board.legal_moves
+    return
+
+def test_engine_answers_cached_positions(tmp_path):
+    from engine import QuantumChessEngine
+    path = str(tmp_path / "cache.qcc")
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+
+    first = QuantumChessEngine(mode="analytic", search="alphabeta", position_cache=path).search_move(board)
+    assert first.stats.nodes > 0
+    second = QuantumChessEngine(mode="analytic", search="alphabeta", position_cache=path).search_move(board)
+    assert second.move == first.move and second.stats.nodes == 0
+    return
+
+def test_cache_is_keyed_by_configuration(tmp_path):
+    from engine import QuantumChessEngine
+    path = str(tmp_path / "cache.qcc")
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+
+    QuantumChessEngine(mode="analytic", search="alphabeta", position_cache=path).search_move(board)
+    for settings in ({"mode": "analytic", "search": "minimax"}, {"mode": "aer", "search": "alphabeta"},
+                     {"mode": "analytic", "search": "alphabeta", "policy": "root"}):
+        result = QuantumChessEngine(position_cache=path, **settings).search_move(board)
+        assert result.stats.nodes > 0, f"{settings} was answered from another configuration's entry"
+    assert QuantumChessEngine(mode="analytic", search="alphabeta", position_cache=path).search_move(
+        board).stats.nodes == 0
+    return
@@ -105,3 +105,184 @@ def test_grover_multiple_marked():
     top_state = sorted_counts[0][0]
     assert top_state.strip().split()[0] in [format(i, "03b") for i in marked_indices], "Grover's algorithm did not amplify a marked state sufficiently"
     return
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3])
+def test_quantum_minimax_analytic(depth):
+    board = chess.Board()
+    move = select_best_quantum_move(board, depth=depth, mode="analytic")
+
+    assert move in board.legal_moves, f"Returned move {move} is not legal at depth {depth}"
+    return
+
+@pytest.mark.parametrize("oracle", ["diagonal", "mcx"])
+@pytest.mark.parametrize("n, marked_indices", [(1, [1]), (3, [5]), (3, [2, 5]), (4, [0, 3, 9]), (5, list(range(12)))])
+def test_analytic_matches_statevector(n, marked_indices, oracle):
+    from qiskit.quantum_info import Statevector
+    from src.grover import build_grover_circuit, grover_iterations, grover_probabilities
+
+    R = grover_iterations(2 ** n, len(marked_indices))
+    expected = Statevector(build_grover_circuit(n, marked_indices, R, oracle)).probabilities()
+    assert np.allclose(grover_probabilities(n, marked_indices, R), expected, atol=1e-9)
+    return
+
+@pytest.mark.parametrize("oracle", ["diagonal", "mcx"])
+@pytest.mark.parametrize("num_moves, marked_indices", [(3, [1]), (5, [4]), (9, [2, 6]), (20, [0, 7, 19]),
+                                                       (37, [5, 30]), (6, [1, 2, 3])])
+def test_exact_register_matches_statevector(num_moves, marked_indices, oracle):
+    from qiskit.quantum_info import Statevector
+    from src.grover import build_grover_circuit, grover_probabilities, grover_register
+
+    n, R, num_states = grover_register(num_moves, len(marked_indices), "exact")
+    assert num_states == num_moves
+    expected = Statevector(build_grover_circuit(n, marked_indices, R, oracle, num_states)).probabilities()
+    assert np.allclose(grover_probabilities(n, marked_indices, R, num_states), expected, atol=1e-9)
+    # No amplitude outside the legal moves
+    assert np.allclose(expected[num_moves:], 0, atol=1e-12)
+    return
+
+def test_exact_register_amplifies_more_with_fewer_iterations():
+    from src.grover import grover_probabilities, grover_register
+
+    for num_moves, marked_indices in [(5, [1]), (9, [2, 6]), (17, [3, 8, 16]), (33, list(range(0, 33, 6)))]:
+        n, exact_R, num_states = grover_register(num_moves, len(marked_indices), "exact")
+        _, padded_R, _ = grover_register(num_moves, len(marked_indices), "padded")
+        exact = grover_probabilities(n, marked_indices, exact_R, num_states)[marked_indices].sum()
+        padded = grover_probabilities(n, marked_indices, padded_R)[marked_indices].sum()
+        assert exact_R <= padded_R and exact > max(padded, 0.8)
+    return
+
+def test_diagonal_oracle_is_shallower():
+    from src.grover import circuit_metrics
+
+    marked_indices = list(range(0, 64, 5))
+    diagonal = circuit_metrics(6, marked_indices, 2, "diagonal", basis_gates=["cx", "u"])
+    mcx = circuit_metrics(6, marked_indices, 2, "mcx", basis_gates=["cx", "u"])
+    assert diagonal["depth"] < mcx["depth"] and diagonal["gates"] < mcx["gates"]
+    return
+
+def test_analytic_counts_match_aer():
+    from src.grover import build_grover_circuit, run_circuit, sample_analytic_counts
+
+    n, marked_indices, R, shots = 4, [1, 6, 11], 1, 4096
+    aer_counts = run_circuit(build_grover_circuit(n, marked_indices, R), shots=shots)
+    analytic_counts = sample_analytic_counts(n, marked_indices, R, shots=shots)
+
+    # Total variation distance between the two empirical distributions
+    states = set(aer_counts) | set(analytic_counts)
+    tvd = 0.5 * sum(abs(aer_counts.get(s, 0) - analytic_counts.get(s, 0)) for s in states) / shots
+    assert tvd < 0.05, f"Analytic sampler diverges from Aer (TVD={tvd:.3f})"
+    return
+
+def test_unknown_execution_mode():
+    with pytest.raises(ValueError):
+        select_best_quantum_move(chess.Board(), depth=1, mode="hardware")
+    return
+
+def test_circuit_cache_lru():
+    from src.grover import CircuitCache
+
+    cache = CircuitCache(maxsize=2)
+    first = cache.get(3, [5], 2)
+    assert cache.get(3, [5], 2) is first
+    cache.get(3, [1, 2], 1)
+    cache.get(2, [3], 1)  # evicts (3, [5], 2), the least recently used entry
+    cache.get(3, [5], 2)
+
+    info = cache.info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (1, 4, 2, 2)
+    return
+
+def test_configure_process_circuit_cache():
+    from src.grover import circuit_cache, circuit_cache_info, configure_circuit_cache, grover_select_batch
+
+    default_size = circuit_cache_info().maxsize
+    try:
+        circuit_cache.clear()
+        configure_circuit_cache(1)
+        grover_select_batch([(8, [3]), (8, [3])], mode="aer", shots=16)
+        assert circuit_cache_info() == (1, 1, 1, 1)  # the second job reuses the first circuit
+        grover_select_batch([(4, [1])], mode="aer", shots=16)
+        grover_select_batch([(8, [3])], mode="aer", shots=16)  # evicted by the 4-move circuit
+        assert circuit_cache_info() == (1, 3, 1, 1)
+        configure_circuit_cache(0)
+        assert circuit_cache_info().currsize == 0
+    finally:
+        configure_circuit_cache(default_size)
+        circuit_cache.clear()
+    return
+
+@pytest.mark.parametrize("mode", ["aer", "analytic"])
+@pytest.mark.parametrize("depth", [1, 2, 3])
+def test_quantum_minimax_batched(depth, mode):
+    board = chess.Board()
+    move = select_best_quantum_move(board, depth=depth, mode=mode, search="batched")
+
+    assert move in board.legal_moves, f"Returned move {move} is not legal at depth {depth}"
+    return
+
+def test_grover_select_batch_single_job():
+    from src.grover import grover_select_batch
+
+    # One well-amplified marked state per circuit, all submitted together
+    jobs = [(8, [5]), (8, [2]), (32, [7]), (16, [11])]
+    assert grover_select_batch(jobs, mode="aer") == [5, 2, 7, 11]
+    return
+
+def test_batched_search_yields_one_batch_per_ply():
+    from src.quantum_backend import batched_search
+
+    board = chess.Board()
+    search = batched_search(board, 2)
+    batch_sizes = []
+    try:
+        jobs = next(search)
+        while True:
+            batch_sizes.append(len(jobs))
+            jobs = search.send([0] * len(jobs))
+    except StopIteration as stop:
+        score, move = stop.value
+
+    assert len(batch_sizes) == 2 and batch_sizes[1] == 1
+    assert move in board.legal_moves
+    return
+
+def test_is_separated():
+    from src.grover import is_separated
+
+    assert is_separated([30, 1, 0, 2], 0.99)
+    assert not is_separated([30, 25, 0, 2], 0.99)
+    # Two equally amplified marked states only need to stand out from the unmarked ones
+    assert is_separated([30, 25, 0, 2], 0.99, marked_indices=[0, 1])
+    assert not is_separated([], 0.99)
+    return
+
+@pytest.mark.parametrize("mode", ["aer", "analytic"])
+def test_adaptive_shots_stop_early(mode):
+    from src.grover import grover_select_batch, seed_analytic_rng
+    from src.stats import SearchStats
+
+    seed_analytic_rng(3)
+    stats = SearchStats()
+    jobs = [(8, [5]), (8, [2]), (32, [7]), (16, [11])]
+    assert grover_select_batch(jobs, mode=mode, stats=stats, confidence=0.99) == [5, 2, 7, 11]
+    assert len(stats.circuit_shots) == len(jobs)
+    assert all(shots < 1024 for shots in stats.circuit_shots)
+    assert stats.shots == sum(stats.circuit_shots)
+
+    return
+
+def test_adaptive_sampling_falls_back_to_cap():
+    from src.grover import sample_adaptive
+
+    # A flat distribution never separates, so sampling runs to the cap
+    counts, used = sample_adaptive(np.full(8, 1 / 8), 256, 0.99)
+    assert used == 256 and counts.sum() == 256
+    return
+
+def test_adaptive_confidence_validated():
+    from src.grover import grover_select
+
+    with pytest.raises(ValueError):
+        grover_select(8, [5], mode="analytic", confidence=1.0)
+    return
@@ -0,0 +1,103 @@
+import chess
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from src.classical_evaluation import evaluate_position
+from src.quantum_backend import select_best_quantum_move
+from src.search import AlphaBetaSearch, SearchAborted, SearchLimits, INFINITY
+from src.stats import SearchStats
+
+
+def plain_minimax(board, depth):
+    if depth == 0 or board.is_game_over():
+        return evaluate_position(board)
+    scores = []
+    for move in board.legal_moves:
+        board.push(move)
+        scores.append(plain_minimax(board, depth - 1))
+        board.pop()
+    return max(scores) if board.turn == chess.WHITE else min(scores)
+
+
+@pytest.mark.parametrize("fen", [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+    "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1",
+])
+def test_alphabeta_matches_minimax_value(fen):
+    board = chess.Board(fen)
+    searcher = AlphaBetaSearch(mode="analytic")
+    assert searcher.alphabeta(board, 3, -INFINITY, INFINITY, 0) == plain_minimax(board, 3)
+    assert board.fen() == fen, "Search must leave the board unchanged"
+    return
+
+@pytest.mark.parametrize("depth", [1, 2, 3])
+def test_alphabeta_returns_legal_move(depth):
+    board = chess.Board()
+    move = select_best_quantum_move(board, depth=depth, mode="analytic", search="alphabeta")
+    assert move in board.legal_moves, f"Returned move {move} is not legal at depth {depth}"
+    return
+
+def test_alphabeta_prunes_nodes():
+    full, pruned = SearchStats(), SearchStats()
+    select_best_quantum_move(chess.Board(), depth=3, mode="analytic", search="minimax", stats=full)
+    select_best_quantum_move(chess.Board(), depth=3, mode="analytic", search="alphabeta", stats=pruned)
+
+    print(f"Nodes: minimax={full.nodes}, alphabeta={pruned.nodes}, cutoffs={pruned.cutoffs}")
+    assert pruned.cutoffs > 0
+    assert pruned.nodes < full.nodes / 2
+    return
+
+def test_move_ordering_puts_captures_first():
+    # White can capture the queen with the pawn or the rook; pawn takes queen should come first
+    board = chess.Board("4k3/8/8/3q4/4P3/8/8/3RK3 w - - 0 1")
+    ordered = AlphaBetaSearch().order_moves(board, list(board.legal_moves), 0)
+    assert ordered[0] == chess.Move.from_uci("e4d5")
+    assert ordered[1] == chess.Move.from_uci("d1d5")
+    return
+
+def test_search_limits_abort():
+    searcher = AlphaBetaSearch(mode="analytic", limits=SearchLimits(max_nodes=50))
+    with pytest.raises(SearchAborted):
+        searcher.search_root(chess.Board(), 3)
+    return
+
+def test_grover_policy_parse():
+    from src.grover import GroverPolicy
+
+    assert GroverPolicy.parse("all").uses_grover(5, 2)
+    root = GroverPolicy.parse("root")
+    assert root.uses_grover(0, 2) and not root.uses_grover(1, 40)
+    combined = GroverPolicy.parse("top:2, branching:20")
+    assert combined.spec == "top:2,branching:20"
+    assert combined.uses_grover(1, 20) and not combined.uses_grover(1, 19) and not combined.uses_grover(2, 40)
+    for spec in ("top:0", "leaves", "branching:x"):
+        with pytest.raises(ValueError):
+            GroverPolicy.parse(spec)
+    return
+
+@pytest.mark.parametrize("search", ["minimax", "batched"])
+def test_classical_policy_matches_minimax_value(search):
+    from src.grover import GroverPolicy
+    from src.quantum_backend import quantum_minimax, quantum_minimax_batched
+
+    # Grover nowhere: the search reduces to plain min/max
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+    stats = SearchStats()
+    run = quantum_minimax if search == "minimax" else quantum_minimax_batched
+    score, move = run(board, 2, "analytic", stats, policy=GroverPolicy(max_ply=-1))
+    assert score == plain_minimax(board, 2)
+    assert move in board.legal_moves
+    assert stats.circuits == 0
+    return
+
+@pytest.mark.parametrize("search", ["minimax", "batched", "alphabeta"])
+def test_root_policy_runs_one_circuit(search):
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+    stats = SearchStats()
+    move = select_best_quantum_move(board, depth=2, mode="analytic", search=search, stats=stats, policy="root")
+    assert move in board.legal_moves
+    assert stats.circuits <= 1
+    return
@@ -0,0 +1,60 @@
+import chess
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from src.search_board import SearchBoard
+from src.classical_evaluation import evaluate_position
+from src.transposition import decode_move, encode_move, zobrist_key
+
+
+# The six standard perft positions with their node counts from the chessprogramming wiki. At depth 3 and
+# more the move lists of the inner plies come from legal_moves(), the leaves from count_legal_moves()
+PERFT = [
+    (chess.STARTING_FEN, 3, 8902),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", 3, 97862),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", 4, 43238),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", 3, 9467),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", 3, 62379),
+    ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", 3, 89890),
+]
+
+
+@pytest.mark.parametrize("fen, depth, nodes", PERFT)
+def test_perft(fen, depth, nodes):
+    assert SearchBoard(chess.Board(fen)).perft(depth) == nodes
+    return
+
+def test_matches_python_chess_over_random_games():
+    rng = random.Random(3)
+    for _ in range(30):
+        board = chess.Board()
+        search_board = SearchBoard(board)
+        while not board.is_game_over() and board.ply() < 150:
+            moves = search_board.legal_moves()
+            assert set(map(decode_move, moves)) == set(board.legal_moves) and len(set(moves)) == len(moves), board.fen()
+            assert search_board.count_legal_moves() == len(moves)
+            assert search_board.zobrist() == zobrist_key(board)
+            assert search_board.evaluate() == evaluate_position(board)
+            move = rng.choice(moves)
+            board.push(decode_move(move))
+            search_board.make(move)
+        assert search_board.is_game_over(search_board.legal_moves()) == board.is_game_over()
+
+        # Unmaking every move restores the start position exactly
+        while board.move_stack:
+            board.pop()
+            search_board.unmake()
+        assert search_board.to_board().fen() == chess.STARTING_FEN
+        assert search_board.zobrist() == zobrist_key(board)
+    return
+
+def test_move_conversion_roundtrip():
+    board = chess.Board("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1")
+    for move in board.legal_moves:
+        assert decode_move(encode_move(move)) == move
+    with pytest.raises(ValueError):
+        SearchBoard(chess.Board(chess.STARTING_FEN, chess960=True))
+    return
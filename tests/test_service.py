@@ -0,0 +1,106 @@
+import asyncio
+import chess
+import json
+import socket
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from src.service import EngineService, serve_socket
+
+
+POSITIONS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+    "r3k2r/pppq1ppp/2n2n2/3pp3/3PP3/2N2N2/PPPQ1PPP/R3K2R w KQkq - 0 1",
+    "8/2k5/3p4/p2P1p2/P2P1P2/8/3K4/8 w - - 0 1",
+]
+
+
+def test_concurrent_games_share_batches():
+    async def run():
+        async with EngineService(mode="analytic", depth=2) as service:
+            results = await asyncio.gather(*[service.search(fen) for fen in POSITIONS])
+            return results, service.status()
+
+    results, status = asyncio.run(run())
+    for fen, result in zip(POSITIONS, results):
+        assert chess.Move.from_uci(result["move"]) in chess.Board(fen).legal_moves
+        assert result["depth"] == 2 and result["nodes"] > 0
+    assert status["completed"] == len(POSITIONS)
+    # Every search has Grover jobs at two plies; with coalescing they need fewer batches than that
+    assert 0 < status["batches"] < 2 * len(POSITIONS)
+    return
+
+
+def test_protocol_deadline_and_cancel():
+    replies = []
+
+    async def run():
+        async with EngineService(mode="analytic", depth=2) as service:
+            requests = {}
+            await service.handle({"id": 1, "fen": POSITIONS[1], "depth": 1}, replies.append, requests)
+            await service.handle({"id": 2, "fen": POSITIONS[2], "depth": 5, "timeout": 0.05}, replies.append, requests)
+            await service.handle({"id": 3, "fen": POSITIONS[0], "depth": 5}, replies.append, requests)
+            await service.handle({"id": 3, "fen": POSITIONS[0]}, replies.append, requests)
+            await service.handle({"id": 3, "op": "cancel"}, replies.append, requests)
+            await asyncio.gather(*requests.values(), return_exceptions=True)
+            await service.handle({"id": 4, "op": "stats"}, replies.append, requests)
+
+    asyncio.run(run())
+    by_id = {}
+    for reply in replies:
+        by_id.setdefault(reply["id"], []).append(reply)
+    assert by_id[1][0]["move"] is not None
+    assert by_id[2][0]["error"] == "deadline exceeded"
+    assert [reply["error"] for reply in by_id[3]] == ["duplicate id", "cancelled"]
+    assert by_id[4][0]["requests"] == 3 and by_id[4][0]["expired"] == 1 and by_id[4][0]["cancelled"] == 1
+    return
+
+
+def test_malformed_requests_get_error_replies():
+    replies = []
+    messages = [{"id": 1, "depth": "2"}, {"id": 2, "timeout": "1"}, {"id": 3, "fen": 5}, {"id": 4, "fen": "not a fen"},
+                {"id": 5, "depth": 0}, {"id": 6, "depth": 1, "timeout": 5}]
+
+    async def run():
+        async with EngineService(mode="analytic", depth=2) as service:
+            requests = {}
+            for message in messages:
+                await service.handle(message, replies.append, requests)
+            await asyncio.gather(*requests.values(), return_exceptions=True)
+            return service.status()
+
+    status = asyncio.run(run())
+    by_id = {reply["id"]: reply for reply in replies}
+    assert sorted(by_id) == [1, 2, 3, 4, 5, 6]
+    assert all("error" in by_id[request_id] for request_id in range(1, 6))
+    assert by_id[6]["move"] is not None
+    assert status["failed"] == 5 and status["completed"] == 1
+    return
+
+
+def test_socket_protocol():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    async def run():
+        async with EngineService(mode="analytic", depth=1) as service:
+            server = asyncio.create_task(serve_socket(service, "127.0.0.1", port))
+            for _ in range(100):
+                try:
+                    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                    break
+                except OSError:
+                    await asyncio.sleep(0.01)
+            writer.write(b'{"id": 1}\n{"id": 2, "depth": "1"}\n')
+            replies = [json.loads(await reader.readline()) for _ in range(2)]
+            writer.close()
+            server.cancel()
+            return replies
+
+    replies = {reply["id"]: reply for reply in asyncio.run(run())}
+    assert chess.Move.from_uci(replies[1]["move"]) in chess.Board().legal_moves
+    assert replies[2]["error"] == "depth must be a positive integer"
+    return
@@ -0,0 +1,72 @@
+import chess
+import chess.polyglot
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from src.search import AlphaBetaSearch, INFINITY
+from src.transposition import TranspositionTable, zobrist_key, encode_move, decode_move, EXACT, LOWER
+
+
+def test_zobrist_key_matches_polyglot():
+    random.seed(7)
+    for _ in range(20):
+        board = chess.Board()
+        while not board.is_game_over() and board.ply() < 120:
+            assert zobrist_key(board) == chess.polyglot.zobrist_hash(board), board.fen()
+            board.push(random.choice(list(board.legal_moves)))
+    return
+
+@pytest.mark.parametrize("uci", ["e2e4", "g1f3", "a7a8q", "h2h1n", "e1g1"])
+def test_move_encoding_roundtrip(uci):
+    move = chess.Move.from_uci(uci)
+    assert decode_move(encode_move(move)) == move
+    return
+
+def test_table_size_is_bounded():
+    tt = TranspositionTable(size_mb=1)
+    assert tt.num_entries & (tt.num_entries - 1) == 0, "Entry count should be a power of two"
+    table_bytes = sum(a.itemsize * len(a) for a in (tt.keys, tt.scores, tt.depths, tt.flags, tt.moves, tt.ages))
+    assert table_bytes <= 1024 * 1024
+    return
+
+def test_store_and_probe():
+    tt = TranspositionTable(size_mb=1)
+    key = zobrist_key(chess.Board())
+    assert tt.probe(key) is None
+
+    tt.store(key, 3, -42, EXACT, chess.Move.from_uci("e2e4"))
+    score, depth, flag, move = tt.probe(key) # type: ignore
+    assert (score, depth, flag, decode_move(move)) == (-42, 3, EXACT, chess.Move.from_uci("e2e4"))
+    return
+
+def test_depth_preferred_replacement():
+    tt = TranspositionTable(size_mb=1)
+    key = 12345
+    other = key + tt.num_entries  # same slot, different position
+
+    tt.store(key, 4, 10, EXACT)
+    tt.store(other, 2, 20, LOWER)
+    assert tt.probe(other) is None, "A shallower entry must not replace a deeper one"
+    assert tt.probe(key) is not None
+
+    tt.new_search()
+    tt.store(other, 2, 20, LOWER)
+    assert tt.probe(other) is not None, "Entries from an older search are replaceable"
+    assert tt.probe(key) is None
+    return
+
+@pytest.mark.parametrize("fen", [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+])
+def test_alphabeta_value_unchanged_with_table(fen):
+    board = chess.Board(fen)
+    plain = AlphaBetaSearch().alphabeta(board, 3, -INFINITY, INFINITY, 0)
+    tt = TranspositionTable(size_mb=4)
+    cached = AlphaBetaSearch(tt=tt).alphabeta(board, 3, -INFINITY, INFINITY, 0)
+    assert cached == plain
+    assert tt.hits > 0
+    return
@@ -0,0 +1,113 @@
+import chess
+import io
+import sys
+import os
+import subprocess
+import threading
+import time
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+from src.uci import UCIEngine, allocate_time, parse_go, parse_position
+
+
+def test_parse_go():
+    params = parse_go("wtime 60000 btime 50000 winc 1000 binc 1000 movestogo 20".split())
+    assert params == {"wtime": 60000, "btime": 50000, "winc": 1000, "binc": 1000, "movestogo": 20}
+    assert parse_go(["infinite"]) == {"infinite": True}
+    return
+
+def test_allocate_time():
+    assert allocate_time({"movetime": 2000}, chess.WHITE) == pytest.approx(1.95)
+    assert allocate_time({}, chess.WHITE) is None
+    # 60s / 20 moves + 0.75 * 1s increment, minus move overhead
+    assert allocate_time({"wtime": 60000, "btime": 1000, "winc": 1000, "movestogo": 20}, chess.WHITE) == pytest.approx(3.7)
+    # Low on the clock: never plan for more than half of what is left
+    assert allocate_time({"btime": 1000, "binc": 5000}, chess.BLACK) <= 0.5
+    return
+
+def test_parse_position():
+    board = parse_position("startpos moves e2e4 e7e5".split())
+    assert board.fen() == "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2"
+    fen = "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"
+    assert parse_position(["fen"] + fen.split()).fen() == fen
+    return
+
+def run_commands(uci, commands):
+    for command in commands:
+        uci.handle(command)
+    uci.wait()
+    return uci.output.getvalue().splitlines()
+
+def test_go_depth_reports_info_and_bestmove():
+    uci = UCIEngine(io.StringIO())
+    lines = run_commands(uci, ["uci", "setoption name Mode value analytic", "setoption name Search value alphabeta",
+                               "isready", "position startpos moves e2e4", "go depth 2"])
+    assert "uciok" in lines and "readyok" in lines
+    info = [line for line in lines if line.startswith("info depth")]
+    assert len(info) == 2 and " nodes " in info[-1] and " nps " in info[-1]
+    assert any(line.startswith("info string circuits") for line in lines)
+
+    bestmove = chess.Move.from_uci(lines[-1].split()[1])
+    assert bestmove in parse_position("startpos moves e2e4".split()).legal_moves
+    return
+
+@pytest.mark.parametrize("threads", [1, 2])
+def test_stop_ends_infinite_search(threads):
+    uci = UCIEngine(io.StringIO())
+    uci.handle("setoption name Mode value analytic")
+    uci.handle(f"setoption name Threads value {threads}")
+    uci.handle("position startpos")
+    uci.handle("go infinite")
+    time.sleep(1.0 if threads > 1 else 0.5)
+
+    start = time.monotonic()
+    uci.handle("stop")
+    assert time.monotonic() - start < 2.0, "stop should take effect immediately"
+    assert uci.output.getvalue().splitlines()[-1].startswith("bestmove")
+    return
+
+def test_go_nodes_with_threads():
+    uci = UCIEngine(io.StringIO())
+    lines = run_commands(uci, ["setoption name Mode value analytic", "setoption name Threads value 2",
+                               "position startpos", "go nodes 2000"])
+    depths = [int(line.split()[2]) for line in lines if line.startswith("info depth")]
+    assert depths and max(depths) < 4
+    assert chess.Move.from_uci(lines[-1].split()[1]) in chess.Board().legal_moves
+    return
+
+def test_threads_after_aer_search():
+    # Pool workers started after the front-end has run Aer must not inherit its state
+    uci = UCIEngine(io.StringIO())
+    run_commands(uci, ["setoption name Mode value aer", "position startpos", "go depth 1"])
+    start = time.monotonic()
+    lines = run_commands(uci, ["setoption name Threads value 2", "go movetime 1000"])
+    assert time.monotonic() - start < 30
+    assert chess.Move.from_uci(lines[-1].split()[1]) in chess.Board().legal_moves
+    return
+
+def test_main_uci_with_threads():
+    # main.py warms up Aer in the front-end process before any pool worker starts
+    main_path = os.path.join(os.path.dirname(__file__), "../src/main.py")
+    # Its own session, so the watchdog also kills pool workers holding stdout open
+    process = subprocess.Popen([sys.executable, main_path, "uci"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               text=True, start_new_session=True)
+    watchdog = threading.Timer(60, os.killpg, (process.pid, 9))
+    watchdog.start()
+    try:
+        process.stdin.write("isready\nsetoption name Threads value 2\nposition startpos\ngo movetime 1000\n")
+        process.stdin.flush()
+        lines = []
+        while not lines or not lines[-1].startswith("bestmove"):
+            line = process.stdout.readline()
+            assert line, "engine exited without a bestmove"
+            lines.append(line.strip())
+        process.stdin.write("quit\n")
+        process.stdin.flush()
+        assert process.wait() == 0
+    finally:
+        watchdog.cancel()
+        if process.poll() is None:
+            os.killpg(process.pid, 9)
+    assert chess.Move.from_uci(lines[-1].split()[1]) in chess.Board().legal_moves
+    return